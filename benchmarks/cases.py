@@ -0,0 +1,108 @@
+"""
+    File name: cases.py
+    Date created: 10/18/26
+
+Benchmark cases shared by run.py and the pytest-benchmark suite. Each case
+builds its inputs once and returns a function that generates LookML and
+returns ``(number of fields, number of characters)``.
+"""
+import os
+import shutil
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from lookmlgen import base_generator  # noqa: E402
+from lookmlgen import field  # noqa: E402
+from lookmlgen import project  # noqa: E402
+from lookmlgen import view  # noqa: E402
+
+FORMAT_OPTIONS = base_generator.GeneratorFormatOptions()
+
+
+def make_view(name, num_fields):
+    v = view.View(name, sql_table_name='schema.' + name, label=name)
+    for i in range(num_fields):
+        column = 'column_%d' % i
+        kind = i % 4
+        if kind == 0:
+            f = field.Dimension(column, type='number', primary_key=i == 0,
+                                label='Column %d' % i)
+        elif kind == 1:
+            f = field.DimensionGroup(column, timeframes=['date', 'month'])
+        elif kind == 2:
+            f = field.Dimension(column, description='Column %d' % i)
+        else:
+            f = field.Measure('sum_' + column, type='sum',
+                              sql='${column_%d}' % (i - 3))
+        v.add_field(f)
+    return v
+
+
+def view_case(num_fields):
+    def setup():
+        v = make_view('view', num_fields)
+
+        def run():
+            return num_fields, len(v.render(FORMAT_OPTIONS))
+        return run
+    return setup
+
+
+def derived_table_case(num_lines):
+    def setup():
+        sql = '\n'.join('SELECT %d AS id, \'value\' AS name UNION ALL' % i
+                        for i in range(num_lines)) + '\nSELECT 0, NULL\n'
+        v = view.View('pdt')
+        v.set_derived_table(view.DerivedTable(sql, indexes=['id']))
+        v.add_field(field.Dimension('id', type='number'))
+
+        def run():
+            # Times indenting the SQL rather than a cache hit
+            view.derived_table_sql_cache.clear()
+            return 1, len(v.render(FORMAT_OPTIONS))
+        return run
+    return setup
+
+
+def dimension_group_case(num_fields):
+    def setup():
+        v = view.View('dimension_groups')
+        for i in range(num_fields):
+            v.add_field(field.DimensionGroup(
+                'created_%d' % i, timeframes=['raw', 'time', 'date', 'week',
+                                              'month', 'quarter', 'year']))
+
+        def run():
+            return num_fields, len(v.render(FORMAT_OPTIONS))
+        return run
+    return setup
+
+
+def project_case(num_views, fields_per_view, executor='thread'):
+    def setup():
+        views = [make_view('view_%d' % i, fields_per_view)
+                 for i in range(num_views)]
+        output_dir = tempfile.mkdtemp(prefix='lookmlgen-bench-')
+
+        def run():
+            p = project.Project(views, output_dir, executor=executor)
+            timings = p.generate_lookml(FORMAT_OPTIONS)
+            return (num_views * fields_per_view,
+                    sum(t.bytes_written for t in timings))
+        run.cleanup = lambda: shutil.rmtree(output_dir, ignore_errors=True)
+        return run
+    return setup
+
+
+CASES = [
+    ('view_10_fields', view_case(10)),
+    ('view_1k_fields', view_case(1000)),
+    ('view_100k_fields', view_case(100000)),
+    ('derived_table_50k_sql_lines', derived_table_case(50000)),
+    ('dimension_group_10k', dimension_group_case(10000)),
+    ('project_500_views_serial', project_case(500, 100, None)),
+    ('project_500_views_threads', project_case(500, 100, 'thread')),
+    ('project_500_views_processes', project_case(500, 100, 'process')),
+]
@@ -0,0 +1,51 @@
+"""
+    File name: field_memory.py
+    Date created: 10/18/26
+
+Measures the memory used by field objects held in views.
+
+Usage: python benchmarks/field_memory.py [number of fields]
+"""
+import gc
+import os
+import sys
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from lookmlgen import field  # noqa: E402
+from lookmlgen import view  # noqa: E402
+
+FIELDS_PER_VIEW = 1000
+
+
+def build_views(num_fields):
+    views = []
+    for i in range(0, num_fields, FIELDS_PER_VIEW):
+        v = view.View('view_%d' % i)
+        for j in range(min(FIELDS_PER_VIEW, num_fields - i)):
+            name = 'column_%d' % j
+            if j % 4 == 0:
+                f = field.Measure('sum_' + name, type='sum')
+            elif j % 4 == 1:
+                f = field.DimensionGroup(name)
+            else:
+                f = field.Dimension(name, type='number')
+            v.add_field(f)
+        views.append(v)
+    return views
+
+
+def main(num_fields):
+    gc.collect()
+    tracemalloc.start()
+    views = build_views(num_fields)
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print('{:,} fields in {:,} views: {:.1f} MB, {:.0f} bytes per field '
+          '(peak {:.1f} MB)'.format(num_fields, len(views), current / 1e6,
+                                    float(current) / num_fields, peak / 1e6))
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 1000000)
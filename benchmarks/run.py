@@ -0,0 +1,73 @@
+"""
+    File name: run.py
+    Date created: 10/18/26
+
+Runs the benchmark cases and reports time, throughput and peak memory.
+
+Usage: python benchmarks/run.py [-r REPEAT] [--json FILE] [CASE ...]
+
+Results written with --json can be compared between two checkouts with
+--compare FILE.
+"""
+import argparse
+import json
+import timeit
+import tracemalloc
+
+from cases import CASES
+
+
+def measure(setup, repeat):
+    run = setup()
+    try:
+        best = None
+        for _ in range(repeat):
+            start = timeit.default_timer()
+            fields, chars = run()
+            elapsed = timeit.default_timer() - start
+            best = elapsed if best is None else min(best, elapsed)
+        tracemalloc.start()
+        run()
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+    finally:
+        getattr(run, 'cleanup', lambda: None)()
+    return {'seconds': best,
+            'fields_per_second': fields / best,
+            'mb_per_second': chars / best / 1e6,
+            'output_mb': chars / 1e6,
+            'peak_memory_mb': peak / 1e6}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[1])
+    parser.add_argument('cases', nargs='*', help='Cases to run, default all')
+    parser.add_argument('-r', '--repeat', type=int, default=3)
+    parser.add_argument('--json', help='Write results to this file')
+    parser.add_argument('--compare', help='Results file to compare against')
+    args = parser.parse_args()
+
+    baseline = {}
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+    results = {}
+    print('{:<30} {:>10} {:>14} {:>9} {:>10} {:>9}'.format(
+        'case', 'seconds', 'fields/s', 'MB/s', 'peak MB', 'vs base'))
+    for name, setup in CASES:
+        if args.cases and name not in args.cases:
+            continue
+        r = results[name] = measure(setup, args.repeat)
+        base = baseline.get(name)
+        change = '{:.2f}x'.format(base['seconds'] / r['seconds']) \
+            if base else ''
+        print('{:<30} {seconds:>10.4f} {fields_per_second:>14,.0f} '
+              '{mb_per_second:>9.1f} {peak_memory_mb:>10.1f} {:>9}'.
+              format(name, change, **r))
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(results, f, indent=2, sort_keys=True)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,23 @@
+"""
+    File name: test_benchmarks.py
+    Date created: 10/18/26
+
+pytest-benchmark suite over the cases in cases.py. These are not part of
+the regular test run; use: py.test benchmarks --benchmark-only
+"""
+import pytest
+
+from cases import CASES
+
+pytest.importorskip('pytest_benchmark')
+
+
+@pytest.mark.parametrize('name,setup', CASES, ids=[c[0] for c in CASES])
+def test_benchmark(benchmark, name, setup):
+    run = setup()
+    try:
+        fields, chars = benchmark(run)
+    finally:
+        getattr(run, 'cleanup', lambda: None)()
+    benchmark.extra_info['fields'] = fields
+    benchmark.extra_info['output_mb'] = chars / 1e6
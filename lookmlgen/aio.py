@@ -0,0 +1,123 @@
+"""
+    File name: aio.py
+    Date created: 10/18/26
+
+    Coroutines behind :py:meth:`BaseGenerator.agenerate_lookml()
+    <lookmlgen.base_generator.BaseGenerator.agenerate_lookml>` and
+    :py:meth:`Project.agenerate_lookml()
+    <lookmlgen.project.Project.agenerate_lookml>`. This module uses Python
+    3.5 syntax and is only imported when they are called.
+"""
+import asyncio
+import inspect
+from concurrent import futures
+
+from .project import _discard, _write_view
+from .stats import active_stats
+from .util import _default_workers, create_executor
+
+
+async def agenerate_lookml(generator, writer, format_options=None,
+                           executor=None, encoding='utf-8'):
+    """ Renders a generator's LookML on an executor and writes it to an
+    async writer with a single call
+
+    :param generator: View or other generator to render
+    :param writer: Async writer, see
+                   :py:meth:`~lookmlgen.base_generator.BaseGenerator.agenerate_lookml`
+    :param format_options: Formatting options to use during generation
+    :param executor: Executor to render on, the event loop's default
+                     executor if None
+    :param encoding: Encoding of the bytes written, or None to write text
+    :type generator: :class:`~lookmlgen.base_generator.BaseGenerator`
+    :type format_options:
+        :class:`~lookmlgen.base_generator.GeneratorFormatOptions`
+    :type executor: :class:`concurrent.futures.Executor`
+    :type encoding: string
+
+    """
+    loop = asyncio.get_event_loop()
+    lookml = await loop.run_in_executor(executor, _render, generator,
+                                        format_options, encoding)
+    await write(writer, lookml)
+
+
+def _render(generator, format_options, encoding):
+    lookml = generator.render(format_options)
+    return lookml.encode(encoding) if encoding else lookml
+
+
+async def write(writer, data):
+    """Writes data to a writer whose ``write()`` is a coroutine, or that has
+    a ``drain()`` coroutine to wait on after writing
+    """
+    result = writer.write(data)
+    if inspect.isawaitable(result):
+        await result
+        return
+    drain = getattr(writer, 'drain', None)
+    if drain is not None:
+        await drain()
+
+
+async def agenerate_project(project, format_options=None, incremental=False,
+                            executor=None, max_concurrency=None):
+    """ Writes LookML for every view in a project without blocking the
+    event loop, see :py:meth:`~lookmlgen.project.Project.agenerate_lookml`
+
+    :rtype: list of :class:`~lookmlgen.project.ViewTiming`
+
+    """
+    loop = asyncio.get_event_loop()
+    fo = format_options if format_options else project.format_options
+    stats = active_stats()
+    if executor is None:
+        executor = project.executor or 'thread'
+    pool = executor
+    if not isinstance(executor, futures.Executor):
+        pool = create_executor(executor, project.max_workers)
+    semaphore = asyncio.Semaphore(
+        max_concurrency or 2 * (project.max_workers or _default_workers()))
+
+    submitted = []
+
+    async def write_view(job):
+        async with semaphore:
+            future = pool.submit(_write_view, *job)
+            submitted.append(future)
+            return await asyncio.wrap_future(future)
+
+    try:
+        # Planning and finishing touch the project itself, so they run on a
+        # thread even when views are written by a process pool
+        jobs, manifest, previous = await loop.run_in_executor(
+            None, project._plan, fo, incremental, stats)
+        # Wait for every view before discarding files after a failure
+        try:
+            timings = await asyncio.gather(
+                *[write_view(job) for job in jobs], return_exceptions=True)
+        except BaseException:
+            # Cancelled; views already running on the pool still write
+            # their files, so wait for them before discarding
+            await loop.run_in_executor(None, _abandon, submitted, jobs)
+            raise
+        errors = [t for t in timings if isinstance(t, BaseException)]
+        if errors:
+            await loop.run_in_executor(None, _discard, jobs)
+            raise errors[0]
+        await loop.run_in_executor(None, project._finish, jobs, timings,
+                                   manifest, previous, stats)
+    finally:
+        if pool is not executor:
+            pool.shutdown(wait=False)
+    return timings
+
+
+def _abandon(submitted, jobs):
+    """Cancels the views that have not started, waits for the rest and
+    removes the temporary files of all of them
+    """
+    for future in submitted:
+        future.cancel()
+    futures.wait(submitted)
+    _discard(jobs)
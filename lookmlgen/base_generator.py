@@ -4,6 +4,9 @@
     Date created: 4/8/17
 """
 import abc
+from collections import OrderedDict
+from operator import attrgetter
+
 import six
 
 DEFAULT_WARNING_HEADER_COMMENT = \
@@ -12,6 +15,12 @@ DEFAULT_WARNING_HEADER_COMMENT = \
 # re-generated.\n"""
 
 
+FORMAT_OPTION_ATTRS = ('indent_spaces', 'newline_between_items',
+                       'omit_default_field_type', 'view_fields_alphabetical',
+                       'warning_header_comment',
+                       'omit_time_frames_if_not_set')
+
+
 class GeneratorFormatOptions(object):
     """Specify formatting options to be used during LookML generation
 
@@ -44,6 +53,140 @@ class GeneratorFormatOptions(object):
         self.view_fields_alphabetical = view_fields_alphabetical
         self.omit_time_frames_if_not_set = omit_time_frames_if_not_set
 
+    def __setattr__(self, name, value):
+        if name in FORMAT_OPTION_ATTRS:
+            self.__dict__.pop('_renderer', None)
+        super(GeneratorFormatOptions, self).__setattr__(name, value)
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state.pop('_renderer', None)
+        return state
+
+    def __eq__(self, other):
+        if not isinstance(other, GeneratorFormatOptions):
+            return NotImplemented
+        return self.key == other.key
+
+    def __ne__(self, other):
+        eq = self.__eq__(other)
+        return eq if eq is NotImplemented else not eq
+
+    def __hash__(self):
+        return hash(self.key)
+
+    @property
+    def key(self):
+        """Tuple of the option values, usable as a cache key. Do not change
+        options of an instance while it is used as a key.
+        """
+        return tuple(getattr(self, a) for a in FORMAT_OPTION_ATTRS)
+
+    @property
+    def renderer(self):
+        """:class:`Renderer` with the indents and line templates for these
+        options. Renderers are shared by all options with equal values.
+        """
+        r = self.__dict__.get('_renderer')
+        if r is None:
+            key = self.key
+            r = _renderers.get(key)
+            if r is None:
+                r = _renderers.setdefault(key, Renderer(self))
+            self.__dict__['_renderer'] = r
+        return r
+
+    def definition(self):
+        """Returns the formatting options as a dict"""
+        return OrderedDict(
+            (a, getattr(self, a)) for a in FORMAT_OPTION_ATTRS)
+
+
+class Renderer(object):
+    """Indent strings and line templates precomputed for one set of
+    :class:`GeneratorFormatOptions`. Use
+    :py:attr:`GeneratorFormatOptions.renderer` instead of creating one.
+
+    Templates take their values as positional :py:meth:`str.format`
+    arguments.
+
+    :param format_options: Formatting options to precompute templates for
+    :type format_options: :class:`GeneratorFormatOptions`
+
+    """
+    def __init__(self, format_options):
+        i1 = ' ' * format_options.indent_spaces
+        i2 = i1 * 2
+        self.indent = i1
+        self.indent2 = i2
+        self.indent3 = i1 * 3
+        self.close = i1 + '}\n'
+
+        # View
+        self.view_open = 'view: {} {{\n'
+        self.sql_table_name = i1 + 'sql_table_name: {} ;;\n'
+        self.view_label = i1 + 'label: "{}"\n'
+        self.view_extends = i1 + 'extends: [{}]\n'
+        self.extension_required = i1 + 'extension: required\n'
+
+        # DerivedTable
+        self.derived_table_open = i1 + 'derived_table: {\n'
+        self.derived_table_sql = i2 + 'sql:{} ;;\n'
+        self.derived_table_sql_open = i2 + 'sql:\n'
+        self.sql_close = ' ;;\n'
+        self.sql_trigger_value = i2 + 'sql_trigger_value: {} ;;\n'
+        self.indexes = i2 + 'indexes: {}\n'
+
+        # Field
+        self.hidden = i2 + 'hidden: yes\n'
+        self.label = i2 + 'label: "{}"\n'
+        self.group_label = i2 + 'group_label: "{}"\n'
+        self.description = i2 + 'description: "{}"\n'
+        self.type = i2 + 'type: {}\n'
+        self.sql = i2 + 'sql: {} ;;\n'
+        self.primary_key = i2 + 'primary_key: yes\n'
+        self.timeframes = i2 + 'timeframes: {}\n'
+        self.datatype = i2 + 'datatype: {}\n'
+
+        # Model, Explore and Join
+        self.connection = 'connection: "{}"\n'
+        self.include = 'include: "{}"\n'
+        self.explore_open = 'explore: {} {{\n'
+        self.explore_from = i1 + 'from: {}\n'
+        self.explore_description = i1 + 'description: "{}"\n'
+        self.join_open = i1 + 'join: {} {{\n'
+        self.join_from = i2 + 'from: {}\n'
+        self.relationship = i2 + 'relationship: {}\n'
+        self.sql_on = i2 + 'sql_on: {} ;;\n'
+        self._field_open = {}
+
+    def field_open(self, type_name):
+        """Returns the template opening a field of the given type"""
+        t = self._field_open.get(type_name)
+        if t is None:
+            t = self._field_open[type_name] = \
+                self.indent + type_name + ': {} {{\n'
+        return t
+
+
+_renderers = {}
+
+#: Format options of generators created without any
+DEFAULT_FORMAT_OPTIONS = GeneratorFormatOptions()
+
+_slot_names = {}
+_pickled = {}
+_legacy_renders = {}
+
+
+class Pieces(list):
+    """List the pieces of generated LookML are appended to. It can also be
+    written to like a file, so subclasses that write their LookML with
+    ``write()`` keep working.
+    """
+    __slots__ = ()
+    write = list.append
+
 
 @six.add_metaclass(abc.ABCMeta)
 class BaseGenerator:
@@ -56,11 +199,62 @@ class BaseGenerator:
     :type format_options:
         :class:`~lookmlgen.base_generator.GeneratorFormatOptions`
 
+    ``_definition_attrs`` names the attributes that determine the generated
+    LookML; :py:meth:`definition` reads them. A subclass that adds an
+    attribute affecting its LookML should list it by setting
+    ``_definition_attrs`` in its own class body. For a subclass that does
+    not, every public attribute is treated as part of the definition.
+
     """
-    def __init__(self, file=None, format_options=GeneratorFormatOptions()):
+    __slots__ = ('file', 'format_options')
+    _definition_attrs = ()
+
+    def __init__(self, file=None, format_options=DEFAULT_FORMAT_OPTIONS):
         self.file = file
         self.format_options = format_options
 
+    def __getstate__(self):
+        """ Returns the attributes to pickle. The file handle is left out,
+        as are the shared :data:`DEFAULT_FORMAT_OPTIONS`, so pickled
+        generators are small and can be sent to worker processes or cached
+        on disk.
+
+        """
+        names, getter, has_dict = _pickled_attrs(type(self))
+        state = self.__dict__.copy() if has_dict else {}
+        try:
+            state.update(zip(names, getter(self)))
+        except AttributeError:
+            # A slot is not set
+            for name in names:
+                try:
+                    state[name] = object.__getattribute__(self, name)
+                except AttributeError:
+                    pass
+        if state.get('format_options') is DEFAULT_FORMAT_OPTIONS:
+            del state['format_options']
+        return state
+
+    def __setstate__(self, state):
+        self.file = None
+        self.format_options = DEFAULT_FORMAT_OPTIONS
+        for name, value in six.iteritems(state):
+            setattr(self, name, value)
+
+    def definition(self):
+        """ Returns the attributes that determine the generated LookML as a
+        dict. Two generators with equal definitions generate the same LookML.
+
+        """
+        d = OrderedDict(
+            (a, getattr(self, a)) for a in self._definition_attrs)
+        if not declares_definition(type(self)):
+            # The subclass may render attributes it did not declare
+            for name in _public_attrs(self):
+                if name not in d:
+                    d[name] = getattr(self, name)
+        return d
+
     @abc.abstractmethod
     def generate_lookml(self, file=None, format_options=None):
         """ Implement this method in subclasses to generate LookML
@@ -76,9 +270,165 @@ class BaseGenerator:
         raise NotImplementedError(
             'You must implement the generate_lookml() method')
 
+    def render(self, format_options=None):
+        """ Returns the generated LookML as a string.
+
+        The LookML is collected as a list of pieces that is joined once, so
+        :py:meth:`generate_lookml` can write it with a single call.
+
+        :param format_options: Formatting options to use during generation
+        :type format_options:
+            :class:`~lookmlgen.base_generator.GeneratorFormatOptions`
+        :rtype: string
+
+        """
+        fo = format_options if format_options else self.format_options
+        lines = Pieces()
+        self._render(lines, fo)
+        return ''.join(lines)
+
+    def agenerate_lookml(self, writer, format_options=None, executor=None,
+                         encoding='utf-8'):
+        """ Returns a coroutine that renders LookML on an executor, so the
+        event loop is not blocked, and writes it to an async writer with a
+        single call. Requires Python 3.5 or later.
+
+        Usage::
+
+            await view.agenerate_lookml(response)
+
+        :param writer: Object with a ``write()`` method that is either a
+                       coroutine, as on an aiohttp response or aiofiles
+                       file, or synchronous with a ``drain()`` coroutine, as
+                       on :class:`asyncio.StreamWriter`
+        :param format_options: Formatting options to use during generation
+        :param executor: Executor to render on, the event loop's default
+                         executor if None
+        :param encoding: Encoding of the bytes written, as stream writers
+                         and HTTP responses only accept bytes. None writes
+                         text, e.g. to a file opened in text mode.
+        :type format_options:
+            :class:`~lookmlgen.base_generator.GeneratorFormatOptions`
+        :type executor: :class:`concurrent.futures.Executor`
+        :type encoding: string
+
+        """
+        from .aio import agenerate_lookml
+        return agenerate_lookml(self, writer, format_options, executor,
+                                encoding)
+
+    def iter_lookml(self, format_options=None):
+        """ Yields the generated LookML lazily as a sequence of text chunks.
+        Joining the chunks gives the same text as :py:meth:`render`.
+
+        Generators with large output, such as views, override this to yield
+        their LookML in several chunks so it can be streamed to a socket,
+        compressed file or archive without holding all of it in memory.
+
+        :param format_options: Formatting options to use during generation
+        :type format_options:
+            :class:`~lookmlgen.base_generator.GeneratorFormatOptions`
+        :rtype: iterator of strings
+
+        """
+        yield self.render(format_options)
+
+    def _render(self, lines, fo):
+        """ Appends the pieces of the generated LookML to ``lines``, a
+        :class:`Pieces` list. Subclasses implement this; by default the
+        output of :py:meth:`generate_lookml` is written to ``lines``.
+
+        """
+        self.generate_lookml(file=lines, format_options=fo)
+
     @classmethod
     def __subclasshook__(cls, C):
         if cls is BaseGenerator:
             if any("generate_lookml" in B.__dict__ for B in C.__mro__):
                 return True
         return NotImplemented
+
+
+def render_into(generator, lines, fo):
+    """ Appends the LookML of a generator nested in another one, such as a
+    field of a view, to a :class:`Pieces` list. A generator whose class
+    overrides :py:meth:`~BaseGenerator.generate_lookml` without also
+    overriding ``_render`` is written with its own
+    :py:meth:`~BaseGenerator.generate_lookml`.
+
+    :param generator: Generator to render
+    :param lines: Pieces to append to
+    :param fo: Formatting options to use during generation
+    :type generator: :class:`BaseGenerator`
+    :type lines: :class:`Pieces`
+    :type fo: :class:`GeneratorFormatOptions`
+
+    """
+    cls = type(generator)
+    legacy = _legacy_renders.get(cls)
+    if legacy is None:
+        legacy = _legacy_renders[cls] = _overrides_generate_lookml(cls)
+    if legacy:
+        generator.generate_lookml(file=lines, format_options=fo)
+    else:
+        generator._render(lines, fo)
+
+
+def _overrides_generate_lookml(cls):
+    """Returns whether generate_lookml() of a class is defined below the
+    class defining _render(), or the class has no _render() at all
+    """
+    for c in cls.__mro__:
+        if '_render' in c.__dict__:
+            return False
+        if 'generate_lookml' in c.__dict__:
+            return True
+    return True
+
+
+def declares_definition(cls):
+    """Returns whether a class sets ``_definition_attrs`` itself, rather
+    than inheriting the attributes of a base class that may render
+    differently
+    """
+    return '_definition_attrs' in cls.__dict__
+
+
+def _public_attrs(obj):
+    """Returns the names of the public attributes set on an object, apart
+    from its file handle and format options
+    """
+    names = [n for n in _slots(type(obj)) if hasattr(obj, n)]
+    names.extend(getattr(obj, '__dict__', ()))
+    return [n for n in names if not n.startswith('_') and
+            n not in ('file', 'format_options')]
+
+
+def _slots(cls):
+    """Returns the names of the ``__slots__`` of a class and its bases"""
+    names = _slot_names.get(cls)
+    if names is None:
+        names = []
+        for c in cls.__mro__:
+            slots = c.__dict__.get('__slots__', ())
+            if isinstance(slots, six.string_types):
+                slots = (slots,)
+            names.extend(n for n in slots if n not in names)
+        names = _slot_names[cls] = tuple(names)
+    return names
+
+
+def _pickled_attrs(cls):
+    """Returns the slots pickled for a class, a function returning their
+    values as a tuple and whether instances also have a ``__dict__``
+    """
+    pickled = _pickled.get(cls)
+    if pickled is None:
+        names = tuple(n for n in _slots(cls) if n != 'file')
+        getter = attrgetter(*names)
+        if len(names) == 1:
+            getter = (lambda get: lambda obj: (get(obj),))(getter)
+        has_dict = any('__slots__' not in c.__dict__
+                       for c in cls.__mro__[:-1])
+        pickled = _pickled[cls] = (names, getter, has_dict)
+    return pickled
@@ -0,0 +1,185 @@
+"""
+    File name: cli.py
+    Date created: 10/18/26
+
+    ``lookml-gen`` command line entry point. Modules are imported when they
+    are needed to keep startup fast.
+"""
+import argparse
+import sys
+import timeit
+
+SLOWEST_VIEWS = 5
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(
+        prog='lookml-gen',
+        description='Generate LookML view files from JSON or YAML view '
+                    'specifications, or from JSON lines on stdin.')
+    parser.add_argument('inputs', nargs='*', metavar='SPEC',
+                        help="Spec files to read; '-' or nothing reads "
+                             "stdin")
+    parser.add_argument('-o', '--output-dir', default='.',
+                        help='Directory to write view files to '
+                             '(default: %(default)s)')
+    parser.add_argument('-f', '--format', choices=['json', 'yaml', 'jsonl'],
+                        help='Format of the specs; by default taken from '
+                             'file extensions, jsonl for stdin')
+    parser.add_argument('-j', '--jobs', type=int, default=1,
+                        help='Number of views to generate in parallel, 0 '
+                             'for one per CPU (default: %(default)s)')
+    parser.add_argument('--executor', choices=['process', 'thread'],
+                        default='process',
+                        help='Kind of pool used with --jobs '
+                             '(default: %(default)s)')
+    parser.add_argument('-i', '--incremental', action='store_true',
+                        help='Only write views that changed since the last '
+                             'run')
+    parser.add_argument('--fsync', choices=['none', 'file', 'end'],
+                        default='none',
+                        help='When to flush files to disk '
+                             '(default: %(default)s)')
+    parser.add_argument('--shard', choices=['hash', 'schema'],
+                        help='Write views into subdirectories by a hash of '
+                             'their name or by their schema')
+    parser.add_argument('--indent-spaces', type=int, default=2,
+                        help='Spaces per indent (default: %(default)s)')
+    parser.add_argument('--no-header', action='store_true',
+                        help='Leave out the warning comment at the top of '
+                             'each file')
+    parser.add_argument('--validate', action='store_true',
+                        help='Check ${...} references and stop if any are '
+                             'invalid')
+    parser.add_argument('--snapshots', metavar='DIR',
+                        help='Compare the views with the snapshots in DIR '
+                             'instead of writing them, and fail if any '
+                             'differ')
+    parser.add_argument('--update-snapshots', action='store_true',
+                        help='With --snapshots, update the snapshots to '
+                             'match the views')
+    parser.add_argument('-q', '--quiet', action='store_true',
+                        help='Do not print a timing summary')
+    args = parser.parse_args(argv)
+    if args.update_snapshots and not args.snapshots:
+        parser.error('--update-snapshots requires --snapshots')
+    return args
+
+
+def main(argv=None):
+    """ Runs ``lookml-gen`` and returns its exit status
+
+    :param argv: Command line arguments, ``sys.argv[1:]`` by default
+    :type argv: list of strings
+    :rtype: int
+
+    """
+    args = parse_args(argv)
+    try:
+        return _run(args)
+    except (IOError, OSError, ValueError) as e:
+        sys.stderr.write('lookml-gen: error: {}\n'.format(e))
+        return 1
+
+
+def _run(args):
+    from .base_generator import GeneratorFormatOptions
+    from .project import Project
+
+    fo = GeneratorFormatOptions(indent_spaces=args.indent_spaces)
+    if args.no_header:
+        fo.warning_header_comment = None
+    executor = None
+    if args.jobs != 1:
+        executor = args.executor
+    p = Project(output_dir=args.output_dir, format_options=fo,
+                executor=executor, max_workers=args.jobs or None,
+                fsync=args.fsync, shard=args.shard)
+
+    start = timeit.default_timer()
+    for v in _read_views(args.inputs or ['-'], args.format):
+        p.add_view(v)
+    read_seconds = timeit.default_timer() - start
+
+    if args.validate:
+        problems = p.validate()
+        if problems:
+            for problem in problems:
+                sys.stderr.write(problem.message + '\n')
+            return 1
+
+    if args.snapshots:
+        return _check_snapshots(p, fo, executor, args)
+
+    start = timeit.default_timer()
+    timings = p.generate_lookml(incremental=args.incremental)
+    seconds = timeit.default_timer() - start
+    if not args.quiet:
+        _print_summary(p, timings, read_seconds, seconds, args)
+    return 0
+
+
+def _check_snapshots(project, fo, executor, args):
+    from .snapshot import check_snapshots
+
+    start = timeit.default_timer()
+    report = check_snapshots(project.views, args.snapshots, fo,
+                             update=args.update_snapshots,
+                             executor=executor,
+                             max_workers=args.jobs or None)
+    seconds = timeit.default_timer() - start
+    if not args.quiet or not report.ok:
+        sys.stderr.write(report.summary(diffs=not args.quiet) + '\n')
+    if not args.quiet:
+        sys.stderr.write('Checked {} views in {:.2f}s\n'.format(
+            len(project.views), seconds))
+    return 0 if report.ok or report.updated else 1
+
+
+def _read_views(inputs, format):
+    import io
+    from .spec import format_for_path, iter_views
+
+    for path in inputs:
+        if path == '-':
+            views = _located(iter_views(sys.stdin, format or 'jsonl'),
+                             '<stdin>')
+            for v in views:
+                yield v
+            continue
+        with io.open(path, 'r', encoding='utf-8') as f:
+            views = _located(iter_views(f, format or format_for_path(path)),
+                             path)
+            for v in views:
+                yield v
+
+
+def _located(views, path):
+    """Yields views, adding the input file to the message of an invalid
+    specification
+    """
+    try:
+        for v in views:
+            yield v
+    except ValueError as e:
+        raise ValueError('{}: {}'.format(path, e))
+
+
+def _print_summary(project, timings, read_seconds, seconds, args):
+    w = sys.stderr.write
+    w('Read {} views in {:.2f}s\n'.format(len(project.views), read_seconds))
+    workers = 'serially' if args.jobs == 1 else 'with {} {} workers'.format(
+        args.jobs or 'default', args.executor)
+    w('Wrote {} of {} views ({} bytes) in {:.2f}s {}\n'.format(
+        len(timings), len(project.views),
+        sum(t.bytes_written for t in timings), seconds, workers))
+    slowest = sorted(timings, key=lambda t: t.seconds, reverse=True)
+    if len(slowest) > 1:
+        w('Slowest views:\n')
+        for t in slowest[:SLOWEST_VIEWS]:
+            w('  {}  {:.3f}s  {} bytes\n'.format(
+                t.name, t.seconds, t.bytes_written))
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,192 @@
+"""
+    File name: diff.py
+    Date created: 10/18/26
+"""
+from collections import OrderedDict
+from operator import attrgetter
+
+import six
+
+from .base_generator import declares_definition
+
+
+class ViewDiff(object):
+    """Changes between two versions of a :class:`~lookmlgen.view.View`
+
+    :param name: Name of the view
+    :ivar changed_attrs: View attributes that changed, mapped to
+                         ``(old, new)`` tuples. A changed derived table is
+                         reported as ``derived_table`` with the definitions
+                         of both versions.
+    :ivar added_fields: Names of fields only in the new view
+    :ivar removed_fields: Names of fields only in the old view
+    :ivar changed_fields: Names of fields in both views mapped to a dict of
+                          their changed attributes and ``(old, new)`` tuples
+
+    """
+    def __init__(self, name):
+        self.name = name
+        self.changed_attrs = OrderedDict()
+        self.added_fields = []
+        self.removed_fields = []
+        self.changed_fields = OrderedDict()
+
+    def __bool__(self):
+        return bool(self.changed_attrs or self.added_fields or
+                    self.removed_fields or self.changed_fields)
+    __nonzero__ = __bool__
+
+    def as_dict(self):
+        """Returns the changes as a dict, leaving out empty entries"""
+        d = OrderedDict()
+        for key in ('changed_attrs', 'added_fields', 'removed_fields',
+                    'changed_fields'):
+            value = getattr(self, key)
+            if value:
+                d[key] = value
+        return d
+
+
+class ChangeSet(object):
+    """Changes between two collections of views, as returned by
+    :func:`diff_views`
+
+    :ivar added_views: Names of views only in the new collection
+    :ivar removed_views: Names of views only in the old collection
+    :ivar changed_views: Names of views in both collections that differ,
+                         mapped to a :class:`ViewDiff`
+
+    """
+    def __init__(self):
+        self.added_views = []
+        self.removed_views = []
+        self.changed_views = OrderedDict()
+
+    def __bool__(self):
+        return bool(self.added_views or self.removed_views or
+                    self.changed_views)
+    __nonzero__ = __bool__
+
+    def as_dict(self):
+        """Returns the changes as a dict, leaving out empty entries"""
+        d = OrderedDict()
+        if self.added_views:
+            d['added_views'] = self.added_views
+        if self.removed_views:
+            d['removed_views'] = self.removed_views
+        if self.changed_views:
+            d['changed_views'] = OrderedDict(
+                (name, vd.as_dict())
+                for name, vd in six.iteritems(self.changed_views))
+        return d
+
+
+def diff_views(old, new):
+    """ Compares two collections of views by view name and field name.
+    Refinements are compared with refinements of the same view.
+
+    Fields are compared attribute by attribute using the attributes that
+    determine their LookML, e.g. ``type``, ``sql``, ``label``,
+    ``timeframes`` and ``primary_key``. Views, and fields, that are the
+    same object in both collections are skipped without comparing them, so
+    diffing a project against a partially rebuilt copy is cheap. The time
+    taken is linear in the number of fields.
+
+    :param old: Views before the change, as an iterable or a dict keyed by
+                name such as :py:attr:`~lookmlgen.project.Project.views`
+    :param new: Views after the change, in the same forms
+    :type old: iterable or dict of :class:`~lookmlgen.view.View`
+    :type new: iterable or dict of :class:`~lookmlgen.view.View`
+    :rtype: :class:`ChangeSet`
+
+    """
+    old = _by_name(old)
+    new = _by_name(new)
+    changes = ChangeSet()
+    for name, v in six.iteritems(new):
+        previous = old.get(name)
+        if previous is None:
+            changes.added_views.append(name)
+        elif previous is not v:
+            vd = diff_view(previous, v)
+            if vd:
+                changes.changed_views[name] = vd
+    changes.removed_views = [name for name in old if name not in new]
+    return changes
+
+
+def diff_view(old, new):
+    """ Compares two versions of a view.
+
+    :param old: View before the change
+    :param new: View after the change
+    :type old: :class:`~lookmlgen.view.View`
+    :type new: :class:`~lookmlgen.view.View`
+    :rtype: :class:`ViewDiff`
+
+    """
+    vd = ViewDiff(new.lookml_name)
+    vd.changed_attrs.update(diff_attrs(old, new))
+    old_dt, new_dt = old.derived_table, new.derived_table
+    if old_dt is not new_dt and (old_dt is None or new_dt is None or
+                                 diff_attrs(old_dt, new_dt)):
+        vd.changed_attrs['derived_table'] = (
+            old_dt.definition() if old_dt is not None else None,
+            new_dt.definition() if new_dt is not None else None)
+
+    old_fields, new_fields = old.fields, new.fields
+    for name, f in six.iteritems(new_fields):
+        previous = old_fields.get(name)
+        if previous is None:
+            vd.added_fields.append(name)
+        elif previous is not f:
+            changed = diff_attrs(previous, f)
+            if changed:
+                vd.changed_fields[name] = changed
+    vd.removed_fields = [name for name in old_fields
+                         if name not in new_fields]
+    return vd
+
+
+def diff_attrs(old, new):
+    """ Compares the attributes that determine the LookML of two generators,
+    e.g. two fields.
+
+    :return: Changed attributes mapped to ``(old, new)`` tuples
+    :rtype: dict
+
+    """
+    if not (declares_definition(type(old)) and
+            declares_definition(type(new))):
+        # Subclasses may render attributes they did not declare
+        a, b = old.definition(), new.definition()
+        return dict((k, (a.get(k), b.get(k))) for k in set(a) | set(b)
+                    if a.get(k) != b.get(k))
+    attrs = old._definition_attrs
+    if type(old) is type(new):
+        # Compare all attributes in one call and only look at them one by
+        # one when something changed
+        getter = _getters.get(attrs)
+        if getter is None:
+            getter = _getters[attrs] = attrgetter(*attrs)
+        if getter(old) == getter(new):
+            return {}
+    else:
+        attrs = attrs + tuple(a for a in new._definition_attrs
+                              if a not in attrs)
+    changed = {}
+    for attr in attrs:
+        a = getattr(old, attr, None)
+        b = getattr(new, attr, None)
+        if a != b:
+            changed[attr] = (a, b)
+    return changed
+
+
+_getters = {}
+
+
+def _by_name(views):
+    if isinstance(views, dict):
+        return views
+    return OrderedDict((v.lookml_name, v) for v in views)
@@ -4,10 +4,68 @@
     Date created: 4/9/17
 """
 import json
+from contextlib import contextmanager
+from operator import attrgetter
 
-from .base_generator import BaseGenerator
+import six
+
+from .base_generator import BaseGenerator, Pieces, declares_definition
+from .util import LRUCache
 
 DEFAULT_TYPE = 'string'
+DEFAULT_TIMEFRAMES = ['time', 'date', 'week', 'month']
+RENDER_CACHE_SIZE = 4096
+
+_render_cache = None
+_key_getters = {}
+
+
+@contextmanager
+def render_cache(cache=None, maxsize=RENDER_CACHE_SIZE):
+    """ Context manager that caches the rendered LookML of fields while it
+    is active, so identical fields shared by many views, such as ``id``
+    primary keys or ``created`` dimension groups, are formatted once.
+
+    Fields are looked up by their class, their definition and the format
+    options. Fields of a class that does not set ``_definition_attrs`` in
+    its own class body, or with a value that cannot be hashed, such as a
+    list label, are rendered without the cache. The cache applies to
+    rendering in every thread of the current process, including the thread
+    pool of a :class:`~lookmlgen.project.Project`.
+
+    Usage::
+
+        with render_cache() as cache:
+            project.generate_lookml()
+        print(cache.hit_rate)
+
+    :param cache: Cache to use, a new one by default
+    :param maxsize: Number of rendered fields kept by a new cache, least
+                    recently used first out
+    :type cache: :class:`~lookmlgen.util.LRUCache`
+    :type maxsize: int
+
+    """
+    global _render_cache
+    cache = cache if cache is not None else LRUCache(maxsize)
+    previous = _render_cache
+    _render_cache = cache
+    try:
+        yield cache
+    finally:
+        _render_cache = previous
+
+
+def _key_getter(cls):
+    """Returns a getter for the definition values of a field class and the
+    index of its timeframes, or False if the class may render attributes
+    that are not part of its definition
+    """
+    if not declares_definition(cls):
+        return False
+    attrs = cls._definition_attrs
+    return (attrgetter(*attrs),
+            attrs.index('timeframes') if 'timeframes' in attrs else None)
 
 
 class FieldType(object):
@@ -52,20 +110,62 @@ class Field(BaseGenerator):
     :type group_label: string
     :type description: string
 
+    Fields define ``__slots__`` to keep views with many thousands of fields
+    small in memory, so setting an attribute that is not a slot raises
+    :class:`AttributeError`. Subclasses should define ``__slots__`` for any
+    attributes they add, or include ``'__dict__'`` in them to accept any
+    attribute.
+
+    Setting ``sql`` to None leaves the ``sql:`` line out, e.g. for a
+    ``type: count`` measure. Passing no ``sql`` to the constructor uses
+    ``${TABLE}.<name>``.
+
+    Subclasses add parameters in ``_generate(lines, fo)``, which is called
+    before ``sql`` is written. ``lines`` is a
+    :class:`~lookmlgen.base_generator.Pieces` list to append LookML to,
+    which also has a file-like ``write()``. A subclass that renders
+    attributes of its own lists every attribute it renders in
+    ``_definition_attrs``, set in its own class body; see
+    :class:`~lookmlgen.base_generator.BaseGenerator`. Only fields of such
+    classes are taken from a :func:`render_cache`.
+
     """
+    __slots__ = ('field_type', 'name', 'type', 'label', 'group_label',
+                 'description', 'hidden', '_sql')
+    _definition_attrs = ('field_type', 'name', 'type', 'label', 'group_label',
+                         'description', 'hidden', 'sql')
+
     def __init__(self, field_type, name, type=DEFAULT_TYPE, label=None,
                  sql=None, hidden=None, file=None, group_label=None, description=None, **kwargs):
         super(Field, self).__init__(file=file)
+        FieldType.type_name(field_type)
         self.field_type = field_type
-        self.type_name = FieldType.type_name(field_type)
         self.name = name
         self.type = type
         self.label = label
         self.group_label = group_label
-        self.sql = sql if sql else '${TABLE}.%s' % name
+        self._sql = sql if sql else None
         self.hidden = hidden
         self.description = description
 
+    @property
+    def sql(self):
+        """SQL snippet for the field, ``${TABLE}.<name>`` unless set"""
+        sql = self._sql
+        if sql is None:
+            return '${TABLE}.' + self.name
+        # False when the sql was set to None
+        return sql if sql is not False else None
+
+    @sql.setter
+    def sql(self, sql):
+        self._sql = False if sql is None else sql
+
+    @property
+    def type_name(self):
+        """LookML name of the field's type, e.g. 'dimension'"""
+        return FieldType.type_name(self.field_type)
+
     def generate_lookml(self, file=None, format_options=None):
         """ Writes LookML for a field to a file or StringIO buffer.
 
@@ -78,35 +178,65 @@ class Field(BaseGenerator):
 
         """
         f = file if file else self.file
-        fo = format_options if format_options else self.format_options
-        f.write('{indent}{self.type_name}: {self.name} {{\n'.
-                format(indent=' ' * fo.indent_spaces, self=self))
+        f.write(self.render(format_options))
+        return
+
+    def _render(self, lines, fo):
+        cache = _render_cache
+        if cache is None:
+            return self._render_fields(lines, fo)
+        key = self._cache_key(fo)
+        if key is None:
+            return self._render_fields(lines, fo)
+        try:
+            text = cache.get(key)
+        except TypeError:
+            # A value that cannot be hashed, e.g. a list label
+            return self._render_fields(lines, fo)
+        if text is None:
+            pieces = Pieces()
+            self._render_fields(pieces, fo)
+            text = ''.join(pieces)
+            cache.put(key, text)
+        lines.append(text)
+
+    def _cache_key(self, fo):
+        cls = self.__class__
+        getter = _key_getters.get(cls)
+        if getter is None:
+            getter = _key_getters[cls] = _key_getter(cls)
+        if not getter:
+            return None
+        values = getter[0](self)
+        i = getter[1]
+        if i is not None and values[i] is not None:
+            # Timeframes are a list, which cannot be part of a key
+            values = values[:i] + (tuple(values[i]),) + values[i + 1:]
+        # Renderers are shared by all format options with equal values
+        return cls, fo.renderer, values
+
+    def _render_fields(self, lines, fo):
+        r = fo.renderer
+        lines.append(r.field_open(self.type_name).format(self.name))
         if self.hidden:
-            f.write('{indent}hidden: yes\n'.
-                    format(indent=' ' * 2 * fo.indent_spaces))
+            lines.append(r.hidden)
         if self.label:
-            f.write('{indent}label: "{self.label}"\n'.
-                    format(indent=' ' * 2 * fo.indent_spaces, self=self))
+            lines.append(r.label.format(self.label))
         if self.group_label:
-            f.write('{indent}group_label: "{self.group_label}"\n'.
-                    format(indent=' ' * 2 * fo.indent_spaces, self=self))
+            lines.append(r.group_label.format(self.group_label))
 
         if self.description:
-            f.write('{indent}description: "{self.description}"\n'.
-                    format(indent=' ' * 2 * fo.indent_spaces, self=self))
+            lines.append(r.description.format(self.description))
 
         if self.type and not (fo.omit_default_field_type and
                               self.type == DEFAULT_TYPE):
-            f.write('{indent}type: {self.type}\n'.
-                    format(indent=' ' * 2 * fo.indent_spaces, self=self))
-        self._generate(f, fo)
+            lines.append(r.type.format(self.type))
+        self._generate(lines, fo)
         if self.sql:
-            f.write('{indent}sql: {self.sql} ;;\n'.
-                    format(indent=' ' * 2 * fo.indent_spaces, self=self))
-        f.write('{indent}}}\n'.format(indent=' ' * fo.indent_spaces))
-        return
+            lines.append(r.sql.format(self.sql))
+        lines.append(r.close)
 
-    def _generate(self, f, fo):
+    def _generate(self, lines, fo):
         return
 
 
@@ -120,14 +250,16 @@ class Dimension(Field):
     :type primary_key: bool
 
     """
+    __slots__ = ('primary_key',)
+    _definition_attrs = Field._definition_attrs + __slots__
+
     def __init__(self, name, primary_key=None, **kwargs):
         super(Dimension, self).__init__(FieldType.DIMENSION, name, **kwargs)
         self.primary_key = primary_key
 
-    def _generate(self, f, fo):
+    def _generate(self, lines, fo):
         if self.primary_key:
-            f.write('{indent}primary_key: yes\n'.
-                    format(indent=' ' * 2 * fo.indent_spaces))
+            lines.append(fo.renderer.primary_key)
 
 
 class DimensionGroup(Field):
@@ -142,23 +274,26 @@ class DimensionGroup(Field):
     :type datatype: string
 
     """
+    __slots__ = ('timeframes', 'datatype')
+    _definition_attrs = Field._definition_attrs + __slots__
+
     def __init__(self, name, timeframes=None, datatype='datetime', **kwargs):
         super(DimensionGroup, self).__init__(FieldType.DIMENSION_GROUP, name,
                                              type='time', **kwargs)
         self.timeframes = timeframes
         self.datatype = datatype
 
-    def _generate(self, f, fo):
-        if not self.timeframes and not fo.omit_time_frames_if_not_set:
-            self.timeframes = ['time', 'date', 'week', 'month']
+    def _generate(self, lines, fo):
+        timeframes = self.timeframes
+        if not timeframes and not fo.omit_time_frames_if_not_set:
+            timeframes = DEFAULT_TIMEFRAMES
 
-        if self.timeframes:
-            f.write('{indent}timeframes: {timeframes}\n'.
-                    format(indent=' ' * 2 * fo.indent_spaces,
-                           timeframes=json.dumps(self.timeframes).replace('"', '')))
+        r = fo.renderer
+        if timeframes:
+            lines.append(r.timeframes.format(
+                json.dumps(timeframes).replace('"', '')))
         if self.datatype:
-            f.write('{indent}datatype: {self.datatype}\n'.
-                    format(indent=' ' * 2 * fo.indent_spaces, self=self))
+            lines.append(r.datatype.format(self.datatype))
 
 
 class Measure(Field):
@@ -169,6 +304,9 @@ class Measure(Field):
     :type name: string
 
     """
+    __slots__ = ()
+    _definition_attrs = Field._definition_attrs
+
     def __init__(self, name, **kwargs):
         super(Measure, self).__init__(FieldType.MEASURE, name, **kwargs)
 
@@ -181,5 +319,157 @@ class Filter(Field):
     :type name: string
 
     """
+    __slots__ = ()
+    _definition_attrs = Field._definition_attrs
+
     def __init__(self, name, **kwargs):
         super(Filter, self).__init__(FieldType.FILTER, name, **kwargs)
+
+
+# Field classes by the LookML name of their type
+FIELD_CLASSES = {
+    'dimension': Dimension,
+    'dimension_group': DimensionGroup,
+    'filter': Filter,
+    'measure': Measure,
+}
+
+
+COLUMN = '{column}'
+
+# Stands in for the column while a template renders its shared pieces
+_COLUMN_SENTINEL = '@@lookmlgen-column@@'
+
+
+class FieldTemplate(object):
+    """Builds many similar fields, such as a ``sum_`` measure for every
+    numeric column, from attributes stored once.
+
+    ``{column}`` in the name and in any other string attribute is replaced
+    by the column name. The fields returned by :py:meth:`expand` keep only
+    the template and their column, and render by filling the column into
+    text the template renders once per set of format options. Their LookML
+    is identical to that of fields built individually with
+    :py:meth:`field`.
+
+    Usage::
+
+        sums = FieldTemplate(Measure, 'sum_{column}', type='sum',
+                             sql='${{column}}')
+        for f in sums.expand(['price', 'quantity']):
+            view.add_field(f)
+
+    :param field_class: Class of the fields, e.g.
+                        :class:`Measure` or :class:`Dimension`
+    :param name: Name of the fields, containing ``{column}``
+    :param kwargs: Other arguments of the field class
+    :type field_class: class
+    :type name: string
+
+    """
+    def __init__(self, field_class, name=COLUMN, **kwargs):
+        if COLUMN not in name:
+            raise ValueError('Template name {} does not contain {}'.
+                             format(name, COLUMN))
+        self.field_class = field_class
+        self.name = name
+        self.kwargs = kwargs
+        self.prototype = self._build(_COLUMN_SENTINEL)
+        self._pieces = {}
+
+    def field(self, column):
+        """Returns a separate :class:`Field` object for a column"""
+        return self._build(column)
+
+    def expand(self, columns):
+        """Returns a :class:`TemplatedField` for every column
+
+        :param columns: Column names
+        :type columns: iterable of strings
+        :rtype: list of :class:`TemplatedField`
+
+        """
+        return [TemplatedField(self, c) for c in columns]
+
+    def value(self, attr, column):
+        """Returns the value of a field attribute for a column"""
+        value = getattr(self.prototype, attr)
+        if isinstance(value, six.string_types) and _COLUMN_SENTINEL in value:
+            return value.replace(_COLUMN_SENTINEL, column)
+        return value
+
+    def pieces(self, fo):
+        """Returns the LookML of the fields split where the column goes"""
+        # Renderers are shared by equal format options and cheaper to get
+        # than their key
+        r = fo.renderer
+        pieces = self._pieces.get(r)
+        if pieces is None:
+            pieces = self._pieces[r] = \
+                self.prototype.render(fo).split(_COLUMN_SENTINEL)
+        return pieces
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state['_pieces'] = {}
+        return state
+
+    def _build(self, column):
+        kwargs = dict(
+            (k, v.replace(COLUMN, column)
+             if isinstance(v, six.string_types) else v)
+            for k, v in self.kwargs.items())
+        return self.field_class(self.name.replace(COLUMN, column), **kwargs)
+
+
+class TemplatedField(BaseGenerator):
+    """A field made by a :class:`FieldTemplate` for one column. It behaves
+    like a :class:`Field` whose attributes are read-only; use
+    :py:meth:`FieldTemplate.field` to get a field that can be changed.
+
+    :param template: Template the field is made from
+    :param column: Column name
+    :type template: :class:`FieldTemplate`
+    :type column: string
+
+    """
+    __slots__ = ('template', 'column', 'name')
+
+    def __init__(self, template, column):
+        super(TemplatedField, self).__init__()
+        self.template = template
+        self.column = column
+        # Names and field types are read for every field of a view, e.g. to
+        # order them, so they do not go through __getattr__
+        name = template.name
+        self.name = column if name == COLUMN else name.replace(COLUMN, column)
+
+    def __getattr__(self, attr):
+        if attr.startswith('__') or attr in TemplatedField.__slots__:
+            raise AttributeError(attr)
+        return self.template.value(attr, self.column)
+
+    @property
+    def field_type(self):
+        return self.template.prototype.field_type
+
+    @property
+    def _definition_attrs(self):
+        return self.template.prototype._definition_attrs
+
+    def generate_lookml(self, file=None, format_options=None):
+        """ Writes LookML for the field to a file or StringIO buffer.
+
+        :param file: File handle of a file open for writing or a
+                     StringIO object
+        :param format_options: Formatting options to use during generation
+        :type file: File handle or StringIO object
+        :type format_options:
+            :class:`~lookmlgen.base_generator.GeneratorFormatOptions`
+
+        """
+        f = file if file else self.file
+        f.write(self.render(format_options))
+
+    def _render(self, lines, fo):
+        lines.append(self.column.join(self.template.pieces(fo)))
@@ -0,0 +1,201 @@
+"""
+    File name: introspect.py
+    Date created: 10/18/26
+"""
+import re
+import timeit
+from concurrent import futures
+from itertools import groupby
+
+from .field import Dimension, DimensionGroup
+from .stats import active_stats
+from .view import View
+
+FETCH_SIZE = 1000
+
+# Checked in order against the lower-cased name of the SQL type, without
+# parameters or element types; the first rule whose pattern occurs in the
+# name wins.
+TYPE_RULES = [
+    ('timestamp', DimensionGroup, {'datatype': 'timestamp'}),
+    ('datetime', DimensionGroup, {'datatype': 'datetime'}),
+    ('date', DimensionGroup, {'datatype': 'date'}),
+    ('interval', Dimension, {}),
+    ('time', Dimension, {}),
+    ('bool', Dimension, {'type': 'yesno'}),
+    ('point', Dimension, {}),
+    ('char', Dimension, {}),
+    ('text', Dimension, {}),
+    ('int', Dimension, {'type': 'number'}),
+    ('real', Dimension, {'type': 'number'}),
+    ('float', Dimension, {'type': 'number'}),
+    ('double', Dimension, {'type': 'number'}),
+    ('numeric', Dimension, {'type': 'number'}),
+    ('decimal', Dimension, {'type': 'number'}),
+    ('number', Dimension, {'type': 'number'}),
+]
+
+# Parameters, e.g. varchar(20), and element types, e.g. ARRAY<INT64>
+_TYPE_PARAMS = re.compile(r'\(.*\)|<.*>')
+# Arrays written as integer[]
+_ARRAY_SUFFIX = re.compile(r'\[.*\]')
+
+
+def field_for_column(column_name, data_type, type_rules=TYPE_RULES):
+    """ Returns a :class:`~lookmlgen.field.Dimension` or
+    :class:`~lookmlgen.field.DimensionGroup` for a table column, choosing
+    the LookML type from the name of the column's SQL type, leaving out
+    parameters and element types, so ``ARRAY<INT64>`` is an array and not
+    a number. Unknown types, including arrays and structs, become string
+    dimensions.
+
+    :param column_name: Name of the column
+    :param data_type: SQL type of the column, e.g. 'varchar(20)'
+    :param type_rules: List of ``(pattern, field class, kwargs)`` rules
+    :type column_name: string
+    :type data_type: string
+    :type type_rules: list of tuples
+
+    """
+    t = _TYPE_PARAMS.sub('', data_type or '').lower()
+    if _ARRAY_SUFFIX.search(t):
+        t = 'array'
+    for pattern, cls, kwargs in type_rules:
+        if pattern in t:
+            return cls(column_name, **kwargs)
+    return Dimension(column_name)
+
+
+class Catalog(object):
+    """Reads the columns of every table in one query against
+    ``information_schema.columns``
+
+    :param connection: DB-API connection
+    :param placeholder: Parameter placeholder used by the driver's
+                        paramstyle, e.g. '%s' or '?'
+    :type placeholder: string
+
+    """
+    query = ('SELECT table_schema, table_name, column_name, data_type '
+             'FROM information_schema.columns{where} '
+             'ORDER BY table_schema, table_name, ordinal_position')
+    schema_filter = ' WHERE table_schema = {}'
+
+    def __init__(self, connection, placeholder='%s'):
+        self.connection = connection
+        self.placeholder = placeholder
+
+    def columns(self, schema=None):
+        """ Yields ``(schema, table, column, data_type)`` rows ordered by
+        table, optionally limited to one schema
+        """
+        params = ()
+        where = ''
+        if schema is not None:
+            where = self.schema_filter.format(self.placeholder)
+            params = (schema,)
+        cursor = self.connection.cursor()
+        try:
+            cursor.execute(self.query.format(where=where), params)
+            while True:
+                rows = cursor.fetchmany(FETCH_SIZE)
+                if not rows:
+                    break
+                for row in rows:
+                    yield row
+        finally:
+            cursor.close()
+
+
+class SQLiteCatalog(Catalog):
+    """Reads the columns of every table and view in a SQLite database in one
+    query. SQLite has a single schema, reported as 'main'.
+    """
+    query = ("SELECT 'main', m.name, p.name, p.type "
+             "FROM sqlite_master m JOIN pragma_table_info(m.name) p "
+             "WHERE m.type IN ('table', 'view') "
+             "AND m.name NOT LIKE 'sqlite_%'{where} "
+             "ORDER BY m.name, p.cid")
+    schema_filter = " AND 'main' = {}"
+
+    def __init__(self, connection, placeholder='?'):
+        super(SQLiteCatalog, self).__init__(connection, placeholder)
+
+
+def load_views(connection, schemas=None, catalog_class=Catalog,
+               max_workers=None, qualify_table_names=True,
+               type_rules=TYPE_RULES, placeholder=None):
+    """ Lazily yields a :class:`~lookmlgen.view.View` per table, with a
+    field per column, from a database catalog.
+
+    Columns for all tables are read with one catalog query per schema, or
+    a single query if ``schemas`` is not given. With ``max_workers`` the
+    schemas are queried concurrently, each worker using its own connection,
+    so ``connection`` must then be a callable returning a new connection.
+    Without ``max_workers``, a connection made by such a callable is used
+    for every schema and closed once all views have been yielded.
+
+    :param connection: DB-API connection, or a callable returning one
+    :param schemas: Schemas to load, defaults to all schemas
+    :param catalog_class: :class:`Catalog` subclass matching the database
+    :param max_workers: Number of threads querying schemas concurrently
+    :param qualify_table_names: Use ``schema.table`` as ``sql_table_name``
+    :param type_rules: Rules mapping SQL types to fields, see
+                       :func:`field_for_column`
+    :param placeholder: Parameter placeholder of the driver, see
+                        :class:`Catalog`; the catalog class's default if
+                        not set
+    :type schemas: list of strings
+    :type max_workers: int
+    :type qualify_table_names: bool
+    :type placeholder: string
+    :rtype: iterator of :class:`~lookmlgen.view.View`
+
+    """
+    def load(conn, schema):
+        catalog = catalog_class(conn) if placeholder is None else \
+            catalog_class(conn, placeholder)
+        return _views_from_rows(catalog.columns(schema), qualify_table_names,
+                                type_rules)
+
+    def load_with_new_connection(schema):
+        conn = connection()
+        try:
+            return list(load(conn, schema))
+        finally:
+            conn.close()
+
+    if not max_workers:
+        # Connections are not told apart from factories by being callable,
+        # as some, e.g. sqlite3 connections, are
+        owned = not hasattr(connection, 'cursor')
+        conn = connection() if owned else connection
+        try:
+            for schema in schemas or [None]:
+                for v in load(conn, schema):
+                    yield v
+        finally:
+            if owned:
+                conn.close()
+        return
+    if not schemas:
+        raise ValueError('Must provide schemas when using max_workers')
+    with futures.ThreadPoolExecutor(max_workers) as pool:
+        for views in pool.map(load_with_new_connection, schemas):
+            for v in views:
+                yield v
+
+
+def _views_from_rows(rows, qualify_table_names, type_rules):
+    stats = active_stats()
+    for (schema, table), columns in groupby(rows, lambda r: r[:2]):
+        columns = list(columns)
+        start = timeit.default_timer()
+        v = View(table, sql_table_name='{}.{}'.format(schema, table)
+                 if qualify_table_names else table)
+        for row in columns:
+            v.add_field(field_for_column(row[2], row[3], type_rules))
+        if stats is not None:
+            stats.add_stage('construct', timeit.default_timer() - start,
+                            count=len(columns))
+        yield v
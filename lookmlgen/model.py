@@ -0,0 +1,347 @@
+"""
+    File name: model.py
+    Date created: 10/18/26
+"""
+from collections import OrderedDict
+
+import six
+
+from .base_generator import BaseGenerator, Pieces, render_into
+from .project import VIEW_FILE_EXTENSION
+
+DEFAULT_INCLUDE_PATTERN = '{}' + VIEW_FILE_EXTENSION
+
+
+class Join(BaseGenerator):
+    """Generates LookML for a join within an :class:`Explore`
+
+    :param name: Name of the join, which is also the name of the joined
+                 view unless ``from_view`` is set
+    :param sql_on: SQL condition joining the view
+    :param relationship: Relationship of the join, e.g. 'many_to_one'
+    :param type: Type of the join, e.g. 'left_outer' or 'inner'
+    :param from_view: Name of the joined view if it differs from the name
+                      of the join
+    :type name: string
+    :type sql_on: string
+    :type relationship: string
+    :type type: string
+    :type from_view: string
+
+    Joins define ``__slots__`` because models may hold many thousands of
+    them.
+
+    """
+    __slots__ = ('name', 'sql_on', 'relationship', 'type', 'from_view')
+    _definition_attrs = ('name', 'from_view', 'type', 'relationship',
+                         'sql_on')
+
+    def __init__(self, name, sql_on=None, relationship=None, type=None,
+                 from_view=None, file=None):
+        super(Join, self).__init__(file=file)
+        self.name = name
+        self.sql_on = sql_on
+        self.relationship = relationship
+        self.type = type
+        self.from_view = from_view
+
+    @property
+    def view_name(self):
+        """Name of the joined view"""
+        return self.from_view if self.from_view else self.name
+
+    def generate_lookml(self, file=None, format_options=None):
+        """ Writes LookML for a join to a file or StringIO buffer.
+
+        :param file: File handle of a file open for writing or a
+                     StringIO object
+        :param format_options: Formatting options to use during generation
+        :type file: File handle or StringIO object
+        :type format_options:
+            :class:`~lookmlgen.base_generator.GeneratorFormatOptions`
+
+        """
+        f = file if file else self.file
+        f.write(self.render(format_options))
+
+    def _render(self, lines, fo):
+        r = fo.renderer
+        lines.append(r.join_open.format(self.name))
+        if self.from_view:
+            lines.append(r.join_from.format(self.from_view))
+        if self.type:
+            lines.append(r.type.format(self.type))
+        if self.relationship:
+            lines.append(r.relationship.format(self.relationship))
+        if self.sql_on:
+            lines.append(r.sql_on.format(self.sql_on))
+        lines.append(r.close)
+
+
+class Explore(BaseGenerator):
+    """Generates LookML for an explore within a :class:`Model`
+
+    :param name: Name of the explore, which is also the name of its base
+                 view unless ``view_name`` is set
+    :param view_name: Name of the base view if it differs from the name of
+                      the explore
+    :param label: Label to use for the explore
+    :param description: Description of the explore
+    :param joins: Joins to add to the explore
+    :type name: string
+    :type view_name: string
+    :type label: string
+    :type description: string
+    :type joins: iterable of :class:`Join`
+
+    """
+    _definition_attrs = ('name', 'view_name', 'label', 'description')
+
+    def __init__(self, name, view_name=None, label=None, description=None,
+                 joins=None, file=None):
+        super(Explore, self).__init__(file=file)
+        self.name = name
+        self.view_name = view_name
+        self.label = label
+        self.description = description
+        self.joins = OrderedDict()
+        for j in joins or []:
+            self.add_join(j)
+
+    @property
+    def base_view_name(self):
+        """Name of the explore's base view"""
+        return self.view_name if self.view_name else self.name
+
+    def view_names(self):
+        """Returns the names of the base view and every joined view"""
+        return [self.base_view_name] + \
+            [j.view_name for j in six.itervalues(self.joins)]
+
+    def add_join(self, join):
+        """Adds a :class:`Join` object to an :class:`Explore`"""
+        if join.name in self.joins:
+            raise ValueError('Join {} is already part of explore {}'.
+                             format(join.name, self.name))
+        self.joins[join.name] = join
+        return
+
+    def generate_lookml(self, file=None, format_options=None):
+        """ Writes LookML for an explore to a file or StringIO buffer.
+
+        :param file: File handle of a file open for writing or a
+                     StringIO object
+        :param format_options: Formatting options to use during generation
+        :type file: File handle or StringIO object
+        :type format_options:
+            :class:`~lookmlgen.base_generator.GeneratorFormatOptions`
+
+        """
+        f = file if file else self.file
+        f.write(self.render(format_options))
+
+    def _render(self, lines, fo):
+        r = fo.renderer
+        lines.append(r.explore_open.format(self.name))
+        if self.view_name:
+            lines.append(r.explore_from.format(self.view_name))
+        if self.label:
+            lines.append(r.view_label.format(self.label))
+        if self.description:
+            lines.append(r.explore_description.format(self.description))
+        for j in six.itervalues(self.joins):
+            if fo.newline_between_items:
+                lines.append('\n')
+            render_into(j, lines, fo)
+        lines.append('}\n')
+
+    def definition(self):
+        """ Returns the attributes that determine the generated LookML as a
+        dict, including the definitions of the explore's joins.
+
+        """
+        d = super(Explore, self).definition()
+        d['joins'] = [j.definition() for j in six.itervalues(self.joins)]
+        return d
+
+
+class Model(BaseGenerator):
+    """Generates a LookML model file with a connection, ``include:``
+    parameters and explores
+
+    Initialize a Model with your parameters, add :class:`Explore` objects
+    with :class:`Join` objects and then generate LookML for the model
+    using :py:meth:`~Model.generate_lookml`.
+
+    When ``views`` are given, every view referenced by an explore must be
+    one of them, which is checked against a name index when the model is
+    generated. ``views`` may be the :py:attr:`~lookmlgen.project.Project.views`
+    of a project. Unless ``includes`` is set, the model includes the file of
+    every view referenced by its explores, and the file of each refinement
+    of such a view that is one of the ``views``.
+
+    :param name: Name of the model
+    :param connection: Name of the database connection
+    :param explores: Explores to add to the model
+    :param views: Views available to the model, or their names, with
+                  refinements named ``+<view name>``
+    :param includes: Paths or glob patterns to include instead of the files
+                     of the referenced views
+    :param include_pattern: Format string turning a view name into the path
+                            of its file
+    :param file: File handle of a file open for writing or a StringIO object
+    :type name: string
+    :type connection: string
+    :type explores: iterable of :class:`Explore`
+    :type views: iterable of :class:`~lookmlgen.view.View` or strings, or a
+                 dict keyed by :py:attr:`~lookmlgen.view.View.lookml_name`
+    :type includes: list of strings
+    :type include_pattern: string
+    :type file: File handle or StringIO object
+
+    """
+    _definition_attrs = ('name', 'connection', 'includes', 'include_pattern')
+
+    def __init__(self, name, connection=None, explores=None, views=None,
+                 includes=None, include_pattern=DEFAULT_INCLUDE_PATTERN,
+                 file=None):
+        super(Model, self).__init__(file=file)
+        self.name = name
+        self.connection = connection
+        self.includes = includes
+        self.include_pattern = include_pattern
+        self.explores = OrderedDict()
+        self.views = None
+        if views is not None:
+            self.views = views if isinstance(views, dict) else OrderedDict(
+                (v if isinstance(v, six.string_types) else v.lookml_name, v)
+                for v in views)
+        for e in explores or []:
+            self.add_explore(e)
+
+    def add_explore(self, explore):
+        """Adds an :class:`Explore` object to a :class:`Model`"""
+        if explore.name in self.explores:
+            raise ValueError('Explore {} is already part of model {}'.
+                             format(explore.name, self.name))
+        self.explores[explore.name] = explore
+        return
+
+    def view_names(self):
+        """Returns the sorted names of the views referenced by the model's
+        explores
+        """
+        names = set()
+        for e in six.itervalues(self.explores):
+            names.update(e.view_names())
+        return sorted(names)
+
+    def missing_views(self):
+        """ Returns ``(explore name, view name)`` tuples for views
+        referenced by explores that are not part of the model's ``views``,
+        each pair once. Nothing is missing if the model has no ``views``.
+
+        :rtype: list of tuples
+
+        """
+        if self.views is None:
+            return []
+        views = self.views
+        missing = OrderedDict()
+        for e in six.itervalues(self.explores):
+            for name in e.view_names():
+                if name not in views:
+                    missing[(e.name, name)] = None
+        return list(missing)
+
+    def validate(self):
+        """ Checks that every view referenced by an explore is part of the
+        model's ``views``.
+
+        :raises ValueError: if a referenced view is missing
+
+        """
+        missing = self.missing_views()
+        if missing:
+            raise ValueError('Unknown views referenced by explores: {}'.format(
+                ', '.join('{} (explore {})'.format(v, e)
+                          for e, v in missing)))
+
+    def generate_lookml(self, file=None, format_options=None):
+        """ Writes LookML for the model to a file or StringIO buffer.
+
+        :param file: File handle of a file open for writing or a
+                     StringIO object
+        :param format_options: Formatting options to use during generation
+        :type file: File handle or StringIO object
+        :type format_options:
+            :class:`~lookmlgen.base_generator.GeneratorFormatOptions`
+        :raises ValueError: if an explore references an unknown view
+
+        """
+        if not file and not self.file:
+            raise ValueError('Must provide a file in either the constructor '
+                             'or as a parameter to generate_lookml()')
+        f = file if file else self.file
+        f.write(self.render(format_options))
+
+    def iter_lookml(self, format_options=None):
+        """ Yields LookML for the model lazily: one chunk for the connection
+        and includes and one chunk per explore.
+
+        :param format_options: Formatting options to use during generation
+        :type format_options:
+            :class:`~lookmlgen.base_generator.GeneratorFormatOptions`
+        :rtype: iterator of strings
+
+        """
+        fo = format_options if format_options else self.format_options
+        lines = Pieces()
+        self._render_header(lines, fo)
+        yield ''.join(lines)
+        for i, e in enumerate(six.itervalues(self.explores)):
+            lines = Pieces()
+            if i and fo.newline_between_items:
+                lines.append('\n')
+            render_into(e, lines, fo)
+            yield ''.join(lines)
+
+    def _render(self, lines, fo):
+        self._render_header(lines, fo)
+        for i, e in enumerate(six.itervalues(self.explores)):
+            if i and fo.newline_between_items:
+                lines.append('\n')
+            render_into(e, lines, fo)
+
+    def _render_header(self, lines, fo):
+        self.validate()
+        r = fo.renderer
+        if fo.warning_header_comment:
+            lines.append(fo.warning_header_comment)
+        if self.connection:
+            lines.append(r.connection.format(self.connection))
+            if fo.newline_between_items:
+                lines.append('\n')
+        includes = self.includes
+        if includes is None:
+            pattern = self.include_pattern
+            views = self.views or {}
+            includes = []
+            for name in self.view_names():
+                includes.append(pattern.format(name))
+                if '+' + name in views:
+                    includes.append(pattern.format('+' + name))
+        include = r.include
+        lines.extend(include.format(i) for i in includes)
+        if includes and fo.newline_between_items:
+            lines.append('\n')
+
+    def definition(self):
+        """ Returns the attributes that determine the generated LookML as a
+        dict, including the definitions of the model's explores.
+
+        """
+        d = super(Model, self).definition()
+        d['explores'] = [e.definition() for e in
+                         six.itervalues(self.explores)]
+        return d
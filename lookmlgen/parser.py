@@ -0,0 +1,467 @@
+"""
+    File name: parser.py
+    Date created: 10/18/26
+"""
+import fnmatch
+import io
+import os
+import re
+
+import six
+
+from .field import FIELD_CLASSES, DimensionGroup
+from .util import map_jobs
+from .view import DerivedTable, View
+
+# Parameters whose value is raw text terminated by ';;'
+RAW_VALUE_KEYS = frozenset(['html', 'expression', 'sql_preamble'])
+
+_TOKEN = re.compile(r'[ \t\r\n]*(?:'
+                    r'(#[^\n]*)|'
+                    r'"((?:[^"\\]|\\.)*)"|'
+                    r'([{}\[\],:])|'
+                    r'([^ \t\r\n{}\[\],:"#]+))')
+_KEY = re.compile(r'\w+\Z')
+_LITERAL = re.compile(r'[^\s{}\[\],:"#;]+\Z')
+
+# Token kinds are the numbers of the groups matching them in _TOKEN
+COMMENT, STRING, PUNCTUATION, LITERAL = range(1, 5)
+# Further kinds of values returned by _Lexer.entry()
+RAW, NAMED = range(5, 7)
+CLOSE = object()
+
+
+class LookMLSyntaxError(ValueError):
+    """Raised when LookML cannot be parsed"""
+    def __init__(self, message, lineno):
+        super(LookMLSyntaxError, self).__init__(
+            'Line {}: {}'.format(lineno, message))
+        self.lineno = lineno
+
+
+class _RawText(six.text_type):
+    """Raw value spanning several lines, with the column of its key"""
+    key_column = None
+
+
+class _Named(object):
+    """Value of a named block such as ``dimension: id { ... }``"""
+    __slots__ = ('name', 'entries')
+
+    def __init__(self, name, entries):
+        self.name = name
+        self.entries = entries
+
+
+class _Lexer(object):
+    """Splits LookML read line by line into tokens, so large files never
+    have to be held in memory as a whole.
+
+    Lines holding a single simple parameter, a block opening or a closing
+    brace, which make up nearly all generated LookML, are returned whole by
+    :py:meth:`entry` with one regular expression match per line. Anything
+    else is split into tokens.
+    """
+    def __init__(self, lines):
+        self._lines = iter(lines)
+        self._line = ''
+        self._pos = 0
+        # Offset of the current line in _line, after text left from the
+        # previous line
+        self._line_start = 0
+        self._peeked = None
+        self.lineno = 0
+        #: Column of the last token read
+        self.column = 0
+
+    def _next_line(self):
+        line = next(self._lines, None)
+        if line is None:
+            return False
+        self.lineno += 1
+        self._append_line(line)
+        return True
+
+    def _append_line(self, line):
+        rest = self._line[self._pos:]
+        self._line = rest + line
+        self._line_start = len(rest)
+        self._pos = 0
+
+    def entry(self):
+        """ Returns the next line as ``(key, kind, value)``, or CLOSE for a
+        closing brace, if it is a simple line. Returns None, leaving the
+        line to be read as tokens, otherwise.
+        """
+        if self._peeked is not None or self._line[self._pos:].strip():
+            return None
+        line = next(self._lines, None)
+        self.lineno += 1
+        while line is not None and not line.strip():
+            line = next(self._lines, None)
+            self.lineno += 1
+        if line is None:
+            self.lineno -= 1
+            return None
+        e = _simple_line(line)
+        if e is not None:
+            self._line, self._pos = '', 0
+            return e
+        self._append_line(line)
+        return None
+
+    def peek(self):
+        if self._peeked is None:
+            self._peeked = self._read()
+        return self._peeked
+
+    def next(self):
+        token = self.peek()
+        self._peeked = None
+        return token
+
+    def expect(self, text):
+        kind, value = self.next()
+        if value != text or kind == STRING:
+            self.error('Expected "{}" but found "{}"'.format(text, value))
+
+    def _read(self):
+        while True:
+            m = _TOKEN.match(self._line, self._pos)
+            if m is None:
+                if self._line[self._pos:].strip():
+                    # An unterminated string continues on the next line
+                    if not self._next_line():
+                        self.error('Unterminated string')
+                elif not self._next_line():
+                    return None, None
+                continue
+            self._pos = m.end()
+            kind = m.lastindex
+            if kind != COMMENT:
+                self.column = m.start(kind) - self._line_start
+                return kind, m.group(kind)
+
+    def read_raw(self):
+        """Returns the text up to the next ';;' and skips the ';;'"""
+        if self._peeked is not None:
+            self.error('Unexpected token before raw value')
+        parts = []
+        while True:
+            end = self._line.find(';;', self._pos)
+            if end >= 0:
+                parts.append(self._line[self._pos:end])
+                self._pos = end + 2
+                return ''.join(parts)
+            # Collect long values line by line instead of growing one string
+            parts.append(self._line[self._pos:])
+            self._line, self._pos = '', 0
+            if not self._next_line():
+                self.error('Missing ";;" after value')
+
+    def error(self, message):
+        raise LookMLSyntaxError(message, self.lineno)
+
+
+def _is_raw(key):
+    raw = _raw_keys.get(key)
+    if raw is None:
+        raw = _raw_keys[key] = key.startswith('sql') or \
+            key.endswith('_sql') or key in RAW_VALUE_KEYS
+    return raw
+
+
+_raw_keys = {}
+
+
+def _simple_line(line):
+    """ Returns ``(key, kind, value)`` for a line holding one parameter
+    whose value is a string, a literal, a literal opening a named block or
+    raw text up to ';;', CLOSE for a closing brace, or None for any other
+    line
+    """
+    s = line.strip()
+    if s == '}':
+        return CLOSE
+    key, colon, value = s.partition(':')
+    if not colon or not _KEY.match(key):
+        return None
+    value = value.lstrip()
+    if _is_raw(key):
+        if value.endswith(';;') and value.find(';;') == len(value) - 2:
+            return key, RAW, value[:-2]
+        return None
+    if value.endswith('"'):
+        if value.startswith('"') and len(value) > 1 and \
+                '"' not in value[1:-1] and '\\' not in value:
+            return key, STRING, value[1:-1]
+        return None
+    kind = LITERAL
+    if value.endswith('{'):
+        kind = NAMED
+        value = value[:-1].rstrip()
+    if _LITERAL.match(value):
+        return key, kind, value
+    return None
+
+
+def _parse_value(lex, key, key_column=0):
+    if _is_raw(key):
+        value = lex.read_raw()
+        if value.startswith('\n'):
+            value = _RawText(value)
+            value.key_column = key_column
+        return value
+    kind, value = lex.next()
+    if kind == STRING:
+        return value
+    if kind == PUNCTUATION:
+        if value == '{':
+            return _parse_entries(lex, '}')
+        if value == '[':
+            return _parse_list(lex)
+        lex.error('Unexpected "{}"'.format(value))
+    if kind is None:
+        lex.error('Missing value for {}'.format(key))
+    if lex.peek() == (PUNCTUATION, '{'):
+        lex.next()
+        return _Named(value, _parse_entries(lex, '}'))
+    return value
+
+
+def _parse_list(lex):
+    """Returns the items of a list. Items written as ``key: value``, as in
+    ``filters: [status: "complete"]``, are returned as tuples.
+    """
+    items = []
+    while True:
+        kind, value = lex.next()
+        if kind is None:
+            lex.error('Missing "]"')
+        if kind == PUNCTUATION:
+            if value == ']':
+                return items
+            if value == ',':
+                continue
+            if value == '[':
+                items.append(_parse_list(lex))
+                continue
+            if value == '{':
+                items.append(_parse_entries(lex, '}'))
+                continue
+            lex.error('Unexpected "{}" in list'.format(value))
+        if lex.peek() == (PUNCTUATION, ':'):
+            lex.next()
+            items.append((value, _parse_list_value(lex)))
+        else:
+            items.append(value)
+
+
+def _parse_list_value(lex):
+    kind, value = lex.next()
+    if kind == PUNCTUATION:
+        if value == '[':
+            return _parse_list(lex)
+        if value == '{':
+            return _parse_entries(lex, '}')
+        lex.error('Unexpected "{}" in list'.format(value))
+    if kind is None:
+        lex.error('Missing "]"')
+    return value
+
+
+def _parse_entries(lex, end):
+    entries = []
+    while True:
+        e = lex.entry()
+        if e is not None:
+            if e is CLOSE:
+                if end != '}':
+                    lex.error('Unexpected "}"')
+                return entries
+            key, kind, value = e
+            if kind == NAMED:
+                value = _Named(value, _parse_entries(lex, '}'))
+            entries.append((key, value))
+            continue
+        kind, key = lex.next()
+        if kind is None:
+            if end is None:
+                return entries
+            lex.error('Missing "{}"'.format(end))
+        if kind == PUNCTUATION and key == end:
+            return entries
+        if kind != LITERAL:
+            lex.error('Expected a parameter name but found "{}"'.
+                      format(key))
+        column = lex.column
+        lex.expect(':')
+        entries.append((key, _parse_value(lex, key, column)))
+
+
+def _flag(value):
+    return value == 'yes'
+
+
+def _sql(value):
+    return value.strip()
+
+
+def _derived_table_sql(value):
+    if not value.startswith('\n'):
+        return value.strip()
+    # Multi-line SQL is written on its own lines with ' ;;' following the
+    # last line. Its lines are indented one level deeper than the sql
+    # parameter, which is two levels into the view, and blank lines are not
+    # indented, so only that indent is removed and the SQL is kept exactly.
+    column = getattr(value, 'key_column', None) or 0
+    prefix = ' ' * (column + column // 2)
+    value = value[1:]
+    if value.endswith(' '):
+        value = value[:-1]
+    if not prefix:
+        return value
+    n = len(prefix)
+    return ''.join(line[n:] if line.startswith(prefix) else line
+                   for line in value.splitlines(True))
+
+
+def _build_field(kind, named):
+    cls = FIELD_CLASSES[kind]
+    kwargs = {}
+    for key, value in named.entries:
+        if key in ('hidden', 'primary_key'):
+            kwargs[key] = _flag(value)
+        elif key == 'sql':
+            sql = _sql(value)
+            if sql != '${TABLE}.' + named.name:
+                kwargs['sql'] = sql
+        elif key in ('label', 'group_label', 'description', 'datatype',
+                     'timeframes'):
+            kwargs[key] = value
+        elif key == 'type' and cls is not DimensionGroup:
+            kwargs[key] = value
+    if cls is DimensionGroup:
+        # Without a datatype parameter the group must not get the default
+        kwargs.setdefault('datatype', None)
+    return cls(named.name, **kwargs)
+
+
+def _build_derived_table(entries):
+    kwargs = {'sql': None}
+    for key, value in entries:
+        if key == 'sql':
+            kwargs['sql'] = _derived_table_sql(value)
+        elif key == 'sql_trigger_value':
+            kwargs[key] = _sql(value)
+        elif key == 'indexes':
+            kwargs[key] = value
+    return DerivedTable(**kwargs)
+
+
+def _build_view(named):
+    name = named.name
+    refinement = name.startswith('+')
+    v = View(name[1:] if refinement else name, refinement=refinement)
+    for key, value in named.entries:
+        if key in FIELD_CLASSES and isinstance(value, _Named):
+            v.add_field(_build_field(key, value))
+        elif key == 'derived_table' and isinstance(value, list):
+            v.set_derived_table(_build_derived_table(value))
+        elif key == 'sql_table_name':
+            v.sql_table_name = _sql(value)
+        elif key == 'label':
+            v.label = value
+        elif key == 'extends' and isinstance(value, list):
+            v.extends = value
+        elif key == 'extension':
+            v.extension_required = value == 'required'
+    return v
+
+
+def iter_views(lines):
+    """ Lazily parses LookML and yields a :class:`~lookmlgen.view.View` for
+    every view in it. Other top level objects, and view and field
+    parameters that the object model does not support, are skipped.
+
+    Parsing streams over the input line by line and only holds one view in
+    memory at a time.
+
+    :param lines: Open file or any iterable of lines of LookML
+    :type lines: File handle or iterable of strings
+    :rtype: iterator of :class:`~lookmlgen.view.View`
+    :raises LookMLSyntaxError: if the LookML is malformed
+
+    """
+    lex = _Lexer(lines)
+    while True:
+        e = lex.entry()
+        if e is not None:
+            if e is CLOSE:
+                lex.error('Unexpected "}"')
+            key, kind, value = e
+            if kind == NAMED:
+                value = _Named(value, _parse_entries(lex, '}'))
+        else:
+            kind, key = lex.next()
+            if kind is None:
+                return
+            if kind != LITERAL:
+                lex.error('Expected a parameter name but found "{}"'.
+                          format(key))
+            lex.expect(':')
+            value = _parse_value(lex, key)
+        if key == 'view' and isinstance(value, _Named):
+            yield _build_view(value)
+
+
+def loads(text):
+    """ Parses a string of LookML and returns the views in it
+
+    :param text: LookML
+    :type text: string
+    :rtype: list of :class:`~lookmlgen.view.View`
+
+    """
+    return list(iter_views(io.StringIO(six.text_type(text))))
+
+
+def load(path):
+    """ Parses a LookML file and returns the views in it
+
+    :param path: Path of the file
+    :type path: string
+    :rtype: list of :class:`~lookmlgen.view.View`
+
+    """
+    with io.open(path, 'r', encoding='utf-8') as f:
+        return list(iter_views(f))
+
+
+def load_directory(directory, pattern='*.view.lkml', executor='process',
+                   max_workers=None):
+    """ Parses every file matching a pattern in a directory tree and returns
+    the views in them.
+
+    :param directory: Directory to search
+    :param pattern: Glob pattern for file names
+    :param executor: 'thread', 'process', an existing
+                     :class:`concurrent.futures.Executor`, or None to parse
+                     the files serially
+    :param max_workers: Number of workers for a new pool
+    :type directory: string
+    :type pattern: string
+    :type executor: string or :class:`concurrent.futures.Executor`
+    :type max_workers: int
+    :return: Views keyed by path relative to the directory, in path order
+    :rtype: list of (string, list of :class:`~lookmlgen.view.View`) tuples
+
+    """
+    paths = []
+    for root, dirs, files in os.walk(directory):
+        dirs.sort()
+        for name in sorted(fnmatch.filter(files, pattern)):
+            paths.append(os.path.join(root, name))
+    results = map_jobs(load, [(p,) for p in paths], executor, max_workers)
+    return [(os.path.relpath(p, directory), views)
+            for p, views in zip(paths, results)]
@@ -0,0 +1,492 @@
+"""
+    File name: project.py
+    Date created: 10/18/26
+"""
+import hashlib
+import io
+import json
+import os
+import re
+import timeit
+from collections import OrderedDict
+
+import six
+
+from . import __version__
+from .stats import active_stats, collect
+from .util import map_jobs
+from .validate import validate
+
+VIEW_FILE_EXTENSION = '.view.lkml'
+MANIFEST_FILE_NAME = '.lookmlgen-manifest.json'
+MANIFEST_VERSION = 1
+TEMP_FILE_SUFFIX = '.lookmlgen-tmp'
+FSYNC_POLICIES = ('none', 'file', 'end')
+SHARD_KEYS = ('hash', 'schema')
+# Hex digits of the hash of a view name naming its shard, 256 shards for 2
+SHARD_HASH_CHARS = 2
+# Shard of views without a schema when sharding by schema
+DEFAULT_SHARD = 'default'
+
+_UNSAFE_DIRECTORY_CHARS = re.compile(r'[^\w.-]+')
+
+_replace = getattr(os, 'replace', os.rename)
+
+
+class ViewTiming(object):
+    """Timing information for a single view written by a :class:`Project`
+
+    :param name: Name of the view
+    :param path: Path of the file the view was written to
+    :param seconds: Wall clock time spent rendering and writing the view
+    :param bytes_written: Number of bytes written to the file, which is
+                          encoded as UTF-8
+    :type name: string
+    :type path: string
+    :type seconds: float
+    :type bytes_written: int
+
+    When statistics are collected with :func:`~lookmlgen.stats.collect`,
+    ``stats`` holds the :class:`~lookmlgen.stats.GenerationStats` recorded
+    for the view.
+
+    """
+    def __init__(self, name, path, seconds, bytes_written):
+        self.name = name
+        self.path = path
+        self.seconds = seconds
+        self.bytes_written = bytes_written
+        self.stats = None
+
+    def __repr__(self):
+        return 'ViewTiming({self.name!r}, {self.seconds:.6f}s, ' \
+               '{self.bytes_written} bytes)'.format(self=self)
+
+
+class Project(object):
+    """Generates LookML for many :class:`~lookmlgen.view.View` objects,
+    writing one ``<view name>.view.lkml`` file per view, or
+    ``+<view name>.view.lkml`` for a refinement, into an output directory.
+
+    Views are rendered and written concurrently using a thread or process
+    pool. The contents of each file are identical to what
+    :py:meth:`~lookmlgen.view.View.generate_lookml` writes.
+
+    Each view is written with a single call to a temporary file next to its
+    final path. Only once every view has been written are the temporary
+    files renamed into place, each rename replacing the old file
+    atomically, so a run that fails part way leaves the previous files
+    untouched.
+
+    :param views: Views to include in the project
+    :param output_dir: Directory the view files are written to
+    :param format_options: Formatting options to use for every view. If not
+                           set, each view uses its own format options.
+    :param executor: 'thread' or 'process' to create a pool of that kind,
+                     an existing :class:`concurrent.futures.Executor`, or
+                     None to write the views serially
+    :param max_workers: Number of workers for a pool created by the project
+    :param fsync: When to flush written files to disk: 'none' to leave it
+                  to the operating system, 'file' to sync every file as it
+                  is written, or 'end' to sync every file after all of
+                  them are written and before they are renamed into place.
+                  Either way the directories are synced after the renames.
+    :param shard: Write views into subdirectories of the output directory:
+                  'hash' for the first :data:`SHARD_HASH_CHARS` hex digits
+                  of a hash of the view name, 'schema' for the schema of
+                  the view's ``sql_table_name``, or a function returning
+                  the subdirectory for a view. None writes all views into
+                  the output directory.
+    :type views: iterable of :class:`~lookmlgen.view.View`
+    :type output_dir: string
+    :type format_options:
+        :class:`~lookmlgen.base_generator.GeneratorFormatOptions`
+    :type executor: string or :class:`concurrent.futures.Executor`
+    :type max_workers: int
+    :type fsync: string
+    :type shard: string or function
+
+    """
+    def __init__(self, views=None, output_dir='.', format_options=None,
+                 executor='thread', max_workers=None, fsync='none',
+                 shard=None):
+        if fsync not in FSYNC_POLICIES:
+            raise ValueError('fsync {} is not one of {}'.format(
+                fsync, ', '.join(FSYNC_POLICIES)))
+        if shard is not None and shard not in SHARD_KEYS and \
+                not callable(shard):
+            raise ValueError('shard {} is not one of {} or a function'.
+                             format(shard, ', '.join(SHARD_KEYS)))
+        self.views = OrderedDict()
+        self.output_dir = output_dir
+        self.format_options = format_options
+        self.executor = executor
+        self.max_workers = max_workers
+        self.fsync = fsync
+        self.shard = shard
+        for v in views or []:
+            self.add_view(v)
+
+    def add_view(self, view):
+        """ Adds a :class:`~lookmlgen.view.View` object to a
+        :class:`Project`. Views are keyed by their
+        :py:attr:`~lookmlgen.view.View.lookml_name`, so a view and a
+        refinement of it can be part of the same project.
+
+        """
+        key = view.lookml_name
+        if key in self.views:
+            raise ValueError('View {} is already part of the project'.
+                             format(key))
+        self.views[key] = view
+        return
+
+    def validate(self, format_options=None):
+        """ Checks the ``${...}`` references of every view in the project,
+        see :func:`~lookmlgen.validate.validate`
+
+        :param format_options: Formatting options to use during generation
+        :type format_options:
+            :class:`~lookmlgen.base_generator.GeneratorFormatOptions`
+        :rtype: list of :class:`~lookmlgen.validate.Problem`
+
+        """
+        fo = format_options if format_options else self.format_options
+        return validate(self.views, fo)
+
+    def view_shard(self, view):
+        """Returns the subdirectory a view is written to, or None if the
+        project is not sharded. A refinement is in the shard of the view it
+        refines when sharding by hash or schema.
+        """
+        shard = self.shard
+        if shard is None:
+            return None
+        if shard == 'hash':
+            return hashlib.sha1(view.name.encode('utf-8')).hexdigest()[
+                :SHARD_HASH_CHARS]
+        if shard == 'schema':
+            if view.refinement:
+                # Refinements rarely set sql_table_name; follow the view
+                view = self.views.get(view.name, view)
+            schema = view.sql_table_name.rpartition('.')[0] \
+                if view.sql_table_name else ''
+            schema = _UNSAFE_DIRECTORY_CHARS.sub('_', schema).strip('_.')
+            return schema or DEFAULT_SHARD
+        return shard(view)
+
+    def relative_view_path(self, view):
+        """Returns the path of a view's file relative to the output
+        directory, using '/' between a shard and the file name
+        """
+        name = view.lookml_name + VIEW_FILE_EXTENSION
+        shard = self.view_shard(view)
+        return shard + '/' + name if shard else name
+
+    def include_globs(self, views=None, prefix=''):
+        """ Returns ``include:`` globs matching the files of views, one per
+        shard, to pass as the ``includes`` of a
+        :class:`~lookmlgen.model.Model`.
+
+        :param views: Views or names of views in the project, all views by
+                      default
+        :param prefix: Path of the output directory relative to the model
+                       file, e.g. '/views/'
+        :type views: iterable of :class:`~lookmlgen.view.View` or strings
+        :type prefix: string
+        :rtype: list of strings
+
+        """
+        if self.shard is None:
+            return [prefix + '*' + VIEW_FILE_EXTENSION]
+        if views is None:
+            views = six.itervalues(self.views)
+        shards = set()
+        for v in views:
+            if isinstance(v, six.string_types):
+                v = self.views[v]
+            shards.add(self.view_shard(v))
+        return [prefix + s + '/*' + VIEW_FILE_EXTENSION
+                for s in sorted(shards)]
+
+    def view_path(self, view):
+        """Returns the path of the file a view is written to"""
+        return os.path.join(self.output_dir, self.relative_view_path(view))
+
+    def manifest_path(self):
+        """Returns the path of the manifest used for incremental generation"""
+        return os.path.join(self.output_dir, MANIFEST_FILE_NAME)
+
+    def generate_lookml(self, format_options=None, incremental=False):
+        """ Writes LookML for every view in the project to its own file.
+
+        A manifest with a hash of each view's definition and formatting
+        options is stored in the output directory. When ``incremental`` is
+        set, only views whose hash changed since the last run, or whose file
+        is missing, are written, and files of views that are no longer part
+        of the project are deleted.
+
+        :param format_options: Formatting options to use during generation
+        :param incremental: Only write views that changed since the last run
+        :type format_options:
+            :class:`~lookmlgen.base_generator.GeneratorFormatOptions`
+        :type incremental: bool
+        :return: Timings for the views that were written, in the order they
+                 were added
+        :rtype: list of :class:`ViewTiming`
+
+        """
+        fo = format_options if format_options else self.format_options
+        stats = active_stats()
+        jobs, manifest, previous = self._plan(fo, incremental, stats)
+        try:
+            timings = map_jobs(_write_view, jobs, self.executor,
+                               self.max_workers)
+        except BaseException:
+            _discard(jobs)
+            raise
+        self._finish(jobs, timings, manifest, previous, stats)
+        return timings
+
+    def agenerate_lookml(self, format_options=None, incremental=False,
+                         executor=None, max_concurrency=None):
+        """ Returns a coroutine that writes LookML for every view in the
+        project like :py:meth:`generate_lookml`, without blocking the event
+        loop. Requires Python 3.5 or later.
+
+        Hashing, rendering and writing run on an executor. At most
+        ``max_concurrency`` views are queued on it at a time, and each view
+        is written with a single call.
+
+        :param format_options: Formatting options to use during generation
+        :param incremental: Only write views that changed since the last run
+        :param executor: 'thread' or 'process' to create a pool of that
+                         kind, or an existing
+                         :class:`concurrent.futures.Executor`. Defaults to
+                         the project's executor, or a thread pool if that
+                         is None.
+        :param max_concurrency: Number of views queued on the executor at
+                                a time, twice the number of workers by
+                                default
+        :type format_options:
+            :class:`~lookmlgen.base_generator.GeneratorFormatOptions`
+        :type incremental: bool
+        :type executor: string or :class:`concurrent.futures.Executor`
+        :type max_concurrency: int
+        :return: Coroutine returning a list of :class:`ViewTiming`
+
+        """
+        from .aio import agenerate_project
+        return agenerate_project(self, format_options, incremental,
+                                 executor, max_concurrency)
+
+    def _plan(self, fo, incremental, stats):
+        """Hashes the views and returns the jobs for the views to write,
+        the new manifest and the previous one
+        """
+        if not os.path.isdir(self.output_dir):
+            os.makedirs(self.output_dir)
+        previous = self._load_manifest() if incremental else {}
+        manifest = OrderedDict()
+        jobs = []
+        directories = set([self.output_dir])
+        hash_start = timeit.default_timer()
+        for v in six.itervalues(self.views):
+            relative_path = self.relative_view_path(v)
+            path = os.path.join(self.output_dir, relative_path)
+            digest = definition_hash(v, fo if fo else v.format_options)
+            key = v.lookml_name
+            manifest[key] = OrderedDict(
+                [('hash', digest), ('path', relative_path)])
+            if previous.get(key) == manifest[key] and \
+                    os.path.exists(path):
+                continue
+            directory = os.path.dirname(path)
+            if directory not in directories:
+                directories.add(directory)
+                if not os.path.isdir(directory):
+                    os.makedirs(directory)
+            jobs.append((v, path, fo, stats is not None,
+                         path + TEMP_FILE_SUFFIX, self.fsync == 'file'))
+        if stats is not None:
+            stats.add_stage('hash', timeit.default_timer() - hash_start,
+                            count=len(self.views))
+        return jobs, manifest, previous
+
+    def _finish(self, jobs, timings, manifest, previous, stats):
+        """Merges statistics, moves the written files into place, removes
+        stale files and saves the manifest
+        """
+        if stats is not None:
+            for t in timings:
+                stats.merge(t.stats)
+        start = timeit.default_timer()
+        if self.fsync == 'end':
+            _sync([job[4] for job in jobs])
+        for job in jobs:
+            _replace(job[4], job[1])
+        if jobs and self.fsync != 'none':
+            _sync_directories(set(os.path.dirname(job[1]) for job in jobs))
+        if stats is not None:
+            stats.add_stage('commit', timeit.default_timer() - start,
+                            count=len(jobs))
+        for name, entry in six.iteritems(previous):
+            if manifest.get(name, {}).get('path') != entry['path']:
+                path = os.path.join(self.output_dir, entry['path'])
+                _remove(path)
+                if '/' in entry['path']:
+                    # Removes the shard directory once it is empty
+                    _remove_directory(os.path.dirname(path))
+        self._save_manifest(manifest)
+
+    def iter_lookml(self, format_options=None):
+        """ Yields ``(path, chunks)`` pairs for every view in the project,
+        where ``path`` is relative to the output directory and ``chunks``
+        is an iterator over the view's LookML from
+        :py:meth:`~lookmlgen.view.View.iter_lookml`.
+
+        Nothing is written to the output directory. Use this to stream a
+        project into an archive or upload without holding it in memory.
+        Consume each view's chunks before advancing to the next pair.
+
+        :param format_options: Formatting options to use during generation
+        :type format_options:
+            :class:`~lookmlgen.base_generator.GeneratorFormatOptions`
+        :rtype: iterator of (string, iterator of strings) tuples
+
+        """
+        fo = format_options if format_options else self.format_options
+        for v in six.itervalues(self.views):
+            yield self.relative_view_path(v), v.iter_lookml(fo)
+
+    def _load_manifest(self):
+        return _read_manifest(self.manifest_path())
+
+    def _save_manifest(self, views):
+        manifest = OrderedDict([('version', MANIFEST_VERSION),
+                                ('lookmlgen_version', __version__),
+                                ('views', views)])
+        path = self.manifest_path()
+        with io.open(path + TEMP_FILE_SUFFIX, 'wb') as f:
+            f.write(json.dumps(manifest, indent=1).encode('utf-8'))
+        _replace(path + TEMP_FILE_SUFFIX, path)
+
+
+def definition_hash(generator, format_options):
+    """ Returns a hex digest identifying the LookML a generator produces
+    with the given formatting options.
+
+    :param generator: View or other generator to hash
+    :param format_options: Formatting options to use during generation
+    :type generator: :class:`~lookmlgen.base_generator.BaseGenerator`
+    :type format_options:
+        :class:`~lookmlgen.base_generator.GeneratorFormatOptions`
+
+    """
+    data = json.dumps([generator.definition(), format_options.definition()],
+                      separators=(',', ':'), default=repr)
+    return hashlib.sha1(data.encode('utf-8')).hexdigest()
+
+
+def read_index(output_dir):
+    """ Returns the path of every view's file relative to the output
+    directory of a project, as recorded in the manifest when the project
+    was last generated, so a view's file can be found without listing
+    the shards.
+
+    :param output_dir: Output directory of the project
+    :type output_dir: string
+    :return: Paths keyed by :py:attr:`~lookmlgen.view.View.lookml_name`,
+             empty if the project has not been generated
+    :rtype: dict
+
+    """
+    views = _read_manifest(os.path.join(output_dir, MANIFEST_FILE_NAME))
+    return OrderedDict((name, entry['path'])
+                       for name, entry in six.iteritems(views))
+
+
+def _read_manifest(path):
+    try:
+        with open(path, 'r') as f:
+            manifest = json.load(f, object_pairs_hook=OrderedDict)
+    except (IOError, OSError, ValueError):
+        return {}
+    if manifest.get('version') != MANIFEST_VERSION or \
+            manifest.get('lookmlgen_version') != __version__:
+        return {}
+    return manifest.get('views', {})
+
+
+def _remove(path):
+    try:
+        os.remove(path)
+    except OSError:
+        pass
+
+
+def _remove_directory(path):
+    try:
+        os.rmdir(path)
+    except OSError:
+        pass
+
+
+def _discard(jobs):
+    """Removes the temporary files of jobs that were not committed"""
+    for job in jobs:
+        _remove(job[4])
+
+
+def _sync(paths):
+    """Flushes each of the files to disk, leaving other files on the host
+    alone
+    """
+    for path in paths:
+        fd = os.open(path, os.O_RDONLY)
+        try:
+            os.fsync(fd)
+        finally:
+            os.close(fd)
+
+
+def _sync_directories(directories):
+    # Makes renames durable; not possible on every platform
+    for d in directories:
+        try:
+            fd = os.open(d or '.', os.O_RDONLY)
+        except OSError:
+            continue
+        try:
+            os.fsync(fd)
+        except OSError:
+            pass
+        finally:
+            os.close(fd)
+
+
+def _write_view(view, path, format_options, collect_stats=False,
+                temp_path=None, fsync=False):
+    if collect_stats:
+        with collect() as stats:
+            timing = _write_view(view, path, format_options, False,
+                                 temp_path, fsync)
+        timing.stats = stats
+        return timing
+    start = timeit.default_timer()
+    lookml = view.render(format_options)
+    write_start = timeit.default_timer()
+    # Encoded explicitly, so files are the same whatever the locale and
+    # newline convention of the platform
+    data = lookml.encode('utf-8') \
+        if isinstance(lookml, six.text_type) else lookml
+    with io.open(temp_path if temp_path else path, 'wb') as f:
+        f.write(data)
+        if fsync:
+            f.flush()
+            os.fsync(f.fileno())
+    end = timeit.default_timer()
+    stats = active_stats()
+    if stats is not None:
+        stats.add_stage('write', end - write_start, len(data))
+    return ViewTiming(view.lookml_name, path, end - start, len(data))
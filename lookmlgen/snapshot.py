@@ -0,0 +1,287 @@
+"""
+    File name: snapshot.py
+    Date created: 10/18/26
+
+    Checks generated LookML against snapshots stored in a directory, to
+    make sure changes to the library do not change its output.
+"""
+import difflib
+import hashlib
+import io
+import json
+import os
+from collections import OrderedDict
+
+import six
+
+from .project import TEMP_FILE_SUFFIX, VIEW_FILE_EXTENSION, _remove, \
+    _replace
+from .util import map_jobs
+
+SNAPSHOT_INDEX_NAME = '.lookmlgen-snapshots.json'
+SNAPSHOT_INDEX_VERSION = 2
+# Lines of a unified diff kept per changed view
+MAX_DIFF_LINES = 200
+# Views checked per task sent to a worker
+BATCH_SIZE = 64
+
+UNCHANGED = 'unchanged'
+CHANGED = 'changed'
+ADDED = 'added'
+REMOVED = 'removed'
+
+
+class SnapshotMismatch(ValueError):
+    """Raised by :py:meth:`SnapshotReport.check` with the report"""
+    def __init__(self, report):
+        super(SnapshotMismatch, self).__init__(report.summary(diffs=True))
+        self.report = report
+
+
+class SnapshotReport(object):
+    """Result of :func:`check_snapshots`
+
+    :ivar unchanged: Names of views whose LookML matches their snapshot
+    :ivar changed: Names of views whose LookML differs from their snapshot,
+                   mapped to a unified diff from the snapshot to the new
+                   LookML
+    :ivar added: Names of views without a snapshot
+    :ivar removed: Names of snapshots without a view
+    :ivar updated: Whether the snapshots were updated to match the views
+
+    Views are named by their :py:attr:`~lookmlgen.view.View.lookml_name`.
+
+    """
+    def __init__(self):
+        self.unchanged = []
+        self.changed = OrderedDict()
+        self.added = []
+        self.removed = []
+        self.updated = False
+
+    @property
+    def ok(self):
+        """True if every view matches its snapshot and no snapshot is left
+        over
+        """
+        return not (self.changed or self.added or self.removed)
+
+    def summary(self, diffs=False):
+        """ Describes the report in a few lines.
+
+        :param diffs: Include the diffs of changed views
+        :type diffs: bool
+        :rtype: string
+
+        """
+        lines = ['{} unchanged, {} changed, {} added, {} removed{}'.format(
+            len(self.unchanged), len(self.changed), len(self.added),
+            len(self.removed), ' (snapshots updated)' if self.updated else
+            '')]
+        for status in (ADDED, REMOVED):
+            lines.extend('{}: {}'.format(status, name)
+                         for name in getattr(self, status))
+        for name, diff in six.iteritems(self.changed):
+            lines.append('{}: {}'.format(CHANGED, name))
+            if diffs:
+                lines.append(diff)
+        return '\n'.join(lines)
+
+    def check(self):
+        """ Raises if anything differs from the snapshots.
+
+        :raises SnapshotMismatch: if the report is not :py:attr:`ok`
+
+        """
+        if not self.ok:
+            raise SnapshotMismatch(self)
+
+
+def check_snapshots(views, directory, format_options=None, update=False,
+                    executor='process', max_workers=None):
+    """ Renders views in parallel and compares them with the snapshots in a
+    directory, one ``<view name>.view.lkml`` file per view.
+
+    The directory also holds an index of a hash, the size and the
+    modification time of every snapshot. A view whose LookML hashes the
+    same as its snapshot, when the snapshot file still has the size and
+    modification time in the index, is not compared any further, so its
+    snapshot file is never read. Otherwise, e.g. after a snapshot was
+    edited by hand, the snapshot is read, compared byte by byte and, if it
+    differs, diffed. Views are sent to the workers in batches of
+    :data:`BATCH_SIZE`, and rendering, hashing and diffing run on the
+    workers, which only return diffs, so checking thousands of views moves
+    little data between processes.
+
+    With ``update`` set, the snapshots of changed and added views are
+    written, those of removed views deleted and the index saved, all at
+    once.
+
+    Usage in a test::
+
+        def test_production_views():
+            views = list(spec.iter_views(open('views.jsonl'), 'jsonl'))
+            check_snapshots(views, 'tests/snapshots').check()
+
+    :param views: Views to check, as an iterable or a dict such as
+                  :py:attr:`~lookmlgen.project.Project.views`
+    :param directory: Directory of the snapshots
+    :param format_options: Formatting options to render the views with.
+                           If not set, each view uses its own format
+                           options.
+    :param update: Update the snapshots to match the views
+    :param executor: 'thread' or 'process' to create a pool of that kind,
+                     an existing :class:`concurrent.futures.Executor`, or
+                     None to check the views serially
+    :param max_workers: Number of workers for a pool created here
+    :type views: iterable or dict of :class:`~lookmlgen.view.View`
+    :type directory: string
+    :type format_options:
+        :class:`~lookmlgen.base_generator.GeneratorFormatOptions`
+    :type update: bool
+    :type executor: string or :class:`concurrent.futures.Executor`
+    :type max_workers: int
+    :rtype: :class:`SnapshotReport`
+    :raises ValueError: if two views have the same name
+
+    """
+    if isinstance(views, dict):
+        views = six.itervalues(views)
+    index = _load_index(directory)
+    existing = _snapshot_names(directory)
+    jobs = []
+    names = set()
+    for v in views:
+        name = v.lookml_name
+        if name in names:
+            raise ValueError('View {} is defined more than once'.
+                             format(name))
+        names.add(name)
+        # The index is only trusted for snapshots that still exist
+        entry = index.get(name) if name in existing else None
+        jobs.append((v, format_options, entry,
+                     os.path.join(directory, name + VIEW_FILE_EXTENSION),
+                     update))
+    if update and not os.path.isdir(directory):
+        os.makedirs(directory)
+    batches = [(jobs[i:i + BATCH_SIZE],)
+               for i in range(0, len(jobs), BATCH_SIZE)]
+    try:
+        results = [r for batch in map_jobs(_check_views, batches, executor,
+                                           max_workers)
+                   for r in batch]
+    except BaseException:
+        if update:
+            _discard(jobs)
+        raise
+
+    report = SnapshotReport()
+    new_index = OrderedDict()
+    for name, status, entry, diff in results:
+        new_index[name] = entry
+        if status == UNCHANGED:
+            report.unchanged.append(name)
+        elif status == CHANGED:
+            report.changed[name] = diff
+        else:
+            report.added.append(name)
+    report.removed = sorted(existing - names)
+    if update:
+        for name, status, entry, _ in results:
+            if status != UNCHANGED:
+                path = os.path.join(directory, name + VIEW_FILE_EXTENSION)
+                _replace(path + TEMP_FILE_SUFFIX, path)
+                entry[1:] = _stat(path)
+        for name in report.removed:
+            _remove(os.path.join(directory, name + VIEW_FILE_EXTENSION))
+        _save_index(directory, new_index)
+        report.updated = True
+    return report
+
+
+def _snapshot_names(directory):
+    try:
+        files = os.listdir(directory)
+    except OSError:
+        return set()
+    n = len(VIEW_FILE_EXTENSION)
+    return set(f[:-n] for f in files if f.endswith(VIEW_FILE_EXTENSION))
+
+
+def _load_index(directory):
+    try:
+        with open(os.path.join(directory, SNAPSHOT_INDEX_NAME), 'r') as f:
+            index = json.load(f)
+    except (IOError, OSError, ValueError):
+        return {}
+    if index.get('version') != SNAPSHOT_INDEX_VERSION:
+        return {}
+    return index.get('views', {})
+
+
+def _save_index(directory, views):
+    path = os.path.join(directory, SNAPSHOT_INDEX_NAME)
+    with open(path + TEMP_FILE_SUFFIX, 'w') as f:
+        json.dump(OrderedDict([('version', SNAPSHOT_INDEX_VERSION),
+                               ('views', views)]), f, indent=1)
+    _replace(path + TEMP_FILE_SUFFIX, path)
+
+
+def _discard(jobs):
+    for job in jobs:
+        _remove(job[3] + TEMP_FILE_SUFFIX)
+
+
+def _check_views(jobs):
+    return [_check_view(*job) for job in jobs]
+
+
+def _check_view(view, format_options, expected, path, update):
+    """Returns ``(name, status, entry, diff)`` for a view, writing the
+    new snapshot to a temporary file if it differs and ``update`` is set.
+    ``entry`` is the index entry of the snapshot, ``[digest, size, mtime]``,
+    without the size and modification time for a snapshot not yet written.
+    """
+    data = view.render(format_options).encode('utf-8')
+    digest = hashlib.sha1(data).hexdigest()
+    name = view.lookml_name
+    if expected and expected[0] == digest and \
+            _stat(path) == list(expected[1:]):
+        return name, UNCHANGED, expected, None
+    try:
+        with io.open(path, 'rb') as f:
+            snapshot = f.read()
+    except (IOError, OSError):
+        snapshot = None
+    if snapshot == data:
+        # Missing from the index, or the index is out of date
+        return name, UNCHANGED, [digest] + (_stat(path) or []), None
+    if update:
+        with io.open(path + TEMP_FILE_SUFFIX, 'wb') as f:
+            f.write(data)
+    if snapshot is None:
+        return name, ADDED, [digest], None
+    return name, CHANGED, [digest], _diff(snapshot, data, name)
+
+
+def _stat(path):
+    """Returns the size and modification time of a file, or None if it
+    does not exist
+    """
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return [st.st_size, getattr(st, 'st_mtime_ns', st.st_mtime)]
+
+
+def _diff(old, new, name):
+    lines = list(difflib.unified_diff(
+        old.decode('utf-8').splitlines(True),
+        new.decode('utf-8').splitlines(True),
+        'snapshot/' + name, 'rendered/' + name))
+    if len(lines) > MAX_DIFF_LINES:
+        lines = lines[:MAX_DIFF_LINES] + [
+            '... ({} more lines)\n'.format(len(lines) - MAX_DIFF_LINES)]
+    return ''.join(line if line.endswith('\n') else line + '\n'
+                   for line in lines)
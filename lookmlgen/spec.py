@@ -0,0 +1,228 @@
+"""
+    File name: spec.py
+    Date created: 10/18/26
+"""
+import json
+import os
+
+import six
+
+from .field import FIELD_CLASSES, DimensionGroup
+from .view import DerivedTable, View
+
+SPEC_FORMATS = ('json', 'yaml', 'jsonl')
+FORMATS_BY_EXTENSION = {
+    '.json': 'json',
+    '.yaml': 'yaml',
+    '.yml': 'yaml',
+    '.jsonl': 'jsonl',
+    '.ndjson': 'jsonl',
+}
+
+VIEW_KEYS = frozenset(['name', 'label', 'sql_table_name', 'extends',
+                       'extension_required', 'refinement', 'derived_table',
+                       'fields', 'templates'])
+DERIVED_TABLE_KEYS = frozenset(['sql', 'sql_trigger_value', 'indexes'])
+DEFAULT_FIELD = 'dimension'
+
+_field_keys = {}
+
+
+def view_from_spec(spec):
+    """ Builds a :class:`~lookmlgen.view.View` from a dict such as::
+
+        {"name": "orders",
+         "sql_table_name": "shop.orders",
+         "derived_table": {"sql": "SELECT ...", "indexes": ["id"]},
+         "fields": [
+             {"name": "id", "type": "number", "primary_key": true},
+             {"field": "dimension_group", "name": "created"},
+             {"field": "measure", "name": "count", "type": "count"}],
+         "templates": [
+             {"field": "measure", "name": "sum_{column}", "type": "sum",
+              "sql": "${{column}}", "columns": ["price", "quantity"]}]}
+
+    ``field`` is the kind of field, 'dimension' by default. The other keys
+    of a field are the arguments of its class. Templates are registered
+    with :py:meth:`~lookmlgen.view.View.add_columns` and expanded when the
+    view's fields are used.
+
+    :param spec: View specification
+    :type spec: dict
+    :rtype: :class:`~lookmlgen.view.View`
+    :raises ValueError: if the specification is invalid
+
+    """
+    if not isinstance(spec, dict) or 'name' not in spec:
+        raise ValueError('View spec must be an object with a name: {!r}'.
+                         format(spec))
+    name = spec['name']
+    _check_keys(spec, VIEW_KEYS, 'view {}'.format(name))
+    extends = spec.get('extends')
+    if extends is not None:
+        _spec_list(spec, 'extends', name)
+        if not all(isinstance(e, six.string_types) for e in extends):
+            raise ValueError('Expected names of views in extends of view '
+                             '{}: {!r}'.format(name, extends))
+    v = View(name, label=spec.get('label'),
+             sql_table_name=spec.get('sql_table_name'),
+             extends=extends,
+             extension_required=spec.get('extension_required', False),
+             refinement=spec.get('refinement', False))
+    dt = spec.get('derived_table')
+    if dt is not None:
+        what = 'derived table of view {}'.format(name)
+        _check_object(dt, ('sql',), what)
+        _check_keys(dt, DERIVED_TABLE_KEYS, what)
+        v.set_derived_table(_construct(DerivedTable, dt, what))
+    for f in _spec_list(spec, 'fields', name):
+        _check_object(f, ('name',), 'field of view {}'.format(name))
+        cls, kwargs, what = _field_args(f, name, ('name',))
+        v.add_field(_construct(cls, kwargs, what))
+    for t in _spec_list(spec, 'templates', name):
+        _check_object(t, ('name',), 'template of view {}'.format(name))
+        cls, kwargs, what = _field_args(t, name, ('name', 'columns'))
+        columns = kwargs.pop('columns', ())
+        try:
+            v.add_columns(columns, cls, **kwargs)
+        except TypeError as e:
+            raise ValueError('Invalid {}: {}'.format(what, e))
+    return v
+
+
+def iter_view_specs(stream, format='json'):
+    """ Yields view specifications read from a stream.
+
+    JSON and YAML documents hold a list of views, an object with a
+    ``views`` list or a single view. JSON lines hold one view per line and
+    are read lazily, line by line, so very large inputs never have to be
+    held in memory. YAML requires PyYAML.
+
+    :param stream: Open file or any iterable of lines
+    :param format: One of 'json', 'yaml' or 'jsonl'
+    :type format: string
+    :rtype: iterator of dicts
+    :raises ValueError: if the input cannot be read
+
+    """
+    for _, spec in _iter_specs(stream, format):
+        yield spec
+
+
+def _iter_specs(stream, format):
+    """Yields each view specification in a stream with its location, the
+    line for JSON lines or the position of the view otherwise
+    """
+    if format == 'jsonl':
+        for lineno, line in enumerate(stream, 1):
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                yield 'line {}'.format(lineno), json.loads(line)
+            except ValueError as e:
+                raise ValueError('Line {}: {}'.format(lineno, e))
+        return
+    if format == 'json':
+        data = json.load(stream)
+    elif format == 'yaml':
+        try:
+            import yaml
+        except ImportError:
+            raise ValueError('PyYAML is required to read YAML specs')
+        try:
+            data = yaml.safe_load(stream)
+        except yaml.YAMLError as e:
+            raise ValueError('Invalid YAML: {}'.format(e))
+    else:
+        raise ValueError('Format {} is not one of {}'.format(
+            format, ', '.join(SPEC_FORMATS)))
+    if isinstance(data, dict):
+        data = data['views'] if 'views' in data else [data]
+    if data is not None and not isinstance(data, list):
+        raise ValueError('Expected a list of views, not {!r}'.format(data))
+    for i, spec in enumerate(data or (), 1):
+        yield 'view {}'.format(i), spec
+
+
+def iter_views(stream, format='json'):
+    """ Lazily yields a :class:`~lookmlgen.view.View` for every view
+    specification read from a stream, see :func:`iter_view_specs` and
+    :func:`view_from_spec`
+
+    :rtype: iterator of :class:`~lookmlgen.view.View`
+    :raises ValueError: if the input cannot be read or a specification is
+                        invalid, with the line or position of the view
+
+    """
+    for location, spec in _iter_specs(stream, format):
+        try:
+            v = view_from_spec(spec)
+        except ValueError as e:
+            raise ValueError('{}: {}'.format(location, e))
+        yield v
+
+
+def format_for_path(path):
+    """Returns the spec format matching a file's extension"""
+    ext = os.path.splitext(path)[1].lower()
+    try:
+        return FORMATS_BY_EXTENSION[ext]
+    except KeyError:
+        raise ValueError('Cannot tell the format of {} from its extension'.
+                         format(path))
+
+
+def _check_object(spec, required, what):
+    if not isinstance(spec, dict):
+        raise ValueError('Expected an object for {}: {!r}'.format(what, spec))
+    missing = [k for k in required if k not in spec]
+    if missing:
+        raise ValueError('Missing {} in {}: {!r}'.format(
+            ', '.join(missing), what, spec))
+
+
+def _spec_list(spec, key, view_name):
+    items = spec.get(key, ())
+    if not isinstance(items, (list, tuple)):
+        raise ValueError('Expected a list of {} in view {}: {!r}'.format(
+            key, view_name, items))
+    return items
+
+
+def _construct(cls, kwargs, what):
+    """Creates an object from a specification, reporting arguments of the
+    wrong type or number as an invalid specification
+    """
+    try:
+        return cls(**kwargs)
+    except TypeError as e:
+        raise ValueError('Invalid {}: {}'.format(what, e))
+
+
+def _check_keys(spec, allowed, what):
+    unknown = set(spec) - allowed
+    if unknown:
+        raise ValueError('Unknown keys in {}: {}'.format(
+            what, ', '.join(sorted(unknown))))
+
+
+def _field_args(spec, view_name, extra_keys):
+    kind = spec.get('field', DEFAULT_FIELD)
+    if not isinstance(kind, six.string_types):
+        raise ValueError('Expected the name of a kind of field in view {}: '
+                         '{!r}'.format(view_name, kind))
+    cls = FIELD_CLASSES.get(kind)
+    if cls is None:
+        raise ValueError('Unknown field {} in view {}'.format(kind, view_name))
+    allowed = _field_keys.get((cls, extra_keys))
+    if allowed is None:
+        allowed = set(cls._definition_attrs) - set(['field_type', 'name'])
+        if cls is DimensionGroup:
+            allowed.discard('type')
+        allowed = _field_keys[(cls, extra_keys)] = \
+            frozenset(allowed.union(extra_keys))
+    kwargs = dict((k, v) for k, v in six.iteritems(spec) if k != 'field')
+    what = '{} {} of view {}'.format(kind, spec.get('name'), view_name)
+    _check_keys(kwargs, allowed, what)
+    return cls, kwargs, what
@@ -0,0 +1,138 @@
+"""
+    File name: stats.py
+    Date created: 10/18/26
+"""
+import json
+import threading
+import timeit
+from collections import OrderedDict
+from contextlib import contextmanager
+
+_local = threading.local()
+
+
+def active_stats():
+    """Returns the :class:`GenerationStats` collecting in the current
+    thread, or None if collection is disabled
+    """
+    return getattr(_local, 'stats', None)
+
+
+@contextmanager
+def collect(stats=None):
+    """ Context manager that records generation statistics in the current
+    thread while it is active. Generation checks for an active collector
+    once per view and takes its regular path when there is none, so
+    statistics cost nothing unless they are collected.
+
+    :class:`~lookmlgen.project.Project` workers collect into their own
+    statistics, which are merged into the active ones when the project is
+    generated.
+
+    Usage::
+
+        with collect() as stats:
+            project.generate_lookml()
+        print(stats.to_json())
+
+    :param stats: Statistics to add to, a new object by default
+    :type stats: :class:`GenerationStats`
+
+    """
+    stats = stats if stats is not None else GenerationStats()
+    previous = active_stats()
+    _local.stats = stats
+    try:
+        yield stats
+    finally:
+        _local.stats = previous
+
+
+class Tally(object):
+    """Number of events, time and characters generated for one stage, field
+    type or view
+    """
+    __slots__ = ('count', 'seconds', 'bytes')
+
+    def __init__(self, count=0, seconds=0.0, bytes=0):
+        self.count = count
+        self.seconds = seconds
+        self.bytes = bytes
+
+    def add(self, seconds, bytes=0, count=1):
+        self.count += count
+        self.seconds += seconds
+        self.bytes += bytes
+
+    def as_dict(self):
+        return OrderedDict([('count', self.count), ('seconds', self.seconds),
+                            ('bytes', self.bytes)])
+
+
+class GenerationStats(object):
+    """Time and characters generated, per stage, per field type and per view.
+
+    Stages recorded by lookmlgen are 'construct' (building views from a
+    catalog), 'order' (ordering view fields), 'render' (rendering views,
+    including their fields), 'hash' (hashing views for the project
+    manifest), 'write' (writing files) and 'commit' (moving written files
+    into place). Use :py:meth:`stage` to time
+    stages of your own code, such as building fields.
+    """
+    def __init__(self):
+        self.stages = OrderedDict()
+        self.field_types = OrderedDict()
+        self.views = OrderedDict()
+
+    def add_stage(self, stage, seconds, bytes=0, count=1):
+        """Records time and characters for a stage"""
+        self._counter(self.stages, stage).add(seconds, bytes, count)
+
+    def add_field_type(self, type_name, seconds, bytes=0, count=1):
+        """Records time and characters for rendering fields of a type"""
+        self._counter(self.field_types, type_name).add(seconds, bytes, count)
+
+    def add_view(self, name, seconds, bytes=0, count=1):
+        """Records time and characters for rendering a view, where count is
+        the number of fields in the view
+        """
+        self._counter(self.views, name).add(seconds, bytes, count)
+
+    @contextmanager
+    def stage(self, stage):
+        """Context manager timing the enclosed code as a stage"""
+        start = timeit.default_timer()
+        try:
+            yield
+        finally:
+            self.add_stage(stage, timeit.default_timer() - start)
+
+    def merge(self, other):
+        """Adds the statistics recorded in another object to these"""
+        for mine, theirs in ((self.stages, other.stages),
+                             (self.field_types, other.field_types),
+                             (self.views, other.views)):
+            for key, c in theirs.items():
+                self._counter(mine, key).add(c.seconds, c.bytes, c.count)
+        return self
+
+    def as_dict(self):
+        """Returns the statistics as nested dicts"""
+        return OrderedDict(
+            (name, OrderedDict((k, c.as_dict()) for k, c in counters.items()))
+            for name, counters in (('stages', self.stages),
+                                   ('field_types', self.field_types),
+                                   ('views', self.views)))
+
+    def to_json(self, **kwargs):
+        """Returns the statistics as a JSON string. Keyword arguments are
+        passed to :func:`json.dumps`.
+        """
+        return json.dumps(self.as_dict(), **kwargs)
+
+    @staticmethod
+    def _counter(counters, key):
+        c = counters.get(key)
+        if c is None:
+            c = counters[key] = Tally()
+        return c
@@ -3,6 +3,11 @@
     Author: joeschmid
     Date created: 4/16/17
 """
+import os
+import re
+import threading
+from collections import OrderedDict
+from concurrent import futures
 
 
 def indent(s, num_spaces):
@@ -13,3 +18,168 @@ def indent(s, num_spaces):
         indented[-1] += '\n'
     indented = '\n'.join(indented)
     return indented
+
+
+# Lines as str.splitlines(True) splits them, one match at a time
+_LINE_BREAKS = u'\n\r\x0b\x0c\x1c\x1d\x1e\x85\u2028\u2029'
+_TEXT_LINE = re.compile(u'[^{0}]*(?:\r\n|[{0}])|[^{0}]+'.format(
+    _LINE_BREAKS))
+_BYTES_LINE = re.compile(b'[^\r\n]*(?:\r\n|[\r\n])|[^\r\n]+')
+
+
+def iter_indented(text, prefix):
+    """ Yields the lines of a string, with line endings, adding a prefix to
+    every line that is not blank. Lines are split like
+    :meth:`str.splitlines`, so joining them gives the same text as
+    :func:`textwrap.indent`, without copying the whole string at once.
+
+    :param text: Text to indent
+    :param prefix: Prefix to add, e.g. some spaces
+    :type text: string
+    :type prefix: string
+    :rtype: iterator of strings
+
+    """
+    pattern = _BYTES_LINE if isinstance(text, bytes) else _TEXT_LINE
+    for match in pattern.finditer(text):
+        line = match.group()
+        yield prefix + line if line.strip() else line
+
+
+try:
+    from textwrap import indent as indent_lines
+except ImportError:
+    def indent_lines(text, prefix):
+        """ Adds a prefix to every line of a string that is not blank, like
+        :func:`textwrap.indent` on Python 3
+        """
+        return ''.join(iter_indented(text, prefix))
+
+
+class LRUCache(object):
+    """ Thread-safe mapping that keeps the most recently used ``maxsize``
+    entries and counts hits and misses.
+
+    :param maxsize: Maximum number of entries
+    :param maxlength: Maximum total ``len()`` of the cached values, or None
+                      for no limit. Longer values are not cached at all.
+    :type maxsize: int
+    :type maxlength: int
+
+    """
+    def __init__(self, maxsize=128, maxlength=None):
+        self.maxsize = maxsize
+        self.maxlength = maxlength
+        self.length = 0
+        self.hits = 0
+        self.misses = 0
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+        # Python 2's OrderedDict cannot move keys
+        self._move_to_end = getattr(self._data, 'move_to_end', None)
+
+    def __len__(self):
+        return len(self._data)
+
+    def __contains__(self, key):
+        return key in self._data
+
+    def get(self, key, default=None):
+        """Returns the value for a key and marks it as recently used, or
+        returns ``default`` if the key is not cached
+        """
+        with self._lock:
+            try:
+                value = self._data[key]
+            except KeyError:
+                self.misses += 1
+                return default
+            if self._move_to_end is not None:
+                self._move_to_end(key)
+            else:
+                del self._data[key]
+                self._data[key] = value
+            self.hits += 1
+            return value
+
+    def put(self, key, value):
+        """Caches a value, evicting the least recently used entries if the
+        cache is full
+        """
+        maxlength = self.maxlength
+        with self._lock:
+            old = self._data.pop(key, None)
+            if maxlength is None:
+                self._data[key] = value
+                while len(self._data) > self.maxsize:
+                    self._data.popitem(last=False)
+                return
+            if old is not None:
+                self.length -= len(old)
+            if len(value) > maxlength:
+                return
+            self._data[key] = value
+            self.length += len(value)
+            while len(self._data) > self.maxsize or self.length > maxlength:
+                self.length -= len(self._data.popitem(last=False)[1])
+
+    def clear(self):
+        """Removes all entries and resets the hit and miss counts"""
+        with self._lock:
+            self._data.clear()
+            self.length = self.hits = self.misses = 0
+
+    @property
+    def hit_rate(self):
+        """Fraction of lookups that were hits, 0.0 before any lookup"""
+        lookups = self.hits + self.misses
+        return float(self.hits) / lookups if lookups else 0.0
+
+
+def map_jobs(fn, jobs, executor=None, max_workers=None):
+    """ Calls ``fn(*job)`` for every job and returns the results in order.
+
+    :param fn: Function to call; must be picklable for a process pool
+    :param jobs: Argument tuples
+    :param executor: 'thread' or 'process' to run the jobs on a new pool of
+                     that kind, an existing
+                     :class:`concurrent.futures.Executor`, or None to run
+                     them serially
+    :param max_workers: Number of workers for a new pool
+    :type jobs: list of tuples
+    :type executor: string or :class:`concurrent.futures.Executor`
+    :type max_workers: int
+    :rtype: list
+
+    """
+    if not jobs:
+        return []
+    if executor is None:
+        return [fn(*job) for job in jobs]
+    if isinstance(executor, futures.Executor):
+        return list(executor.map(fn, *zip(*jobs)))
+    pool = create_executor(executor, max_workers)
+    with pool:
+        return list(pool.map(fn, *zip(*jobs)))
+
+
+def create_executor(kind, max_workers=None):
+    """ Returns a new :class:`concurrent.futures.Executor`
+
+    :param kind: 'thread' or 'process'
+    :param max_workers: Number of workers
+    :type kind: string
+    :type max_workers: int
+
+    """
+    if kind == 'thread':
+        return futures.ThreadPoolExecutor(max_workers or _default_workers())
+    if kind == 'process':
+        return futures.ProcessPoolExecutor(max_workers)
+    raise ValueError('Executor {} is not one of thread, process or '
+                     'None'.format(kind))
+
+
+def _default_workers():
+    cpus = getattr(os, 'cpu_count', lambda: None)() or 1
+    return min(32, cpus + 4)
@@ -0,0 +1,337 @@
+"""
+    File name: validate.py
+    Date created: 10/18/26
+"""
+import re
+from collections import OrderedDict
+
+import six
+
+from .field import DEFAULT_TIMEFRAMES, FieldType
+
+UNKNOWN_REFERENCE = 'unknown_reference'
+CYCLE = 'cycle'
+DUPLICATE_NAME = 'duplicate_name'
+
+# Timeframes Looker creates for a dimension group without a timeframes
+# parameter
+ALL_TIMEFRAMES = [
+    'raw', 'time', 'date', 'week', 'month', 'quarter', 'year', 'hour',
+    'minute', 'second', 'millisecond', 'microsecond', 'time_of_day',
+    'hour_of_day', 'day_of_week', 'day_of_week_index', 'day_of_month',
+    'day_of_year', 'week_of_year', 'month_name', 'month_num',
+    'quarter_of_year', 'fiscal_month_num', 'fiscal_quarter',
+    'fiscal_quarter_of_year', 'fiscal_year',
+] + ['hour{}'.format(n) for n in (2, 3, 4, 6, 8, 12)] + [
+    'minute{}'.format(n) for n in (2, 3, 4, 5, 6, 10, 12, 15, 20, 30)] + [
+    'millisecond{}'.format(n)
+    for n in (2, 4, 5, 8, 10, 20, 25, 40, 50, 100, 125, 200, 250, 500)]
+
+# References that do not name a field
+SPECIAL_REFERENCES = frozenset(['TABLE', 'EXTENDED'])
+VIEW_REFERENCES = frozenset(['SQL_TABLE_NAME'])
+# Suffixes of references to a property of a field, e.g. ${status._value}
+FIELD_PROPERTIES = ('._sql', '._value', '._name', '._rendered_value')
+
+# Fields listed in the message of a cycle
+MAX_CYCLE_LABELS = 10
+
+# ${TABLE}, by far the most common reference, is skipped by the expression
+_REFERENCE = re.compile(r'\$\{\s*(?!TABLE\s*\})([^}]*?)\s*\}')
+_UNKNOWN = object()
+_UNRESOLVED = object()
+
+
+class Problem(object):
+    """A problem found by :func:`validate`
+
+    :ivar kind: UNKNOWN_REFERENCE, CYCLE or DUPLICATE_NAME
+    :ivar view: Name of the view the problem was found in
+    :ivar field: Name of the field the problem was found in, or None for a
+                 view or its derived table
+    :ivar message: Description of the problem
+
+    """
+    __slots__ = ('kind', 'view', 'field', 'message')
+
+    def __init__(self, kind, view, field, message):
+        self.kind = kind
+        self.view = view
+        self.field = field
+        self.message = message
+
+    def __repr__(self):
+        return 'Problem({self.kind!r}, {self.message!r})'.format(self=self)
+
+
+class ValidationError(ValueError):
+    """Raised by :func:`check` with the problems found"""
+    def __init__(self, problems):
+        super(ValidationError, self).__init__(
+            '{} problem(s) found:\n{}'.format(
+                len(problems), '\n'.join(p.message for p in problems)))
+        self.problems = problems
+
+
+def validate(views, format_options=None, external_views=()):
+    """ Checks the ``${...}`` references in the sql of every field and
+    derived table of a collection of views.
+
+    An index of the names each view's fields can be referenced by,
+    including the ``<group>_<timeframe>`` names of dimension groups, is
+    built first. All references are then found with a single compiled
+    regular expression per sql snippet and resolved against the index.
+    Fields with the default sql are not scanned at all.
+
+    References resolve against the fields of a view merged with those of
+    the views it ``extends`` and of its refinements. Views marked
+    ``extension_required`` are only checked as part of the views extending
+    them, whose own fields may complete them.
+
+    Problems reported are references to unknown views or fields, cycles of
+    fields or derived tables referencing each other, extends cycles, and
+    views or field names defined more than once.
+
+    :param views: Views to validate, as an iterable or a dict keyed by
+                  name such as :py:attr:`~lookmlgen.project.Project.views`
+    :param format_options: Formatting options the views are generated
+                           with, which determine the timeframes of
+                           dimension groups without timeframes
+    :param external_views: Names of views defined elsewhere whose fields
+                           are not checked
+    :type views: iterable or dict of :class:`~lookmlgen.view.View`
+    :type format_options:
+        :class:`~lookmlgen.base_generator.GeneratorFormatOptions`
+    :type external_views: iterable of strings
+    :return: Problems found, in the order of the views and fields
+    :rtype: list of :class:`Problem`
+
+    """
+    if isinstance(views, dict):
+        views = list(six.itervalues(views))
+    unset_timeframes = ALL_TIMEFRAMES if format_options is not None and \
+        format_options.omit_time_frames_if_not_set else DEFAULT_TIMEFRAMES
+    problems = []
+    external = frozenset(external_views)
+    defined = OrderedDict()
+    refinements = {}
+    for v in views:
+        if v.refinement:
+            refinements.setdefault(v.name, []).append(v)
+        else:
+            defined.setdefault(v.name, v)
+
+    # Fields of every view including those it extends or that refinements
+    # add, which are what its references resolve against
+    fields = {}
+    index = {}
+    for v in views:
+        if v.refinement:
+            continue
+        if defined[v.name] is not v:
+            problems.append(Problem(
+                DUPLICATE_NAME, v.name, None,
+                'View {} is defined more than once'.format(v.name)))
+            continue
+        merged = _merged_fields(v.name, defined, refinements, external,
+                                fields, [], problems)
+        index[v.name] = _field_index(v.name, merged, unset_timeframes,
+                                     problems)
+    for name in refinements:
+        if name not in defined and name not in external:
+            problems.append(Problem(
+                UNKNOWN_REFERENCE, name, None,
+                'Refinement +{0} refines unknown view {0}'.format(name)))
+    # Resolved qualified references, which are the same in every view
+    qualified = {}
+
+    edges = {}
+    for v in six.itervalues(defined):
+        if v.extension_required:
+            # Checked as part of the views extending it
+            continue
+        for dt in [v.derived_table] + [r.derived_table for r in
+                                       refinements.get(v.name, ())]:
+            if dt is not None and dt.sql and '${' in dt.sql:
+                _scan(dt.sql, v.name, None, index, qualified, external,
+                      problems, edges)
+        for f in six.itervalues(fields[v.name]):
+            # Fields with the default sql reference nothing but ${TABLE}
+            sql = f._sql
+            if sql and '${' in sql:
+                _scan(sql, v.name, f.name, index, qualified, external,
+                      problems, edges)
+    _find_cycles(edges, problems)
+    return problems
+
+
+def check(views, format_options=None, external_views=()):
+    """ Validates views like :func:`validate` and raises if there are any
+    problems.
+
+    :raises ValidationError: if a problem is found
+
+    """
+    problems = validate(views, format_options, external_views)
+    if problems:
+        raise ValidationError(problems)
+
+
+def _label(view_name, field_name):
+    if field_name is None:
+        return '{}.derived_table'.format(view_name)
+    return '{}.{}'.format(view_name, field_name)
+
+
+def _merged_fields(name, defined, refinements, external, fields, extending,
+                   problems):
+    """Returns the fields of a view after applying the views it extends and
+    its refinements, memoized in ``fields``
+    """
+    merged = fields.get(name)
+    if merged is not None:
+        return merged
+    v = defined[name]
+    refined = refinements.get(name, ())
+    if not v.extends and not refined:
+        merged = fields[name] = v.fields
+        return merged
+    if name in extending:
+        problems.append(Problem(
+            CYCLE, name, None, 'Extends cycle: {}'.format(' -> '.join(
+                extending[extending.index(name):] + [name]))))
+        return {}
+    extending.append(name)
+    merged = OrderedDict()
+    for base in v.extends or ():
+        if base in defined:
+            merged.update(_merged_fields(base, defined, refinements,
+                                         external, fields, extending,
+                                         problems))
+        elif base not in external:
+            problems.append(Problem(
+                UNKNOWN_REFERENCE, name, None,
+                'View {} extends unknown view {}'.format(name, base)))
+    merged.update(v.fields)
+    for r in refined:
+        merged.update(r.fields)
+    extending.pop()
+    fields[name] = merged
+    return merged
+
+
+def _field_index(view_name, fields, unset_timeframes, problems):
+    """Returns a dict mapping every name a view's fields can be referenced
+    by to the ``(view, field)`` node of the field
+    """
+    names = {}
+    for f in six.itervalues(fields):
+        node = (view_name, f.name)
+        if f.field_type == FieldType.DIMENSION_GROUP:
+            prefix = f.name + '_'
+            refs = [prefix + tf for tf in f.timeframes or unset_timeframes]
+        else:
+            refs = [f.name]
+        for ref in refs:
+            if ref in names:
+                problems.append(Problem(
+                    DUPLICATE_NAME, view_name, f.name,
+                    'Field {} is defined more than once, by {} and {}'.
+                    format(_label(view_name, ref), names[ref][1], f.name)))
+            else:
+                names[ref] = node
+    return names
+
+
+def _resolve(ref, view_name, index, external):
+    """Returns the ``(view, field)`` node a reference that is not a field
+    name points to, None if it is not checked or _UNKNOWN
+    """
+    view, dot, name = ref.partition('.')
+    if not dot:
+        if ref in SPECIAL_REFERENCES:
+            return None
+        return _UNKNOWN
+    if view in external or '.' in name:
+        return None
+    names = index.get(view)
+    if names is None:
+        return _UNKNOWN
+    if name in VIEW_REFERENCES:
+        return view, None
+    return names.get(name, _UNKNOWN)
+
+
+def _scan(sql, view_name, field_name, index, qualified, external, problems,
+          edges):
+    names = index[view_name]
+    targets = []
+    for text in _REFERENCE.findall(sql):
+        ref = text
+        if ref.endswith(FIELD_PROPERTIES):
+            ref = ref[:ref.rindex('.')]
+        target = names.get(ref)
+        if target is None:
+            target = qualified.get(ref, _UNRESOLVED)
+            if target is _UNRESOLVED:
+                target = _resolve(ref, view_name, index, external)
+                if '.' in ref:
+                    qualified[ref] = target
+        if target is _UNKNOWN:
+            problems.append(Problem(
+                UNKNOWN_REFERENCE, view_name, field_name,
+                '{} references unknown ${{{}}}'.format(
+                    _label(view_name, field_name), text)))
+        elif target is not None:
+            targets.append(target)
+    if targets:
+        edges[(view_name, field_name)] = targets
+
+
+def _find_cycles(edges, problems):
+    """Reports each cycle in the reference graph once, using an iterative
+    depth first search so long reference chains do not hit the recursion
+    limit
+    """
+    # Nodes on the current path map to their position in it
+    done = -1
+    state = {}
+    for start in edges:
+        if start in state:
+            continue
+        state[start] = 0
+        path = [start]
+        stack = [iter(edges[start])]
+        while stack:
+            for node in stack[-1]:
+                s = state.get(node)
+                if s is None:
+                    targets = edges.get(node)
+                    if targets is None:
+                        state[node] = done
+                        continue
+                    state[node] = len(path)
+                    path.append(node)
+                    stack.append(iter(targets))
+                    break
+                if s != done:
+                    problems.append(Problem(
+                        CYCLE, node[0], node[1],
+                        'Reference cycle: {}'.format(_cycle_labels(
+                            path, s))))
+            else:
+                state[path.pop()] = done
+                stack.pop()
+
+
+def _cycle_labels(path, start):
+    """Describes the cycle from ``path[start]`` to the end of the path,
+    leaving out the middle of very long cycles
+    """
+    length = len(path) - start
+    shown = path[start:start + min(length, MAX_CYCLE_LABELS)]
+    labels = [_label(v, f) for v, f in shown]
+    if length > MAX_CYCLE_LABELS:
+        labels.append('... ({} more)'.format(length - MAX_CYCLE_LABELS))
+    labels.append(_label(*path[start]))
+    return ' -> '.join(labels)
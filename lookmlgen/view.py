@@ -4,14 +4,72 @@
     Date created: 4/8/17
 """
 import json
+import timeit
 from collections import OrderedDict
-try:
-    from textwrap import indent
-except ImportError:
-    from .util import indent
 
-from .base_generator import BaseGenerator
-from .field import FieldType
+from .base_generator import BaseGenerator, Pieces, render_into
+from .diff import diff_attrs
+from .field import COLUMN, Dimension, FieldTemplate, FieldType
+from .stats import active_stats
+from .util import LRUCache, indent_lines, iter_indented
+
+# Position of each field type's section in a generated view
+FIELD_TYPE_BUCKETS = {
+    FieldType.FILTER: 0,
+    FieldType.DIMENSION: 1,
+    FieldType.DIMENSION_GROUP: 1,
+    FieldType.MEASURE: 2,
+}
+
+DERIVED_TABLE_SQL_CACHE_SIZE = 128
+DERIVED_TABLE_SQL_CACHE_LENGTH = 4 * 1024 * 1024
+
+#: Indented multi-line derived table SQL keyed by SQL text and indent, so
+#: SQL shared by many views or rendered repeatedly is indented once. Holds
+#: at most :data:`DERIVED_TABLE_SQL_CACHE_LENGTH` characters of indented
+#: SQL; longer SQL is indented on every render.
+derived_table_sql_cache = LRUCache(DERIVED_TABLE_SQL_CACHE_SIZE,
+                                   DERIVED_TABLE_SQL_CACHE_LENGTH)
+
+_odict_setitem = OrderedDict.__setitem__
+
+
+class FieldDict(OrderedDict):
+    """Ordered dict holding the fields of a :class:`View`. Every change
+    increments :py:attr:`version`, so the view knows when the order of its
+    fields has to be computed again.
+    """
+    def __init__(self, *args, **kwargs):
+        self.version = 0
+        super(FieldDict, self).__init__(*args, **kwargs)
+
+    def __setitem__(self, key, value, *args):
+        self.version += 1
+        _odict_setitem(self, key, value, *args)
+
+    def __delitem__(self, key, *args):
+        self.version += 1
+        super(FieldDict, self).__delitem__(key, *args)
+
+    def pop(self, *args):
+        self.version += 1
+        return super(FieldDict, self).pop(*args)
+
+    def popitem(self, *args, **kwargs):
+        self.version += 1
+        return super(FieldDict, self).popitem(*args, **kwargs)
+
+    def setdefault(self, *args):
+        self.version += 1
+        return super(FieldDict, self).setdefault(*args)
+
+    def clear(self):
+        self.version += 1
+        super(FieldDict, self).clear()
+
+    def move_to_end(self, *args, **kwargs):
+        self.version += 1
+        super(FieldDict, self).move_to_end(*args, **kwargs)
 
 
 class View(BaseGenerator):
@@ -29,19 +87,64 @@ class View(BaseGenerator):
     :param sql_table_name: Name of the SQL table to use in the view
     :param file: File handle of a file open for writing or a
                  StringIO object
+    :param extends: Names of the views this view extends
+    :param extension_required: Mark the view as ``extension: required``,
+                               a base view that is only used by the views
+                               extending it
+    :param refinement: Generate a refinement, ``view: +<name>``, that adds
+                       to or overrides a view defined elsewhere
     :type name: string
     :type label: string
     :type sql_table_name: list of strings
     :type file: File handle or StringIO object
+    :type extends: list of strings
+    :type extension_required: bool
+    :type refinement: bool
 
     """
-    def __init__(self, name, label=None, sql_table_name=None, file=None):
+    _definition_attrs = ('name', 'label', 'sql_table_name', 'extends',
+                         'extension_required', 'refinement')
+    # Columns registered with add_columns and fields added after them, in
+    # order, until the fields are expanded
+    _pending = None
+
+    def __init__(self, name, label=None, sql_table_name=None, file=None,
+                 extends=None, extension_required=False, refinement=False):
         super(View, self).__init__(file=file)
         self.name = name
         self.label = label
         self.sql_table_name = sql_table_name
-        self.fields = OrderedDict()
+        self.extends = extends
+        self.extension_required = extension_required
+        self.refinement = refinement
+        self._fields = FieldDict()
         self.derived_table = None
+        self._field_order = None
+
+    @property
+    def fields(self):
+        """ Fields of the view keyed by name, in the order they were added,
+        as a :class:`FieldDict`. Columns registered with
+        :py:meth:`add_columns` are expanded into fields the first time this
+        is read.
+
+        """
+        if self._pending:
+            self._expand()
+        return self._fields
+
+    @fields.setter
+    def fields(self, fields):
+        self._fields = fields
+        self._pending = None
+        self._field_order = None
+
+    @property
+    def lookml_name(self):
+        """Name of the view as written after ``view:``, with a leading '+'
+        for a refinement. Projects key their views by it.
+        """
+        return '+' + self.name if self.refinement else self.name
 
     def generate_lookml(self, file=None, format_options=None):
         """ Writes LookML for the view to a file or StringIO buffer.
@@ -59,58 +162,245 @@ class View(BaseGenerator):
             raise ValueError('Must provide a file in either the constructor '
                              'or as a parameter to generate_lookml()')
         f = file if file else self.file
+        f.write(self.render(format_options))
+        return
+
+    def iter_lookml(self, format_options=None):
+        """ Yields LookML for the view lazily: one chunk for the view header
+        and derived table, one chunk per field and one closing chunk. A
+        derived table with multi-line SQL is yielded in the chunks of
+        :py:meth:`DerivedTable.iter_lookml` instead.
+
+        :param format_options: Formatting options to use during generation
+        :type format_options:
+            :class:`~lookmlgen.base_generator.GeneratorFormatOptions`
+        :rtype: iterator of strings
+
+        """
         fo = format_options if format_options else self.format_options
+        lines = Pieces()
+        dt = self.derived_table
+        stream_dt = dt is not None and bool(dt.sql) and '\n' in dt.sql
+        self._render_header(lines, fo, derived_table=not stream_dt)
+        yield ''.join(lines)
+        if stream_dt:
+            for chunk in dt.iter_lookml(fo):
+                yield chunk
+            if fo.newline_between_items:
+                yield '\n'
+        fields = self.fields
+        for i, name in enumerate(self.ordered_field_names(fo)):
+            lines = Pieces()
+            if i and fo.newline_between_items:
+                lines.append('\n')
+            render_into(fields[name], lines, fo)
+            yield ''.join(lines)
+        yield '}\n'
+
+    def _render(self, lines, fo):
+        stats = active_stats()
+        if stats is not None:
+            return self._render_with_stats(lines, fo, stats)
+        self._render_header(lines, fo)
+        fields = self.fields
+        for i, name in enumerate(self.ordered_field_names(fo)):
+            if i and fo.newline_between_items:
+                lines.append('\n')
+            render_into(fields[name], lines, fo)
+
+        lines.append('}\n')
+
+    def _render_with_stats(self, lines, fo, stats):
+        timer = timeit.default_timer
+        view_start = timer()
+        first = len(lines)
+        self._render_header(lines, fo)
+
+        start = timer()
+        ordered = self.ordered_field_names(fo)
+        stats.add_stage('order', timer() - start)
+
+        fields = self.fields
+        for i, name in enumerate(ordered):
+            if i and fo.newline_between_items:
+                lines.append('\n')
+            d = fields[name]
+            n = len(lines)
+            start = timer()
+            render_into(d, lines, fo)
+            stats.add_field_type(d.type_name, timer() - start,
+                                 sum(len(p) for p in lines[n:]))
+        lines.append('}\n')
+
+        seconds = timer() - view_start
+        size = sum(len(p) for p in lines[first:])
+        stats.add_stage('render', seconds, size)
+        stats.add_view(self.lookml_name, seconds, size, len(ordered))
+
+    def _render_header(self, lines, fo, derived_table=True):
+        r = fo.renderer
         if fo.warning_header_comment:
-            f.write(fo.warning_header_comment)
-        f.write('view: {self.name} {{\n'.format(self=self))
+            lines.append(fo.warning_header_comment)
+        lines.append(r.view_open.format(self.lookml_name))
+        if self.extends:
+            lines.append(r.view_extends.format(', '.join(self.extends)))
+        if self.extension_required:
+            lines.append(r.extension_required)
         if self.sql_table_name:
-            f.write('{indent}sql_table_name: {self.sql_table_name} ;;\n'.
-                    format(indent=' ' * fo.indent_spaces, self=self))
+            lines.append(r.sql_table_name.format(self.sql_table_name))
         if self.label:
-            f.write('{indent}label: "{self.label}"\n'.
-                    format(indent=' ' * fo.indent_spaces, self=self))
+            lines.append(r.view_label.format(self.label))
 
         if fo.newline_between_items:
-            f.write('\n')
+            lines.append('\n')
 
-        if self.derived_table:
-            self.derived_table.generate_lookml(file=f, format_options=fo)
+        if derived_table and self.derived_table:
+            render_into(self.derived_table, lines, fo)
             if fo.newline_between_items:
-                f.write('\n')
-
-        if fo.view_fields_alphabetical:
-            self.__ordered_fields = sorted(self.fields.items())
-        else:
-            self.__ordered_fields = self.fields.items()
-        self.__generated_fields = []
+                lines.append('\n')
 
-        self._gen_fields(f, fo, [FieldType.FILTER])
-        self._gen_fields(f, fo, [FieldType.DIMENSION, FieldType.DIMENSION_GROUP])
-        self._gen_fields(f, fo, [FieldType.MEASURE])
+    def definition(self):
+        """ Returns the attributes that determine the generated LookML as a
+        dict, including the definitions of the view's fields and derived
+        table. Columns registered with :py:meth:`add_columns` are
+        described like the fields they expand to, without expanding them.
 
-        f.write('}\n')
-        return
+        """
+        d = super(View, self).definition()
+        d['derived_table'] = self.derived_table.definition() \
+            if self.derived_table else None
+        if not self._pending:
+            d['fields'] = [fd.definition() for fd in self._fields.values()]
+            return d
+        # Describes the fields exactly as expanding them would, so reading
+        # the fields does not change the definition, while the view itself
+        # stays unexpanded and cheap to pickle
+        fields = OrderedDict(
+            (n, fd.definition()) for n, fd in self._fields.items())
+        for entry in self._pending:
+            if isinstance(entry, tuple):
+                template, columns = entry
+                for f in template.expand(columns):
+                    fields[f.name] = f.definition()
+            else:
+                fields[entry.name] = entry.definition()
+        d['fields'] = list(fields.values())
+        return d
 
     def add_field(self, field):
         """Adds a :class:`~lookmlgen.field.Field` object to a :class:`View`"""
-        self.fields[field.name] = field
+        if self._pending:
+            self._pending.append(field)
+            return
+        fields = self._fields
+        if type(fields) is FieldDict:
+            # Views can have many thousands of fields, so this skips the
+            # call to FieldDict.__setitem__
+            _odict_setitem(fields, field.name, field)
+            fields.version += 1
+        else:
+            fields[field.name] = field
         return
 
+    def add_columns(self, columns, field_class=Dimension, name=COLUMN,
+                    **kwargs):
+        """ Registers a field for every column of a table without building
+        the fields, which is much cheaper for very wide tables.
+
+        The fields are made from a :class:`~lookmlgen.field.FieldTemplate`
+        and are only expanded, into lightweight
+        :class:`~lookmlgen.field.TemplatedField` objects, when
+        :py:attr:`fields` is read, e.g. to generate the view. Views with
+        registered columns are pickled without expanding them, so they are
+        cheap to send to worker processes. A field added later with the
+        name of a column replaces the column's field; use
+        :py:meth:`~lookmlgen.field.FieldTemplate.field` on the returned
+        template to build one to customize.
+
+        Usage::
+
+            view.add_columns(['price', 'quantity'], Dimension,
+                             type='number')
+
+        :param columns: Column names
+        :param field_class: Class of the fields
+        :param name: Name of the fields, ``{column}`` by default
+        :param kwargs: Other arguments of the field class, in which
+                       ``{column}`` is replaced by the column name
+        :type columns: iterable of strings
+        :type field_class: class
+        :type name: string
+        :return: The template the fields are made from
+        :rtype: :class:`~lookmlgen.field.FieldTemplate`
+
+        """
+        template = FieldTemplate(field_class, name, **kwargs)
+        if self._pending is None:
+            self._pending = []
+        self._pending.append((template, list(columns)))
+        self._field_order = None
+        return template
+
+    def _expand(self):
+        pending, self._pending = self._pending, None
+        fields = self._fields
+        if isinstance(fields, FieldDict):
+            # Counts the change once instead of once per field
+            fields.version += 1
+            setitem = _odict_setitem
+        else:
+            setitem = type(fields).__setitem__
+        for entry in pending:
+            if isinstance(entry, tuple):
+                template, columns = entry
+                for f in template.expand(columns):
+                    setitem(fields, f.name, f)
+            else:
+                setitem(fields, entry.name, entry)
+
+    def ordered_field_names(self, format_options=None):
+        """ Returns the names of the fields in the order they are generated:
+        filters, then dimensions and dimension groups, then measures. Within
+        each group fields are sorted by name if
+        ``view_fields_alphabetical`` is set, otherwise they keep the order
+        they were added in.
+
+        The order is computed in a single pass and reused until
+        :py:attr:`fields` changes, through :py:meth:`add_field` or by
+        changing the dict directly. It is only reused while
+        :py:attr:`fields` is a :class:`FieldDict`, and changing the
+        ``field_type`` of a field in place is not detected.
+
+        :param format_options: Formatting options to use during generation
+        :type format_options:
+            :class:`~lookmlgen.base_generator.GeneratorFormatOptions`
+        :rtype: list of strings
+
+        """
+        fo = format_options if format_options else self.format_options
+        alphabetical = fo.view_fields_alphabetical
+        fields = self.fields
+        version = getattr(fields, 'version', None)
+        cached = self._field_order
+        if cached is not None and version is not None and \
+                cached[0] == alphabetical and cached[1] is fields and \
+                cached[2] == version:
+            return cached[3]
+        buckets = ([], [], [])
+        for name in sorted(fields) if alphabetical else fields:
+            i = FIELD_TYPE_BUCKETS.get(fields[name].field_type)
+            if i is not None:
+                buckets[i].append(name)
+        ordered = buckets[0] + buckets[1] + buckets[2]
+        self._field_order = (alphabetical, fields, version, ordered)
+        return ordered
+
     def set_derived_table(self, derived_table):
         """Adds a :class:`~lookmlgen.view.DerivedTable` object to a
          :class:`View`
         """
         self.derived_table = derived_table
 
-    def _gen_fields(self, f, fo, field_types):
-        for k, d in self.__ordered_fields:
-            if d.field_type not in field_types:
-                continue
-            if len(self.__generated_fields) != 0 and fo.newline_between_items:
-                f.write('\n')
-            d.generate_lookml(file=f, format_options=fo)
-            self.__generated_fields.append(d)
-
 
 class DerivedTable(BaseGenerator):
     """Generates the LookML View parameters to support derived
@@ -126,6 +416,8 @@ class DerivedTable(BaseGenerator):
     :type file: File handle or StringIO object
 
     """
+    _definition_attrs = ('sql', 'sql_trigger_value', 'indexes')
+
     def __init__(self, sql, sql_trigger_value=None, indexes=None, file=None):
         super(DerivedTable, self).__init__(file=file)
         self.sql = sql
@@ -147,20 +439,135 @@ class DerivedTable(BaseGenerator):
             raise ValueError('Must provide a file in either the constructor '
                              'or as a parameter to generate_lookml()')
         f = file if file else self.file
+        f.write(self.render(format_options))
+
+    def iter_lookml(self, format_options=None):
+        """ Yields LookML for the derived table lazily. Multi-line SQL is
+        indented and yielded line by line, unless it is already in
+        :data:`derived_table_sql_cache`, so very long SQL is never copied
+        as a whole.
+
+        :param format_options: Formatting options to use during generation
+        :type format_options:
+            :class:`~lookmlgen.base_generator.GeneratorFormatOptions`
+        :rtype: iterator of strings
+
+        """
         fo = format_options if format_options else self.format_options
-        f.write('{indent}derived_table: {{\n'.
-                format(indent=' ' * fo.indent_spaces))
-        if self.sql:
-            final_sql = ' ' + self.sql if '\n' not in self.sql \
-                else '\n' + indent(self.sql, ' ' * 3 * fo.indent_spaces)
-            f.write('{indent}sql:{sql} ;;\n'.
-                    format(indent=' ' * 2 * fo.indent_spaces, sql=final_sql))
+        sql = self.sql
+        if not sql or '\n' not in sql:
+            yield self.render(fo)
+            return
+        r = fo.renderer
+        yield r.derived_table_open + r.derived_table_sql_open
+        indented = derived_table_sql_cache.get((sql, r.indent3))
+        if indented is not None:
+            yield indented
+        else:
+            for line in iter_indented(sql, r.indent3):
+                yield line
+        lines = Pieces([r.sql_close])
+        self._render_params(lines, r)
+        yield ''.join(lines)
+
+    def _render(self, lines, fo):
+        r = fo.renderer
+        lines.append(r.derived_table_open)
+        sql = self.sql
+        if sql:
+            if '\n' not in sql:
+                lines.append(r.derived_table_sql.format(' ' + sql))
+            else:
+                lines.append(r.derived_table_sql_open)
+                lines.append(indented_sql(sql, r.indent3))
+                lines.append(r.sql_close)
+        self._render_params(lines, r)
+
+    def _render_params(self, lines, r):
         if self.sql_trigger_value:
-            f.write('{indent}sql_trigger_value: '
-                    '{self.sql_trigger_value} ;;\n'.
-                    format(indent=' ' * 2 * fo.indent_spaces, self=self))
+            lines.append(r.sql_trigger_value.format(self.sql_trigger_value))
         if self.indexes:
-            f.write('{indent}indexes: {indexes}\n'.
-                    format(indent=' ' * 2 * fo.indent_spaces,
-                           indexes=json.dumps(self.indexes)))
-        f.write('{indent}}}\n'.format(indent=' ' * fo.indent_spaces))
+            lines.append(r.indexes.format(json.dumps(self.indexes)))
+        lines.append(r.close)
+
+
+def indented_sql(sql, prefix):
+    """ Returns SQL with every non-blank line indented by a prefix, cached in
+    :data:`derived_table_sql_cache`
+
+    :param sql: SQL text
+    :param prefix: Indent to add to each line
+    :type sql: string
+    :type prefix: string
+    :rtype: string
+
+    """
+    key = (sql, prefix)
+    indented = derived_table_sql_cache.get(key)
+    if indented is None:
+        indented = indent_lines(sql, prefix)
+        derived_table_sql_cache.put(key, indented)
+    return indented
+
+
+def extract_base_view(views, name, label=None):
+    """ Moves the fields shared by a group of views into a base view that
+    the views extend, so fields that are the same in every view, e.g. in
+    views of the same table in many tenant schemas, are generated once.
+
+    A field is shared if every view has a field of that name with the same
+    definition. The base view is marked ``extension_required`` and holds
+    the shared fields in the order of the first view. New views are
+    returned that extend the base view and keep everything else of the
+    original views, which are not changed. The base view is extended
+    last, so its fields still override those of views the original views
+    already extend, as the views' own fields did. Field and derived table
+    objects are shared with the original views, not copied. The time taken
+    is linear in the number of fields.
+
+    :param views: Views to factor
+    :param name: Name of the base view
+    :param label: Label of the base view
+    :type views: list of :class:`View`
+    :type name: string
+    :type label: string
+    :return: The base view and the views extending it
+    :rtype: (:class:`View`, list of :class:`View`) tuple
+    :raises ValueError: if there are no views, one is a refinement or has
+                        the name of the base view
+
+    """
+    if not views:
+        raise ValueError('No views to extract base view {} from'.format(name))
+    for v in views:
+        if v.refinement:
+            raise ValueError('Cannot extract a base view from refinement '
+                             '+{}'.format(v.name))
+        if v.name == name:
+            raise ValueError('View {} has the name of the base view'.
+                             format(name))
+    shared = []
+    for field_name, f in views[0].fields.items():
+        for v in views[1:]:
+            other = v.fields.get(field_name)
+            if other is None or (other is not f and diff_attrs(f, other)):
+                break
+        else:
+            shared.append(f)
+
+    base = View(name, label=label, extension_required=True)
+    for f in shared:
+        base.add_field(f)
+    shared_names = frozenset(base.fields)
+    extending = []
+    for v in views:
+        e = View(v.name, label=v.label, sql_table_name=v.sql_table_name,
+                 extends=list(v.extends or ()) + [name],
+                 extension_required=v.extension_required)
+        e.format_options = v.format_options
+        e.derived_table = v.derived_table
+        for field_name, f in v.fields.items():
+            if field_name not in shared_names:
+                e.add_field(f)
+        extending.append(e)
+    return base, extending
@@ -10,7 +10,8 @@ with open('HISTORY.rst') as history_file:
     history = history_file.read()
 
 requirements = [
-    'six>=1.10.0'
+    'six>=1.10.0',
+    'futures>=3.0.5;python_version<"3"',
 ]
 
 test_requirements = [
@@ -44,6 +45,14 @@ setup(
                  'lookmlgen'},
     include_package_data=True,
     install_requires=requirements,
+    extras_require={
+        'yaml': ['PyYAML>=3.12'],
+    },
+    entry_points={
+        'console_scripts': [
+            'lookml-gen=lookmlgen.cli:main',
+        ],
+    },
     license="Apache Software License 2.0",
     zip_safe=False,
     keywords='lookml-gen',
@@ -0,0 +1,129 @@
+"""
+    File name: test_aio.py
+    Date created: 10/18/26
+"""
+import os
+import sys
+
+import pytest
+
+from lookmlgen import project
+from lookmlgen import view
+
+from .test_project import expected_lookml, make_views, test_format_options
+
+pytestmark = pytest.mark.skipif(sys.version_info < (3, 5),
+                                reason='requires Python 3.5')
+
+
+def run(coroutine):
+    import asyncio
+    loop = asyncio.new_event_loop()
+    try:
+        return loop.run_until_complete(coroutine)
+    finally:
+        loop.close()
+
+
+class AsyncWriter(object):
+    """Writer whose write() is a coroutine, like an aiohttp response"""
+    def __init__(self):
+        self.writes = []
+
+    def write(self, data):
+        import asyncio
+        self.writes.append(data)
+        return asyncio.sleep(0)
+
+
+class DrainWriter(AsyncWriter):
+    """Writer with a synchronous write() and a drain() coroutine, like
+    asyncio.StreamWriter
+    """
+    def write(self, data):
+        self.writes.append(data)
+
+    def drain(self):
+        import asyncio
+        self.drained = True
+        return asyncio.sleep(0)
+
+
+@pytest.mark.parametrize('writer_class', [AsyncWriter, DrainWriter])
+def test_agenerate_lookml(writer_class):
+    v = make_views(1)[0]
+    writer = writer_class()
+    run(v.agenerate_lookml(writer, test_format_options))
+    expected = expected_lookml(v, test_format_options)
+    assert writer.writes == [expected.encode('utf-8')]
+    assert getattr(writer, 'drained', True)
+    writer = writer_class()
+    run(v.agenerate_lookml(writer, test_format_options, encoding=None))
+    assert writer.writes == [expected]
+
+
+def test_agenerate_lookml_stream_writer():
+    import asyncio
+    import socket
+    v = make_views(1)[0]
+    v.label = u'Caf\u00e9'
+    expected = expected_lookml(v, test_format_options).encode('utf-8')
+    a, b = socket.socketpair()
+    loop = asyncio.new_event_loop()
+    try:
+        _, writer = loop.run_until_complete(
+            asyncio.open_connection(sock=a))
+        reader, other = loop.run_until_complete(
+            asyncio.open_connection(sock=b))
+        loop.run_until_complete(
+            v.agenerate_lookml(writer, test_format_options))
+        writer.close()
+        assert loop.run_until_complete(reader.read()) == expected
+        other.close()
+        # Lets the transports finish closing
+        loop.run_until_complete(asyncio.sleep(0))
+    finally:
+        loop.close()
+
+
+def test_project_agenerate_lookml(tmpdir):
+    views = make_views(5)
+    p = project.Project(views, str(tmpdir), max_workers=2)
+    timings = run(p.agenerate_lookml(test_format_options, max_concurrency=2))
+    assert [t.name for t in timings] == [v.name for v in views]
+    for v, t in zip(views, timings):
+        with open(t.path, 'rt') as f:
+            assert f.read() == expected_lookml(v, test_format_options)
+    assert os.path.exists(p.manifest_path())
+    assert run(p.agenerate_lookml(test_format_options,
+                                  incremental=True)) == []
+
+
+def test_project_agenerate_lookml_cancel(tmpdir):
+    import asyncio
+    import threading
+    started = threading.Event()
+    release = threading.Event()
+
+    class SlowView(view.View):
+        def render(self, format_options=None):
+            started.set()
+            release.wait(5)
+            return super(SlowView, self).render(format_options)
+
+    views = make_views(3)
+    views[1].__class__ = SlowView
+    p = project.Project(views, str(tmpdir), executor='thread', max_workers=3)
+
+    # Driven through the loop, as this module must parse on Python 2
+    loop = asyncio.new_event_loop()
+    try:
+        task = loop.create_task(p.agenerate_lookml(test_format_options))
+        loop.run_until_complete(loop.run_in_executor(None, started.wait, 5))
+        task.cancel()
+        loop.call_later(0.05, release.set)
+        with pytest.raises(asyncio.CancelledError):
+            loop.run_until_complete(task)
+    finally:
+        loop.close()
+    assert os.listdir(str(tmpdir)) == []
@@ -0,0 +1,41 @@
+"""
+    File name: test_base_generator.py
+    Date created: 10/18/26
+"""
+import pickle
+
+from lookmlgen import base_generator
+
+
+def test_format_options_equality():
+    fo1 = base_generator.GeneratorFormatOptions(indent_spaces=4)
+    fo2 = base_generator.GeneratorFormatOptions(indent_spaces=4)
+    fo3 = base_generator.GeneratorFormatOptions()
+    assert fo1 == fo2
+    assert hash(fo1) == hash(fo2)
+    assert fo1 != fo3
+    assert fo1 != 4
+
+
+def test_renderer_shared_and_invalidated():
+    fo1 = base_generator.GeneratorFormatOptions(indent_spaces=3)
+    fo2 = base_generator.GeneratorFormatOptions(indent_spaces=3)
+    r = fo1.renderer
+    assert r is fo1.renderer
+    assert r is fo2.renderer
+    assert r.indent == '   '
+    assert r.indent2 == ' ' * 6
+    assert r.field_open('dimension').format('id') == '   dimension: id {\n'
+
+    fo2.indent_spaces = 1
+    assert fo2.renderer is not r
+    assert fo2.renderer.sql.format('x') == '  sql: x ;;\n'
+
+
+def test_format_options_pickle():
+    fo = base_generator.GeneratorFormatOptions(indent_spaces=4)
+    fo.renderer
+    restored = pickle.loads(pickle.dumps(fo))
+    assert '_renderer' not in restored.__dict__
+    assert restored == fo
+    assert restored.renderer is fo.renderer
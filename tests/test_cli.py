@@ -0,0 +1,169 @@
+"""
+    File name: test_cli.py
+    Date created: 10/18/26
+"""
+import io
+import json
+import os
+
+import pytest
+import six
+
+from lookmlgen import base_generator
+from lookmlgen import cli
+from lookmlgen import field
+from lookmlgen import spec
+from lookmlgen import view
+
+SPECS = [
+    {'name': 'orders', 'sql_table_name': 'shop.orders',
+     'fields': [{'name': 'id', 'type': 'number', 'primary_key': True},
+                {'field': 'dimension_group', 'name': 'created',
+                 'timeframes': ['date']},
+                {'field': 'measure', 'name': 'count', 'type': 'count'}],
+     'templates': [{'field': 'measure', 'name': 'sum_{column}',
+                    'type': 'sum', 'sql': '${{column}}',
+                    'columns': ['price', 'quantity']}]},
+    {'name': 'users',
+     'derived_table': {'sql': 'SELECT 1 AS id', 'indexes': ['id']},
+     'fields': [{'name': 'id', 'type': 'number'}]},
+]
+
+
+def expected_orders():
+    v = view.View('orders', sql_table_name='shop.orders')
+    v.add_field(field.Dimension('id', type='number', primary_key=True))
+    v.add_field(field.DimensionGroup('created', timeframes=['date']))
+    v.add_field(field.Measure('count', type='count'))
+    for c in ['price', 'quantity']:
+        v.add_field(field.Measure('sum_' + c, type='sum', sql='${%s}' % c))
+    return v
+
+
+def test_view_from_spec():
+    fo = base_generator.GeneratorFormatOptions()
+    v = spec.view_from_spec(SPECS[0])
+    assert v.render(fo) == expected_orders().render(fo)
+    assert spec.view_from_spec(SPECS[1]).derived_table.indexes == ['id']
+
+
+@pytest.mark.parametrize('bad', [
+    {'fields': []},
+    {'name': 'v', 'unknown': 1},
+    {'name': 'v', 'fields': [{'field': 'metric', 'name': 'x'}]},
+    {'name': 'v', 'fields': [{'name': 'x', 'timeframes': ['date']}]},
+    {'name': 'v', 'fields': [{'type': 'number'}]},
+    {'name': 'v', 'fields': ['name']},
+    {'name': 'v', 'fields': {'name': 'x'}},
+    {'name': 'v', 'derived_table': {'indexes': ['id']}},
+    {'name': 'v', 'derived_table': 'SELECT 1'},
+    {'name': 'v', 'templates': [{'name': 'x_{column}', 'columns': 1}]},
+    {'name': 'v', 'extends': 'base'},
+    {'name': 'v', 'extends': [['base']]},
+    {'name': 'v', 'fields': [{'field': ['dimension'], 'name': 'x'}]},
+])
+def test_invalid_spec(bad):
+    with pytest.raises(ValueError):
+        spec.view_from_spec(bad)
+
+
+def test_iter_view_specs():
+    text = json.dumps({'views': SPECS})
+    assert list(spec.iter_view_specs(six.StringIO(text))) == SPECS
+    lines = '\n'.join(json.dumps(s) for s in SPECS) + '\n\n'
+    assert list(spec.iter_view_specs(six.StringIO(lines), 'jsonl')) == SPECS
+    with pytest.raises(ValueError):
+        list(spec.iter_view_specs(six.StringIO('{"name": \n'), 'jsonl'))
+
+
+def test_iter_view_specs_yaml():
+    yaml = pytest.importorskip('yaml')
+    text = yaml.safe_dump(SPECS)
+    assert list(spec.iter_view_specs(six.StringIO(text), 'yaml')) == SPECS
+
+
+def write_specs(tmpdir):
+    path = os.path.join(str(tmpdir), 'views.json')
+    with io.open(path, 'w', encoding='utf-8') as f:
+        f.write(six.text_type(json.dumps(SPECS)))
+    return path
+
+
+@pytest.mark.parametrize('jobs', ['1', '2'])
+def test_main(tmpdir, capsys, jobs):
+    out = os.path.join(str(tmpdir), 'out')
+    assert cli.main([write_specs(tmpdir), '-o', out, '-j', jobs,
+                     '--executor', 'thread', '--no-header']) == 0
+    with open(os.path.join(out, 'orders.view.lkml'), 'rt') as f:
+        assert f.read() == expected_orders().render(
+            base_generator.GeneratorFormatOptions(
+                warning_header_comment=None))
+    assert os.path.exists(os.path.join(out, 'users.view.lkml'))
+    err = capsys.readouterr().err
+    assert 'Read 2 views' in err and 'Wrote 2 of 2 views' in err
+
+    assert cli.main([write_specs(tmpdir), '-o', out, '--incremental',
+                     '--no-header']) == 0
+    assert 'Wrote 0 of 2 views' in capsys.readouterr().err
+
+
+def test_main_errors(tmpdir, capsys):
+    path = os.path.join(str(tmpdir), 'views.txt')
+    open(path, 'w').close()
+    assert cli.main([path, '-o', str(tmpdir)]) == 1
+    assert 'lookml-gen: error:' in capsys.readouterr().err
+
+    specs = [{'name': 'v', 'fields': [{'name': 'x', 'sql': '${missing}'}]}]
+    path = os.path.join(str(tmpdir), 'views.json')
+    with open(path, 'w') as f:
+        json.dump(specs, f)
+    assert cli.main([path, '-o', str(tmpdir), '--validate']) == 1
+    assert 'v.x references unknown ${missing}' in capsys.readouterr().err
+
+
+def test_main_invalid_specs(tmpdir, capsys):
+    path = os.path.join(str(tmpdir), 'views.jsonl')
+    with open(path, 'w') as f:
+        f.write(json.dumps(SPECS[0]) + '\n\n')
+        f.write(json.dumps({'name': 'v', 'derived_table': {}}) + '\n')
+    assert cli.main([path, '-o', str(tmpdir)]) == 1
+    err = capsys.readouterr().err
+    assert path + ': line 3: Missing sql in derived table of view v' in err
+
+    path = os.path.join(str(tmpdir), 'views.json')
+    with open(path, 'w') as f:
+        json.dump([SPECS[0], {'name': 'v', 'fields': ['id']}], f)
+    assert cli.main([path, '-o', str(tmpdir)]) == 1
+    assert path + ': view 2: Expected an object for field of view v' in \
+        capsys.readouterr().err
+
+    with open(path, 'w') as f:
+        json.dump([{'name': 'v', 'extends': 'base'}], f)
+    assert cli.main([path, '-o', str(tmpdir)]) == 1
+    assert path + ': view 1: Expected a list of extends in view v' in \
+        capsys.readouterr().err
+
+    with open(path, 'w') as f:
+        json.dump([{'name': 'v',
+                    'fields': [{'field': ['measure'], 'name': 'x'}]}], f)
+    assert cli.main([path, '-o', str(tmpdir)]) == 1
+    assert path + ': view 1: Expected the name of a kind of field' in \
+        capsys.readouterr().err
+
+
+def test_main_usage_errors(tmpdir, capsys):
+    with pytest.raises(SystemExit) as e:
+        cli.main([write_specs(tmpdir), '--update-snapshots'])
+    assert e.value.code == 2
+    assert '--update-snapshots requires --snapshots' in \
+        capsys.readouterr().err
+
+
+def test_main_invalid_yaml(tmpdir, capsys):
+    pytest.importorskip('yaml')
+    path = os.path.join(str(tmpdir), 'views.yaml')
+    with open(path, 'w') as f:
+        f.write('- name: v\n  fields: [\n')
+    assert cli.main([path, '-o', str(tmpdir)]) == 1
+    err = capsys.readouterr().err
+    assert path + ': Invalid YAML:' in err and 'line 3' in err
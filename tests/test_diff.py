@@ -0,0 +1,60 @@
+"""
+    File name: test_diff.py
+    Date created: 10/18/26
+"""
+from lookmlgen import diff
+from lookmlgen import field
+from lookmlgen import view
+
+
+def make_view(name, sql_table_name=None):
+    v = view.View(name, sql_table_name=sql_table_name)
+    v.add_field(field.Dimension('id', type='number', primary_key=True))
+    v.add_field(field.DimensionGroup('created', timeframes=['date']))
+    v.add_field(field.Measure('count', type='count'))
+    return v
+
+
+def test_no_changes():
+    changes = diff.diff_views([make_view('a'), make_view('b')],
+                              [make_view('a'), make_view('b')])
+    assert not changes
+    assert changes.as_dict() == {}
+
+
+def test_view_changes():
+    old = [make_view('a'), make_view('b'), make_view('c', 't')]
+    new = [make_view('a'), make_view('c', 's.t'), make_view('d')]
+    new[0].fields['id'].primary_key = None
+    new[0].fields['created'].timeframes = ['date', 'week']
+    new[0].add_field(field.Measure('total', type='sum', sql='${id}'))
+    del new[0].fields['count']
+    new[0].set_derived_table(view.DerivedTable('SELECT 1'))
+
+    changes = diff.diff_views(old, {v.name: v for v in new})
+    assert changes.added_views == ['d']
+    assert changes.removed_views == ['b']
+    assert list(changes.changed_views) == ['a', 'c']
+
+    a = changes.changed_views['a']
+    assert a.added_fields == ['total']
+    assert a.removed_fields == ['count']
+    assert a.changed_fields == {
+        'id': {'primary_key': (True, None)},
+        'created': {'timeframes': (['date'], ['date', 'week'])},
+    }
+    assert a.changed_attrs['derived_table'][0] is None
+    assert a.changed_attrs['derived_table'][1]['sql'] == 'SELECT 1'
+    assert changes.changed_views['c'].changed_attrs == \
+        {'sql_table_name': ('t', 's.t')}
+
+
+def test_field_class_change():
+    old = make_view('a')
+    new = make_view('a')
+    new.add_field(field.Dimension('count', type='number'))
+    changed = diff.diff_view(old, new).changed_fields['count']
+    assert changed['field_type'] == (field.FieldType.MEASURE,
+                                     field.FieldType.DIMENSION)
+    assert changed['type'] == ('count', 'number')
+    assert 'primary_key' not in changed
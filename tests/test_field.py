@@ -0,0 +1,126 @@
+"""
+    File name: test_field.py
+    Date created: 10/18/26
+"""
+import pickle
+
+import pytest
+
+from lookmlgen import field
+
+
+@pytest.mark.parametrize('f', [
+    field.Dimension('d', primary_key=True),
+    field.DimensionGroup('dg', timeframes=['date']),
+    field.Measure('m', type='count'),
+    field.Filter('f'),
+])
+def test_fields_have_no_instance_dict(f):
+    assert not hasattr(f, '__dict__')
+    with pytest.raises(AttributeError):
+        f.not_a_field_attribute = True
+
+
+def test_default_sql():
+    d = field.Dimension('d')
+    assert d.sql == '${TABLE}.d'
+    assert d.definition()['sql'] == '${TABLE}.d'
+    d.sql = '${TABLE}.other'
+    assert d.sql == '${TABLE}.other'
+    assert field.Dimension('e', sql='${d}').sql == '${d}'
+
+
+def test_sql_set_to_none():
+    m = field.Measure('count', type='count')
+    assert 'sql:' in m.render()
+    m.sql = None
+    assert m.sql is None
+    assert 'sql:' not in m.render()
+    assert m.definition()['sql'] is None
+    assert pickle.loads(pickle.dumps(m)).sql is None
+    m.sql = '${id}'
+    assert 'sql: ${id} ;;' in m.render()
+    with pytest.raises(AttributeError):
+        m.value_format_name = 'usd'
+
+
+def test_field_pickle():
+    d = field.DimensionGroup('created', timeframes=['date'], label='Created')
+    restored = pickle.loads(pickle.dumps(d))
+    assert restored.definition() == d.definition()
+    assert restored.type_name == 'dimension_group'
+
+
+@pytest.mark.parametrize('field_class, kwargs', [
+    (field.Measure, {'type': 'sum', 'sql': '${{column}}',
+                     'label': 'Sum of {column}'}),
+    (field.Dimension, {'type': 'number', 'hidden': True}),
+    (field.DimensionGroup, {'timeframes': ['date', 'week']}),
+])
+def test_field_template(field_class, kwargs):
+    from lookmlgen import base_generator
+    t = field.FieldTemplate(field_class, 'agg_{column}', **kwargs)
+    columns = ['price', 'quantity']
+    templated = t.expand(columns)
+    for fo in [base_generator.GeneratorFormatOptions(),
+               base_generator.GeneratorFormatOptions(indent_spaces=4)]:
+        for f, column in zip(templated, columns):
+            built = t.field(column)
+            assert f.name == built.name == 'agg_' + column
+            assert f.render(fo) == built.render(fo)
+            assert f.definition() == built.definition()
+            assert f.sql == built.sql
+    restored = pickle.loads(pickle.dumps(templated[0]))
+    assert restored.definition() == templated[0].definition()
+
+
+def test_field_template_requires_column():
+    with pytest.raises(ValueError):
+        field.FieldTemplate(field.Measure, 'total')
+
+
+def test_render_cache():
+    from lookmlgen import base_generator
+    fo = base_generator.GeneratorFormatOptions()
+    fields = [field.Dimension('id', type='number', primary_key=True),
+              field.DimensionGroup('created', timeframes=['date']),
+              field.DimensionGroup('updated'),
+              field.Measure('count', type='count')]
+    expected = [f.render(fo) for f in fields]
+    with field.render_cache(maxsize=8) as cache:
+        for i in range(3):
+            assert [f.render(fo) for f in fields] == expected
+        fields[0].label = 'ID'
+        assert 'label: "ID"' in fields[0].render(fo)
+        indented = base_generator.GeneratorFormatOptions(indent_spaces=4)
+        assert fields[3].render(indented).startswith('    measure: count {')
+    assert (cache.hits, cache.misses) == (8, 6)
+    assert cache.hit_rate == 8 / 14.0
+    assert field._render_cache is None
+
+
+class FormattedMeasure(field.Measure):
+    """Renders an attribute it does not declare in _definition_attrs"""
+    __slots__ = ('value_format_name',)
+
+    def __init__(self, name, value_format_name, **kwargs):
+        super(FormattedMeasure, self).__init__(name, **kwargs)
+        self.value_format_name = value_format_name
+
+    def _generate(self, lines, fo):
+        super(FormattedMeasure, self)._generate(lines, fo)
+        lines.append(fo.renderer.indent2 + 'value_format_name: ' +
+                     self.value_format_name + '\n')
+
+
+def test_render_cache_undeclared_and_unhashable():
+    from lookmlgen import base_generator
+    fo = base_generator.GeneratorFormatOptions()
+    eur = FormattedMeasure('total', 'eur', type='sum')
+    usd = FormattedMeasure('total', 'usd', type='sum')
+    listed = field.Dimension('name', label=['Name'])
+    with field.render_cache() as cache:
+        assert 'value_format_name: eur' in eur.render(fo)
+        assert 'value_format_name: usd' in usd.render(fo)
+        assert "label: \"['Name']\"" in listed.render(fo)
+    assert len(cache) == 0
@@ -0,0 +1,95 @@
+"""
+    File name: test_introspect.py
+    Date created: 10/18/26
+"""
+import sqlite3
+
+import pytest
+
+from lookmlgen import base_generator
+from lookmlgen import field
+from lookmlgen import introspect
+
+
+test_format_options = base_generator.\
+    GeneratorFormatOptions(warning_header_comment=None)
+
+
+def connect(path):
+    conn = sqlite3.connect(path)
+    conn.executescript('''
+        CREATE TABLE IF NOT EXISTS orders (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            customer VARCHAR(40),
+            amount DECIMAL(10, 2),
+            shipped BOOLEAN,
+            created_at TIMESTAMP,
+            due DATE
+        );
+        CREATE TABLE IF NOT EXISTS customers (name TEXT, notes BLOB);
+    ''')
+    return conn
+
+
+def test_field_for_column():
+    f = introspect.field_for_column('amount', 'NUMERIC(10,2)')
+    assert isinstance(f, field.Dimension)
+    assert f.type == 'number'
+    f = introspect.field_for_column('created', 'timestamp with time zone')
+    assert isinstance(f, field.DimensionGroup)
+    assert f.datatype == 'timestamp'
+    assert introspect.field_for_column('flag', 'boolean').type == 'yesno'
+    assert introspect.field_for_column('x', 'geography').type == 'string'
+    assert introspect.field_for_column('p', 'point').type == 'string'
+    assert introspect.field_for_column('ids', 'ARRAY<INT64>').type == \
+        'string'
+    assert introspect.field_for_column('ids', 'integer[]').type == 'string'
+    assert introspect.field_for_column('s', 'STRUCT<d DATE>').type == \
+        'string'
+    assert introspect.field_for_column('n', 'INT64').type == 'number'
+
+
+def test_load_views_sqlite(tmpdir):
+    conn = connect(str(tmpdir.join('catalog.db')))
+    views = introspect.load_views(conn, catalog_class=introspect.SQLiteCatalog)
+    views = list(views)
+    assert [v.name for v in views] == ['customers', 'orders']
+    orders = views[1]
+    assert orders.sql_table_name == 'main.orders'
+    assert list(orders.fields) == ['id', 'customer', 'amount', 'shipped',
+                                   'created_at', 'due']
+    assert orders.fields['id'].type == 'number'
+    assert orders.fields['shipped'].type == 'yesno'
+    assert orders.fields['created_at'].datatype == 'timestamp'
+    assert orders.fields['due'].datatype == 'date'
+    assert 'dimension_group: created_at {' in \
+        orders.render(test_format_options)
+
+
+def test_load_views_workers(tmpdir):
+    path = str(tmpdir.join('catalog.db'))
+    connect(path).close()
+    views = introspect.load_views(
+        lambda: connect(path), schemas=['main'], max_workers=2,
+        catalog_class=introspect.SQLiteCatalog, qualify_table_names=False)
+    assert [(v.name, v.sql_table_name) for v in views] == \
+        [('customers', 'customers'), ('orders', 'orders')]
+    with pytest.raises(ValueError):
+        list(introspect.load_views(lambda: connect(path), max_workers=2))
+
+
+def test_load_views_connection_factory(tmpdir):
+    path = str(tmpdir.join('catalog.db'))
+    connect(path).close()
+    connections = []
+
+    def factory():
+        connections.append(connect(path))
+        return connections[-1]
+    views = introspect.load_views(
+        factory, schemas=['main'], placeholder='?',
+        catalog_class=introspect.SQLiteCatalog)
+    assert [v.name for v in views] == ['customers', 'orders']
+    assert len(connections) == 1
+    with pytest.raises(sqlite3.ProgrammingError):
+        connections[0].cursor()
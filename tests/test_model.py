@@ -0,0 +1,73 @@
+"""
+    File name: test_model.py
+    Date created: 10/18/26
+"""
+import os
+
+import pytest
+import six
+
+from lookmlgen import base_generator
+from lookmlgen import model
+from lookmlgen import view
+
+
+test_format_options = base_generator.\
+    GeneratorFormatOptions(warning_header_comment=None)
+
+
+def make_model(views=None):
+    m = model.Model('basic_model', connection='warehouse', views=views)
+    e = model.Explore('orders', label='Orders')
+    e.add_join(model.Join('users', type='left_outer',
+                          relationship='many_to_one',
+                          sql_on='${orders.user_id} = ${users.id}'))
+    e.add_join(model.Join('buyers', from_view='users',
+                          sql_on='${orders.buyer_id} = ${buyers.id}'))
+    m.add_explore(e)
+    m.add_explore(model.Explore('users'))
+    return m
+
+
+def test_basic_model():
+    testname = 'basic_model'
+    m = make_model([view.View('orders'), 'users'])
+    f = six.StringIO()
+    m.generate_lookml(f, format_options=test_format_options)
+    lookml = f.getvalue()
+    with open(os.path.join(os.path.dirname(__file__),
+                           'expected_output/%s.lkml' % testname),
+              'rt') as expected:
+        assert lookml == expected.read()
+    assert ''.join(m.iter_lookml(test_format_options)) == lookml
+
+
+def test_model_unknown_view():
+    m = make_model(['orders'])
+    assert m.missing_views() == [('orders', 'users'), ('users', 'users')]
+    with pytest.raises(ValueError):
+        m.render(test_format_options)
+
+
+def test_model_includes_refinements():
+    m = make_model([view.View('orders'), view.View('users'),
+                    view.View('users', refinement=True)])
+    lookml = m.render(test_format_options)
+    assert 'include: "orders.view.lkml"\n' \
+        'include: "users.view.lkml"\n' \
+        'include: "+users.view.lkml"\n' in lookml
+
+
+def test_model_explicit_includes():
+    m = make_model()
+    m.includes = ['*.view.lkml']
+    lookml = m.render(test_format_options)
+    assert 'include: "*.view.lkml"\n\nexplore: orders {' in lookml
+
+
+def test_duplicate_explore_and_join():
+    m = make_model()
+    with pytest.raises(ValueError):
+        m.add_explore(model.Explore('orders'))
+    with pytest.raises(ValueError):
+        m.explores['orders'].add_join(model.Join('users'))
@@ -0,0 +1,144 @@
+"""
+    File name: test_parser.py
+    Date created: 10/18/26
+"""
+import os
+
+import pytest
+import six
+
+from lookmlgen import base_generator
+from lookmlgen import field
+from lookmlgen import parser
+from lookmlgen import project
+from lookmlgen import view
+
+
+test_format_options = base_generator.\
+    GeneratorFormatOptions(warning_header_comment=None)
+
+expected_output = os.path.join(os.path.dirname(__file__), 'expected_output')
+
+
+view_outputs = [n for n in sorted(os.listdir(expected_output))
+                if not n.endswith('_model.lkml')]
+
+
+@pytest.mark.parametrize('name', view_outputs)
+def test_round_trip_expected_output(name):
+    fo = base_generator.GeneratorFormatOptions(
+        warning_header_comment=None, omit_time_frames_if_not_set=True)
+    path = os.path.join(expected_output, name)
+    views = parser.load(path)
+    assert len(views) == 1
+    with open(path, 'rt') as f:
+        assert views[0].render(fo) == f.read()
+
+
+def test_round_trip_full_view():
+    v = view.View('full', label='Full View', sql_table_name='schema.full')
+    v.set_derived_table(view.DerivedTable(
+        sql='SELECT id,\n  name\nFROM t\n\nWHERE x = 1\n',
+        sql_trigger_value='SELECT MAX(id) FROM t', indexes=['id', 'name']))
+    v.add_field(field.Dimension('id', type='number', primary_key=True,
+                                hidden=True, label='ID',
+                                group_label='Keys', description='The id'))
+    v.add_field(field.DimensionGroup('created', timeframes=['date', 'week'],
+                                     datatype='timestamp'))
+    v.add_field(field.Filter('f', sql='${TABLE}.x = {% parameter f %}'))
+    v.add_field(field.Measure('total', type='sum', sql='${id}'))
+    lookml = v.render(base_generator.GeneratorFormatOptions(indent_spaces=4))
+
+    parsed = parser.loads(lookml)
+    assert len(parsed) == 1
+    for name, f in v.fields.items():
+        assert parsed[0].fields[name].definition() == f.definition()
+    assert parsed[0].derived_table.definition() == \
+        v.derived_table.definition()
+    assert parsed[0].render() == v.render()
+
+
+def test_skips_unknown_objects_and_parameters():
+    lookml = '''
+        # comment
+        connection: "warehouse"
+        include: "*.view"
+        explore: orders { join: users { sql_on: ${a} = ${b} ;; } }
+        view: orders {
+          drill_fields: [id]
+          dimension: id {
+            type: number
+            value_format_name: id
+            html: <b>{{ value }}</b> ;;
+            tags: ["a", "b"]
+          }
+        }
+    '''
+    views = parser.loads(lookml)
+    assert [v.name for v in views] == ['orders']
+    assert views[0].fields['id'].type == 'number'
+
+
+def test_key_value_lists():
+    lookml = '''
+        view: orders {
+          measure: completed {
+            type: count
+            filters: [status: "complete", created_date: "7 days"]
+          }
+          dimension: id {
+            link: { label: "Open" url: "/orders" }
+            sorts: [created_date: desc]
+          }
+        }
+    '''
+    views = parser.loads(lookml)
+    assert list(views[0].fields) == ['completed', 'id']
+    assert views[0].fields['completed'].type == 'count'
+    items = parser._parse_list(parser._Lexer(['a: "b", c, d: [e]]']))
+    assert items == [('a', 'b'), 'c', ('d', ['e'])]
+
+
+@pytest.mark.parametrize('sql', [
+    'SELECT id,\n  name\n   \nFROM t\n\t\nWHERE x = 1\n',
+    '  SELECT id\n  FROM t\n',
+])
+def test_derived_table_sql_whitespace(sql):
+    v = view.View('ws')
+    v.set_derived_table(view.DerivedTable(sql))
+    for indent_spaces in (2, 4):
+        fo = base_generator.GeneratorFormatOptions(indent_spaces=indent_spaces)
+        parsed = parser.loads(v.render(fo))[0]
+        assert parsed.derived_table.sql == sql
+
+
+def test_syntax_error():
+    with pytest.raises(parser.LookMLSyntaxError) as e:
+        parser.loads('view: a {\n  dimension: b {\n    sql: ${TABLE}.b\n')
+    assert 'Line 3' in str(e.value)
+    with pytest.raises(parser.LookMLSyntaxError):
+        parser.loads('view: a {\n  dimension: b {\n')
+
+
+def test_load_directory(tmpdir):
+    views = []
+    for i in range(4):
+        v = view.View('view_%d' % i)
+        v.add_field(field.Dimension('id', type='number'))
+        views.append(v)
+    project.Project(views, str(tmpdir)).generate_lookml()
+    tmpdir.join('other.lkml').write('view: ignored {}')
+    loaded = parser.load_directory(str(tmpdir), executor=None)
+    assert [path for path, vs in loaded] == \
+        ['view_%d.view.lkml' % i for i in range(4)]
+    for v, (path, vs) in zip(views, loaded):
+        assert vs[0].render() == v.render()
+
+
+def test_streaming_large_sql():
+    sql = '\n'.join('SELECT %d' % i for i in range(20000)) + '\n'
+    v = view.View('big')
+    v.set_derived_table(view.DerivedTable(sql))
+    lines = six.StringIO(v.render(test_format_options))
+    parsed = next(parser.iter_views(lines))
+    assert parsed.derived_table.sql == sql
@@ -0,0 +1,233 @@
+"""
+    File name: test_project.py
+    Date created: 10/18/26
+"""
+import io
+import os
+
+import pytest
+import six
+
+from lookmlgen import base_generator
+from lookmlgen import field
+from lookmlgen import project
+from lookmlgen import view
+
+
+test_format_options = base_generator.\
+    GeneratorFormatOptions(warning_header_comment=None)
+
+
+def make_views(count):
+    views = []
+    for i in range(count):
+        v = view.View('view_%d' % i, sql_table_name='schema.table_%d' % i)
+        v.add_field(field.Dimension('id', type='number', primary_key=True))
+        v.add_field(field.DimensionGroup('created'))
+        v.add_field(field.Measure('count', type='count', sql=None))
+        views.append(v)
+    return views
+
+
+def expected_lookml(v, format_options=None):
+    f = six.StringIO()
+    v.generate_lookml(f, format_options=format_options)
+    return f.getvalue()
+
+
+def check_project(tmpdir, executor):
+    views = make_views(5)
+    p = project.Project(views, str(tmpdir), executor=executor, max_workers=2)
+    timings = p.generate_lookml(test_format_options)
+    assert [t.name for t in timings] == [v.name for v in views]
+    for v, t in zip(views, timings):
+        assert t.path == os.path.join(str(tmpdir), v.name + '.view.lkml')
+        with open(t.path, 'rt') as f:
+            lookml = f.read()
+        assert lookml == expected_lookml(v, test_format_options)
+        assert t.bytes_written == len(lookml)
+        assert t.seconds >= 0
+
+
+def test_project_utf8(tmpdir):
+    v = view.View(u'caf\u00e9s', label=u'Caf\u00e9s\r\nand more')
+    v.add_field(field.Dimension('id', label=u'\u00e9'))
+    p = project.Project([v], str(tmpdir), executor=None)
+    timing = p.generate_lookml(test_format_options)[0]
+    with io.open(timing.path, 'rb') as f:
+        data = f.read()
+    assert data == expected_lookml(v, test_format_options).encode('utf-8')
+    assert timing.bytes_written == len(data)
+
+
+def test_project_serial(tmpdir):
+    check_project(tmpdir, None)
+
+
+def test_project_thread_pool(tmpdir):
+    check_project(tmpdir, 'thread')
+
+
+def test_project_process_pool(tmpdir):
+    check_project(tmpdir, 'process')
+
+
+def test_project_duplicate_view():
+    p = project.Project(make_views(1))
+    with pytest.raises(ValueError):
+        p.add_view(view.View('view_0'))
+
+
+def test_project_incremental(tmpdir):
+    views = make_views(3)
+    p = project.Project(views, str(tmpdir))
+    assert len(p.generate_lookml(test_format_options)) == 3
+    assert os.path.exists(p.manifest_path())
+
+    views = make_views(3)
+    p = project.Project(views, str(tmpdir))
+    assert p.generate_lookml(test_format_options, incremental=True) == []
+
+    views = make_views(3)
+    views[1].add_field(field.Dimension('name'))
+    p = project.Project(views[:2], str(tmpdir))
+    timings = p.generate_lookml(test_format_options, incremental=True)
+    assert [t.name for t in timings] == ['view_1']
+    with open(timings[0].path, 'rt') as f:
+        assert f.read() == expected_lookml(views[1], test_format_options)
+    assert not os.path.exists(p.view_path(views[2]))
+
+    fo = base_generator.GeneratorFormatOptions(warning_header_comment=None,
+                                               indent_spaces=4)
+    timings = p.generate_lookml(fo, incremental=True)
+    assert [t.name for t in timings] == ['view_0', 'view_1']
+
+
+def test_definition_hash_stable_across_generation():
+    v = make_views(1)[0]
+    before = project.definition_hash(v, test_format_options)
+    expected_lookml(v, test_format_options)
+    assert project.definition_hash(v, test_format_options) == before
+
+
+class FormattedMeasure(field.Measure):
+    # Renders an attribute without declaring it in _definition_attrs
+    __slots__ = ('value_format_name',)
+
+    def __init__(self, name, value_format_name=None, **kwargs):
+        super(FormattedMeasure, self).__init__(name, **kwargs)
+        self.value_format_name = value_format_name
+
+    def _generate(self, lines, fo):
+        if self.value_format_name:
+            lines.append(fo.renderer.indent2 + 'value_format_name: ' +
+                         self.value_format_name + '\n')
+
+
+def test_definition_hash_undeclared_attribute():
+    v = make_views(1)[0]
+    m = FormattedMeasure('total', type='sum', value_format_name='usd')
+    v.add_field(m)
+    before = project.definition_hash(v, test_format_options)
+    m.value_format_name = 'eur'
+    assert project.definition_hash(v, test_format_options) != before
+
+
+def test_project_iter_lookml():
+    views = make_views(3)
+    p = project.Project(views, 'unused')
+    pairs = list(p.iter_lookml(test_format_options))
+    assert [path for path, chunks in pairs] == \
+        [v.name + '.view.lkml' for v in views]
+    for v, (path, chunks) in zip(views, pairs):
+        assert ''.join(chunks) == expected_lookml(v, test_format_options)
+
+
+class BrokenView(view.View):
+    def render(self, format_options=None):
+        raise RuntimeError('render failed')
+
+
+def test_project_failure_keeps_previous_files(tmpdir):
+    views = make_views(3)
+    p = project.Project(views, str(tmpdir), executor=None)
+    p.generate_lookml(test_format_options)
+    before = sorted(os.listdir(str(tmpdir)))
+
+    views = make_views(3)
+    views[0].add_field(field.Dimension('name'))
+    views[2] = BrokenView('view_2')
+    p = project.Project(views, str(tmpdir), executor=None)
+    with pytest.raises(RuntimeError):
+        p.generate_lookml(test_format_options)
+    assert sorted(os.listdir(str(tmpdir))) == before
+    with open(p.view_path(views[0]), 'rt') as f:
+        assert 'dimension: name' not in f.read()
+
+
+@pytest.mark.parametrize('fsync', ['none', 'file', 'end'])
+def test_project_fsync(tmpdir, fsync):
+    views = make_views(2)
+    p = project.Project(views, str(tmpdir), fsync=fsync)
+    p.generate_lookml(test_format_options)
+    assert sorted(os.listdir(str(tmpdir))) == \
+        [project.MANIFEST_FILE_NAME, 'view_0.view.lkml', 'view_1.view.lkml']
+
+
+def test_project_invalid_fsync():
+    with pytest.raises(ValueError):
+        project.Project(fsync='always')
+
+
+def test_project_refinement(tmpdir):
+    p = project.Project(output_dir=str(tmpdir), executor=None)
+    p.add_view(view.View('orders'))
+    p.add_view(view.View('orders', label='Orders', refinement=True))
+    p.generate_lookml()
+    assert tmpdir.join('+orders.view.lkml').read().count('view: +orders') \
+        == 1
+    assert tmpdir.join('orders.view.lkml').check()
+
+
+def test_project_sharded(tmpdir):
+    views = make_views(20)
+    views.append(view.View('pdt'))
+    p = project.Project(views, str(tmpdir), executor=None, shard='schema')
+    p.generate_lookml(test_format_options)
+    assert tmpdir.join('schema', 'view_3.view.lkml').read() == \
+        expected_lookml(views[3], test_format_options)
+    assert tmpdir.join('default', 'pdt.view.lkml').check()
+    assert p.include_globs(prefix='/views/') == [
+        '/views/default/*.view.lkml', '/views/schema/*.view.lkml']
+    assert p.include_globs(['pdt']) == ['default/*.view.lkml']
+
+    refinement = view.View('view_3', refinement=True)
+    refinement.add_field(field.Dimension('label'))
+    p.add_view(refinement)
+    p.generate_lookml(test_format_options)
+    assert tmpdir.join('schema', '+view_3.view.lkml').check()
+    assert p.include_globs(['view_3', '+view_3']) == ['schema/*.view.lkml']
+
+    # Moving to hash shards removes the old files and emptied directories
+    p = project.Project(views, str(tmpdir), executor=None, shard='hash')
+    p.generate_lookml(test_format_options, incremental=True)
+    index = project.read_index(str(tmpdir))
+    assert list(index) == [v.name for v in views]
+    for v in views:
+        path = index[v.name]
+        assert path == p.relative_view_path(v)
+        assert len(path.split('/')[0]) == project.SHARD_HASH_CHARS
+        assert tmpdir.join(path).check()
+    assert not tmpdir.join('schema').check()
+    assert len(p.include_globs()) == \
+        len(set(path.split('/')[0] for path in index.values()))
+
+
+def test_project_shard_function(tmpdir):
+    p = project.Project(make_views(2), str(tmpdir), executor=None,
+                        shard=lambda v: 'group_' + v.name[-1])
+    p.generate_lookml()
+    assert tmpdir.join('group_1', 'view_1.view.lkml').check()
+    assert project.read_index(str(tmpdir.join('missing'))) == {}
+    with pytest.raises(ValueError):
+        project.Project(shard='alphabetical')
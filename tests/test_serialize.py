@@ -0,0 +1,79 @@
+"""
+    File name: test_serialize.py
+    Date created: 10/18/26
+"""
+import pickle
+
+import pytest
+
+from lookmlgen import base_generator
+from lookmlgen import field
+from lookmlgen import serialize
+from lookmlgen import view
+
+
+def make_views():
+    v = view.View('orders', label='Orders', sql_table_name='shop.orders')
+    v.set_derived_table(view.DerivedTable('SELECT *\nFROM shop.orders',
+                                          sql_trigger_value='SELECT 1',
+                                          indexes=['id']))
+    v.add_field(field.Dimension('id', type='number', primary_key=True))
+    v.add_field(field.Measure('total', type='sum', sql='${amount}'))
+    v.add_field(field.DimensionGroup('created', timeframes=['date'],
+                                     datatype='date', hidden=True))
+    v.add_field(field.Filter('region', description='Region'))
+    v.add_field(field.Dimension('amount', type='number'))
+    sums = field.FieldTemplate(field.Measure, 'sum_{column}', type='sum',
+                               sql='${{column}}')
+    for f in sums.expand(['price', 'quantity']):
+        v.add_field(f)
+    return [v, view.View('empty')]
+
+
+def test_round_trip():
+    views = make_views()
+    restored = serialize.loads(serialize.dumps(views))
+    assert [v.definition() for v in restored] == \
+        [v.definition() for v in views]
+    fo = base_generator.GeneratorFormatOptions(view_fields_alphabetical=False)
+    for v, r in zip(views, restored):
+        assert list(r.fields) == list(v.fields)
+        assert r.render(fo) == v.render(fo)
+        assert r.format_options is base_generator.DEFAULT_FORMAT_OPTIONS
+    assert type(restored[0].fields['sum_price']) is field.Measure
+
+
+def test_dict_and_file(tmpdir):
+    views = make_views()
+    path = str(tmpdir.join('views.bin'))
+    serialize.dump(dict((v.name, v) for v in views), path)
+    assert [v.name for v in serialize.load(path)] == ['orders', 'empty']
+
+
+def test_constant_columns_stored_once():
+    v = view.View('wide')
+    for i in range(100):
+        v.add_field(field.Measure('m{}'.format(i), type='sum'))
+    assert serialize.dumps([v]).count(b'"sum"') == 1
+
+
+@pytest.mark.parametrize('data', [
+    b'not views', b'lookmlgen-views 999\n[]'])
+def test_invalid_data(data):
+    with pytest.raises(ValueError):
+        serialize.loads(data)
+
+
+def test_pickle_leaves_out_file_and_default_options():
+    v = make_views()[0]
+    v.file = open(__file__)
+    try:
+        restored = pickle.loads(pickle.dumps(v))
+    finally:
+        v.file.close()
+    assert restored.file is None
+    assert restored.format_options is base_generator.DEFAULT_FORMAT_OPTIONS
+    assert restored.render() == v.render()
+    d = field.Dimension('d')
+    d.format_options = base_generator.GeneratorFormatOptions(indent_spaces=4)
+    assert pickle.loads(pickle.dumps(d)).format_options.indent_spaces == 4
@@ -0,0 +1,87 @@
+"""
+    File name: test_snapshot.py
+    Date created: 10/18/26
+"""
+import pytest
+
+from lookmlgen import cli
+from lookmlgen import field
+from lookmlgen import snapshot
+from lookmlgen import view
+
+from .test_project import make_views
+
+
+def test_snapshots(tmpdir):
+    directory = str(tmpdir.join('snapshots'))
+    views = make_views(4)
+    report = snapshot.check_snapshots(views, directory, executor=None)
+    assert report.added == ['view_0', 'view_1', 'view_2', 'view_3']
+    assert not report.ok and not tmpdir.join('snapshots').check()
+
+    report = snapshot.check_snapshots(views, directory, update=True,
+                                      executor='thread')
+    assert report.updated and len(report.added) == 4
+    assert tmpdir.join('snapshots', 'view_2.view.lkml').read() == \
+        views[2].render()
+    report = snapshot.check_snapshots(views, directory, executor='thread')
+    assert report.ok and report.unchanged == [v.name for v in views]
+    report.check()
+
+    views[1].add_field(field.Dimension('extra'))
+    removed = views.pop()
+    views.append(view.View('new_view'))
+    report = snapshot.check_snapshots(views, directory, executor=None)
+    assert list(report.changed) == ['view_1']
+    assert '+  dimension: extra {' in report.changed['view_1']
+    assert report.added == ['new_view']
+    assert report.removed == [removed.name]
+    with pytest.raises(snapshot.SnapshotMismatch) as e:
+        report.check()
+    assert 'changed: view_1' in str(e.value)
+
+    snapshot.check_snapshots(views, directory, update=True, executor=None)
+    assert not tmpdir.join('snapshots', 'view_3.view.lkml').check()
+    assert snapshot.check_snapshots(views, directory, executor=None).ok
+
+
+def test_snapshots_edited_by_hand(tmpdir):
+    import os
+    directory = str(tmpdir)
+    views = make_views(2)
+    snapshot.check_snapshots(views, directory, update=True, executor=None)
+    path = tmpdir.join('view_0.view.lkml')
+    stat = os.stat(str(path))
+    path.write(path.read().replace('dimension: id', 'dimension: ix'))
+    os.utime(str(path), (stat.st_atime, stat.st_mtime + 1))
+    report = snapshot.check_snapshots(views, directory, executor=None)
+    assert list(report.changed) == ['view_0']
+    assert report.unchanged == ['view_1']
+
+    snapshot.check_snapshots(views, directory, update=True, executor=None)
+    assert snapshot.check_snapshots(views, directory, executor=None).ok
+
+
+def test_snapshots_without_index(tmpdir):
+    directory = str(tmpdir)
+    views = make_views(2)
+    snapshot.check_snapshots(views, directory, update=True, executor=None)
+    tmpdir.join(snapshot.SNAPSHOT_INDEX_NAME).remove()
+    assert snapshot.check_snapshots(views, directory, executor=None).ok
+
+    tmpdir.join('view_0.view.lkml').remove()
+    report = snapshot.check_snapshots(views, directory, executor=None)
+    assert report.added == ['view_0']
+
+
+def test_cli_snapshots(tmpdir, capsys):
+    from .test_cli import write_specs
+    specs = write_specs(tmpdir)
+    directory = str(tmpdir.join('snapshots'))
+    assert cli.main([specs, '--snapshots', directory]) == 1
+    assert '2 added' in capsys.readouterr().err
+    assert cli.main([specs, '--snapshots', directory,
+                     '--update-snapshots', '-q']) == 0
+    assert cli.main([specs, '--snapshots', directory, '-j', '2',
+                     '--executor', 'thread']) == 0
+    assert '2 unchanged' in capsys.readouterr().err
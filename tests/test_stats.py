@@ -0,0 +1,80 @@
+"""
+    File name: test_stats.py
+    Date created: 10/18/26
+"""
+import json
+
+from lookmlgen import base_generator
+from lookmlgen import field
+from lookmlgen import project
+from lookmlgen import stats
+from lookmlgen import view
+
+
+test_format_options = base_generator.\
+    GeneratorFormatOptions(warning_header_comment=None)
+
+
+def make_view(name):
+    v = view.View(name)
+    v.add_field(field.Dimension('id', type='number'))
+    v.add_field(field.Dimension('name'))
+    v.add_field(field.DimensionGroup('created'))
+    v.add_field(field.Measure('count', type='count'))
+    return v
+
+
+def test_collect_view():
+    v = make_view('v')
+    assert stats.active_stats() is None
+    with stats.collect() as s:
+        assert stats.active_stats() is s
+        lookml = v.render(test_format_options)
+    assert stats.active_stats() is None
+    assert lookml == v.render(test_format_options)
+
+    assert s.views['v'].count == 4
+    assert s.views['v'].bytes == len(lookml)
+    assert s.stages['render'].bytes == len(lookml)
+    assert s.stages['order'].count == 1
+    assert s.field_types['dimension'].count == 2
+    assert s.field_types['measure'].count == 1
+    assert sum(t.bytes for t in s.field_types.values()) < len(lookml)
+
+    d = json.loads(s.to_json())
+    assert d['field_types']['dimension_group']['count'] == 1
+
+    refinement = view.View('v', refinement=True)
+    refinement.add_field(field.Dimension('label'))
+    with stats.collect() as s:
+        v.render(test_format_options)
+        refinement.render(test_format_options)
+    assert (s.views['v'].count, s.views['+v'].count) == (4, 1)
+
+
+def test_collect_project(tmpdir):
+    views = [make_view('v%d' % i) for i in range(3)]
+    for executor in [None, 'thread', 'process']:
+        p = project.Project(views, str(tmpdir), executor=executor)
+        with stats.collect() as s:
+            timings = p.generate_lookml(test_format_options)
+        assert list(s.views) == ['v0', 'v1', 'v2']
+        assert s.stages['write'].count == 3
+        assert s.stages['write'].bytes == \
+            sum(t.bytes_written for t in timings)
+        assert s.stages['hash'].count == 3
+        assert timings[0].stats.views['v0'].count == 4
+    assert p.generate_lookml(test_format_options)[0].stats is None
+
+
+def test_stage_and_merge():
+    a = stats.GenerationStats()
+    with a.stage('construct'):
+        make_view('v')
+    b = stats.GenerationStats()
+    b.add_stage('construct', 1.0)
+    b.add_field_type('measure', 0.5, 10)
+    a.merge(b)
+    assert a.stages['construct'].count == 2
+    assert a.stages['construct'].seconds >= 1.0
+    assert a.field_types['measure'].bytes == 10
@@ -0,0 +1,51 @@
+"""
+    File name: test_util.py
+    Date created: 10/18/26
+"""
+from lookmlgen import util
+
+
+def test_indent():
+    text = 'a\n\n  b\r\n \nc'
+    assert ''.join(util.iter_indented(text, '  ')) == \
+        '  a\n\n    b\r\n \n  c'
+    assert util.indent_lines(text, '  ') == '  a\n\n    b\r\n \n  c'
+    assert util.indent('a\nb\n', 2) == '  a\n  b\n'
+
+    text = u'a\rb\x0cc\x1cd\u2028e\r\n\x0b\n'
+    expected = u'  a\r  b\x0c  c\x1c  d\u2028  e\r\n\x0b\n'
+    assert u''.join(util.iter_indented(text, u'  ')) == expected
+    assert util.indent_lines(text, u'  ') == expected
+    assert b''.join(util.iter_indented(b'a\rb\x0cc\n', b'  ')) == \
+        b'  a\r  b\x0cc\n'
+
+
+def test_lru_cache():
+    cache = util.LRUCache(2)
+    assert cache.hit_rate == 0.0
+    cache.put('a', 1)
+    cache.put('b', 2)
+    assert cache.get('a') == 1
+    cache.put('c', 3)
+    assert 'b' not in cache
+    assert cache.get('b') is None
+    assert cache.get('a') == 1 and cache.get('c') == 3
+    assert len(cache) == 2
+    assert cache.hit_rate == 0.75
+    cache.clear()
+    assert len(cache) == 0 and cache.hits == cache.misses == 0
+
+
+def test_lru_cache_maxlength():
+    cache = util.LRUCache(10, maxlength=5)
+    cache.put('a', 'xx')
+    cache.put('b', 'yyy')
+    assert cache.length == 5
+    cache.put('c', 'z')
+    assert 'a' not in cache and cache.length == 4
+    cache.put('d', 'too long')
+    assert 'd' not in cache and cache.length == 4
+    cache.put('b', 'y')
+    assert cache.length == 2
+    cache.clear()
+    assert cache.length == 0
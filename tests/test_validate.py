@@ -0,0 +1,114 @@
+"""
+    File name: test_validate.py
+    Date created: 10/18/26
+"""
+import pytest
+
+from lookmlgen import base_generator
+from lookmlgen import field
+from lookmlgen import project
+from lookmlgen import validate
+from lookmlgen import view
+
+
+def make_views():
+    orders = view.View('orders')
+    orders.add_field(field.Dimension('id', type='number'))
+    orders.add_field(field.Dimension('user_id', type='number'))
+    orders.add_field(field.DimensionGroup('created'))
+    orders.add_field(field.Dimension(
+        'created_week_label', sql="CONCAT('Week ', ${created_week})"))
+    orders.add_field(field.Measure(
+        'total', type='sum', sql='${TABLE}.amount * ${users.rate}'))
+    users = view.View('users')
+    users.add_field(field.Dimension('id', type='number'))
+    users.add_field(field.Dimension('rate', type='number'))
+    users.set_derived_table(view.DerivedTable(
+        sql='SELECT * FROM ${orders.SQL_TABLE_NAME}'))
+    return [orders, users]
+
+
+def test_valid_views():
+    assert validate.validate(make_views()) == []
+    validate.check(make_views())
+
+
+def test_field_properties():
+    views = make_views()
+    views[0].add_field(field.Dimension(
+        'a', sql="CASE WHEN ${id._value} > 0 THEN '${users.rate._sql}' "
+                 "ELSE '${created_date._name}' END"))
+    views[0].add_field(field.Dimension(
+        'b', sql="'${user_id._rendered_value}' || ${missing._sql}"))
+    problems = validate.validate(views)
+    assert [p.message for p in problems] == \
+        ['orders.b references unknown ${missing._sql}']
+
+
+def test_unknown_references():
+    views = make_views()
+    views[0].add_field(field.Dimension('a', sql='${missing} + ${users.nope}'))
+    views[0].add_field(field.Dimension('b', sql='${other.x} + ${ext.y}'))
+    views[0].add_field(field.Dimension('c', sql='${created_quarter}'))
+    problems = validate.validate(views, external_views=['ext'])
+    assert [(p.kind, p.field) for p in problems] == \
+        [(validate.UNKNOWN_REFERENCE, 'a')] * 2 + \
+        [(validate.UNKNOWN_REFERENCE, 'b'), (validate.UNKNOWN_REFERENCE, 'c')]
+    assert problems[0].message == 'orders.a references unknown ${missing}'
+
+    fo = base_generator.GeneratorFormatOptions(
+        omit_time_frames_if_not_set=True)
+    assert len(validate.validate(views, fo, ['ext'])) == 3
+    with pytest.raises(validate.ValidationError):
+        validate.check(views)
+
+
+def test_cycles():
+    views = make_views()
+    v = views[0]
+    v.add_field(field.Dimension('a', sql='${b}'))
+    v.add_field(field.Dimension('b', sql='${c} + ${id}'))
+    v.add_field(field.Dimension('c', sql='${a}'))
+    v.add_field(field.Dimension('d', sql='${d}'))
+    views[1].add_field(field.Dimension('x', sql='${orders.a}'))
+    problems = validate.validate(views)
+    assert [p.kind for p in problems] == [validate.CYCLE] * 2
+    assert problems[0].message == \
+        'Reference cycle: orders.a -> orders.b -> orders.c -> orders.a'
+    assert problems[1].message == 'Reference cycle: orders.d -> orders.d'
+
+
+def test_duplicate_names():
+    views = make_views()
+    views[0].add_field(field.Dimension('created_date'))
+    views.append(view.View('users'))
+    problems = validate.validate(views)
+    assert [(p.kind, p.view, p.field) for p in problems] == [
+        (validate.DUPLICATE_NAME, 'orders', 'created_date'),
+        (validate.DUPLICATE_NAME, 'users', None)]
+
+
+def test_project_validate():
+    p = project.Project(make_views())
+    assert p.validate() == []
+
+
+def test_extends_and_refinements():
+    base = view.View('orders_base', extension_required=True)
+    base.add_field(field.Measure('total', type='sum', sql='${amount}'))
+    acme = view.View('orders_acme', extends=['orders_base'])
+    acme.add_field(field.Dimension('amount', sql='${discount} * 2'))
+    refinement = view.View('orders_acme', refinement=True)
+    refinement.add_field(field.Dimension('discount', type='number'))
+    views = [base, acme, refinement]
+    assert validate.validate(views) == []
+
+    broken = view.View('orders_globex', extends=['orders_base', 'missing'])
+    loop = view.View('loop', extends=['loop'])
+    orphan = view.View('nowhere', refinement=True)
+    problems = validate.validate(views + [broken, loop, orphan])
+    assert [(p.kind, p.view, p.field) for p in problems] == [
+        (validate.UNKNOWN_REFERENCE, 'orders_globex', None),
+        (validate.CYCLE, 'loop', None),
+        (validate.UNKNOWN_REFERENCE, 'nowhere', None),
+        (validate.UNKNOWN_REFERENCE, 'orders_globex', 'total')]
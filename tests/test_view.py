@@ -4,6 +4,9 @@
     Date created: 4/17/17
 """
 import os
+import pickle
+
+import pytest
 import six
 
 from lookmlgen import view
@@ -94,3 +97,272 @@ def test_newlines():
                            'expected_output/%s.lkml' % testname),
               'rt') as expected:
         assert lookml == expected.read()
+
+
+def test_newlines_field_templates():
+    testname = 'newlines_test'
+    v = view.View(testname)
+    columns = ['a', 'b', 'c', 'd']
+    for f in field.FieldTemplate(field.Dimension, type='number').\
+            expand(columns):
+        v.add_field(f)
+    sums = field.FieldTemplate(field.Measure, 'sum_{column}', type='sum',
+                               sql='${{column}}')
+    for f in sums.expand(columns):
+        v.add_field(f)
+    lookml = v.render(test_format_options)
+    with open(os.path.join(os.path.dirname(__file__),
+                           'expected_output/%s.lkml' % testname),
+              'rt') as expected:
+        assert lookml == expected.read()
+
+
+class CountingWriter(object):
+    def __init__(self):
+        self.writes = []
+
+    def write(self, s):
+        self.writes.append(s)
+
+
+def test_render():
+    pdt = view.DerivedTable(sql="SELECT id\nFROM table\n",
+                            sql_trigger_value='DATE()')
+    v = view.View('render_test', sql_table_name='table')
+    v.set_derived_table(pdt)
+    v.add_field(field.Dimension('id', type='number', primary_key=True))
+    v.add_field(field.DimensionGroup('created', label='Created'))
+    v.add_field(field.Filter('f', hidden=True))
+    v.add_field(field.Measure('count', type='count'))
+    lookml = v.render(test_format_options)
+
+    w = CountingWriter()
+    v.generate_lookml(w, format_options=test_format_options)
+    assert w.writes == [lookml]
+    assert lookml.startswith('view: render_test {\n')
+    assert pdt.render(test_format_options) in lookml
+    assert v.fields['id'].render(test_format_options) in lookml
+
+
+class WritingDimension(field.Dimension):
+    # Written against the file-based _generate() hook
+    __slots__ = ()
+
+    def _generate(self, f, fo):
+        f.write('    value_format_name: usd\n')
+
+
+class LegacyMeasure(field.Measure):
+    __slots__ = ()
+
+    def generate_lookml(self, file=None, format_options=None):
+        file.write('  measure: legacy {}\n')
+
+
+class CustomGenerator(base_generator.BaseGenerator):
+    field_type = field.FieldType.DIMENSION
+    name = 'custom'
+
+    def generate_lookml(self, file=None, format_options=None):
+        file.write('  dimension: custom {}\n')
+
+
+def test_custom_field_classes():
+    v = view.View('custom_fields')
+    v.add_field(WritingDimension('price'))
+    v.add_field(LegacyMeasure('legacy'))
+    v.fields['custom'] = CustomGenerator()
+    lookml = v.render(test_format_options)
+    assert '    value_format_name: usd\n    sql: ${TABLE}.price ;;\n' \
+        in lookml
+    assert '  measure: legacy {}\n' in lookml
+    assert '  dimension: custom {}\n' in lookml
+    assert ''.join(v.iter_lookml(test_format_options)) == lookml
+    f = six.StringIO()
+    v.fields['price'].generate_lookml(f, test_format_options)
+    assert 'value_format_name: usd' in f.getvalue()
+
+
+def test_ordered_field_names():
+    v = view.View('ordering')
+    v.add_field(field.Measure('count', type='count'))
+    v.add_field(field.Dimension('b'))
+    v.add_field(field.Filter('z'))
+    v.add_field(field.DimensionGroup('a'))
+    assert v.ordered_field_names(test_format_options) == \
+        ['z', 'a', 'b', 'count']
+    fo = base_generator.GeneratorFormatOptions(view_fields_alphabetical=False)
+    assert v.ordered_field_names(fo) == ['z', 'b', 'a', 'count']
+
+    ordered = v.ordered_field_names(test_format_options)
+    assert v.ordered_field_names(test_format_options) is ordered
+    v.add_field(field.Filter('c'))
+    assert v.ordered_field_names(test_format_options) == \
+        ['c', 'z', 'a', 'b', 'count']
+    del v.fields['b']
+    assert v.ordered_field_names(test_format_options) == \
+        ['c', 'z', 'a', 'count']
+    v.fields['a'] = field.Filter('a')
+    assert v.ordered_field_names(test_format_options) == \
+        ['a', 'c', 'z', 'count']
+    v.fields.pop('z')
+    v.fields.setdefault('y', field.Dimension('y'))
+    assert v.ordered_field_names(test_format_options) == \
+        ['a', 'c', 'y', 'count']
+    assert pickle.loads(pickle.dumps(v)).ordered_field_names(
+        test_format_options) == ['a', 'c', 'y', 'count']
+
+
+def test_iter_lookml():
+    pdt = view.DerivedTable(sql='SELECT 1 AS id')
+    v = view.View('iter_test', label='Iter')
+    v.set_derived_table(pdt)
+    v.add_field(field.Dimension('id', type='number'))
+    v.add_field(field.Measure('count', type='count'))
+    for fo in [test_format_options, base_generator.GeneratorFormatOptions(
+            newline_between_items=False)]:
+        chunks = list(v.iter_lookml(fo))
+        assert len(chunks) == 4
+        assert ''.join(chunks) == v.render(fo)
+    assert ''.join(pdt.iter_lookml(test_format_options)) == \
+        pdt.render(test_format_options)
+    d = v.fields['id']
+    assert ''.join(d.iter_lookml(test_format_options)) == \
+        d.render(test_format_options)
+
+
+def test_multi_line_derived_table_sql():
+    sql = 'WITH a AS (\n  SELECT 1 AS id\n)\n\nSELECT id FROM a\n'
+    views = []
+    for name in ('first', 'second'):
+        v = view.View(name)
+        v.set_derived_table(view.DerivedTable(sql=sql, indexes=['id']))
+        v.add_field(field.Dimension('id', type='number'))
+        views.append(v)
+    view.derived_table_sql_cache.clear()
+    lookml = views[0].render(test_format_options)
+    assert '  derived_table: {\n    sql:\n      WITH a AS (\n' \
+           '        SELECT 1 AS id\n      )\n\n      SELECT id FROM a\n ;;\n' \
+           in lookml
+    assert view.derived_table_sql_cache.misses == 1
+    views[1].render(test_format_options)
+    assert view.derived_table_sql_cache.hits == 1
+
+    # Streaming indents the SQL line by line unless it is cached
+    view.derived_table_sql_cache.clear()
+    chunks = list(views[0].iter_lookml(test_format_options))
+    assert ''.join(chunks) == lookml
+    assert '      SELECT id FROM a\n' in chunks
+    assert len(view.derived_table_sql_cache) == 0
+
+
+def test_extends_and_refinement():
+    testname = 'extends_view'
+    v = view.View(testname, extends=['base_view', 'other_view'],
+                  extension_required=True, sql_table_name='schema.orders')
+    v.add_field(field.Dimension('id', type='number', primary_key=True))
+    f = six.StringIO()
+    v.generate_lookml(f, format_options=test_format_options)
+    lookml = f.getvalue()
+    with open(os.path.join(os.path.dirname(__file__),
+                           'expected_output/%s.lkml' % testname),
+              'rt') as expected:
+        assert lookml == expected.read()
+
+    refinement = view.View('orders', label='Orders', refinement=True)
+    assert refinement.lookml_name == '+orders'
+    assert refinement.render(test_format_options).startswith(
+        'view: +orders {\n  label: "Orders"\n')
+
+
+def test_extract_base_view():
+    views = []
+    for tenant in ('acme', 'globex'):
+        v = view.View('orders_' + tenant,
+                      sql_table_name=tenant + '.orders')
+        v.add_field(field.Dimension('id', type='number', primary_key=True))
+        v.add_field(field.Measure('total', type='sum', sql='${amount}'))
+        v.add_field(field.Dimension('amount', type='number',
+                                    label=tenant.title() + ' Amount'))
+        v.add_field(field.Dimension(tenant + '_only'))
+        views.append(v)
+
+    base, extending = view.extract_base_view(views, 'orders_base')
+    assert base.extension_required
+    assert list(base.fields) == ['id', 'total']
+    for v, e in zip(views, extending):
+        assert e.name == v.name
+        assert e.extends == ['orders_base']
+        assert e.sql_table_name == v.sql_table_name
+        assert list(e.fields) == ['amount', v.name[7:] + '_only']
+        assert e.fields['amount'] is v.fields['amount']
+    assert len(views[0].fields) == 4
+
+
+def test_extract_base_view_existing_extends():
+    from collections import OrderedDict
+    from lookmlgen import validate
+
+    def merged_sql(views, name):
+        defined = OrderedDict((v.name, v) for v in views)
+        fields = validate._merged_fields(name, defined, {}, (), {}, [], [])
+        return fields['status'].sql
+
+    common = view.View('common', extension_required=True)
+    common.add_field(field.Dimension('status'))
+    views = []
+    for tenant in ('a', 'b'):
+        v = view.View('orders_' + tenant, extends=['common'])
+        v.add_field(field.Dimension('status', sql='${TABLE}.legacy_status'))
+        views.append(v)
+    assert merged_sql([common] + views, 'orders_a') == \
+        '${TABLE}.legacy_status'
+
+    base, extending = view.extract_base_view(views, 'orders_base')
+    assert list(base.fields) == ['status']
+    assert extending[0].extends == ['common', 'orders_base']
+    assert merged_sql([common, base] + extending, 'orders_a') == \
+        '${TABLE}.legacy_status'
+
+
+def test_extract_base_view_invalid():
+    with pytest.raises(ValueError):
+        view.extract_base_view([], 'base')
+    with pytest.raises(ValueError):
+        view.extract_base_view([view.View('base')], 'base')
+    with pytest.raises(ValueError):
+        view.extract_base_view([view.View('v', refinement=True)], 'base')
+
+
+def test_add_columns():
+    columns = ['price', 'quantity', 'discount']
+    fo = base_generator.GeneratorFormatOptions(
+        warning_header_comment=None, view_fields_alphabetical=False)
+    eager = view.View('wide')
+    lazy = view.View('wide')
+    for v in (eager, lazy):
+        v.add_field(field.Dimension('id', type='number', primary_key=True))
+    for c in columns:
+        eager.add_field(field.Dimension(c, type='number',
+                                        label='Column ' + c))
+    template = lazy.add_columns(columns, field.Dimension, type='number',
+                                label='Column {column}')
+    for v in (eager, lazy):
+        v.add_field(field.Measure('total', type='sum', sql='${price}'))
+    custom = template.field('quantity')
+    custom.hidden = True
+    eager.fields['quantity'].hidden = True
+    lazy.add_field(custom)
+
+    # Columns are only expanded once the fields are read
+    definition = lazy.definition()
+    assert definition == eager.definition()
+    assert lazy._pending
+    pickle.loads(pickle.dumps(lazy))
+    assert lazy._pending
+
+    assert list(lazy.fields) == ['id'] + columns + ['total']
+    assert lazy.fields['quantity'] is custom
+    assert lazy.fields['price'].sql == '${TABLE}.price'
+    assert lazy.render(fo) == eager.render(fo)
+    assert lazy.definition() == definition